@@ -6,29 +6,112 @@ __version__ = "1.0.5"
 __name__ = "catto"
 __all__ = ("__version__", "__name__", "app")
 
+import os
+
+from .completion import COMPLETE_VARIABLE, complete
+
+if os.environ.get(COMPLETE_VARIABLE, "").startswith("complete_"):
+    # Shell completion is answered before the runtime is imported, so TAB stays instant.
+    complete(os.environ[COMPLETE_VARIABLE])
+
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager, redirect_stdout
+from dataclasses import asdict
+from datetime import datetime
+from functools import partial
 from pathlib import Path
+from typing import Iterator
 
 import httpx
 import typer
 from rich.console import Console
+from rich.filesize import decimal
 from rich.table import Table
 from typer import Typer
 
 from .core.api import Client
+from .core.cache import ImageCache
+from .core.catalogue import Catalogue, CatalogueEntry
+from .core.cassette import Cassette, RecordingTransport, ReplayTransport
+from .core.hedging import HedgePolicy
 from .core.interactive import Controller
-from .utils.enums import CategoryEnum, ColorEnum
-from .utils.exceptions import CategoryFactNotFound
+from .core.manifest import Manifest, MergeResult, ShardIndex, merge_shards
+from .core.output import DirectorySink, ImageSink, ThreadedSink, open_sink
+from .core.reservoir import Reservoir
+from .core.retry import RetryBudget, RetryPolicy
+from .core.server import ImagePool, create_server
+from .core.timeouts import TimeoutPolicy
+from .core.validation import ImageVerifier
+from .core.watch import Watcher, WatchRound
+from .utils.enums import CategoryEnum, ColorEnum, EvictionEnum
+from .utils.events import DownloadProgress, JsonLinesReporter, Reporter
+from .utils.exceptions import CategoryFactNotFound, PathNotFound
 from .utils.helpers import (
     interactive_print,
     check_internet_connection,
     ExponentialBackoff,
+    ByteBudget,
+    Deadline,
+    DnsCache,
+    RateLimiter,
+    SharedRateLimiter,
+    parse_rate,
+    parse_size,
+    parse_time,
+    parse_duration,
+    parse_frequency,
 )
+from .utils.tracing import OtlpJsonExporter, tracer
 
 console = Console(color_system="truecolor", soft_wrap=True, force_terminal=True)
-controller = Controller()
-client = Client()
+API_HOST = httpx.URL(CategoryEnum.cats.value).host
+"""
+The host of the API endpoints, all catto processes on the machine share one rate limit for it.
+"""
+
+catalogue = Catalogue()
+client = Client(rate_limiter=SharedRateLimiter(API_HOST), catalogue=catalogue)
+controller = Controller(client)
+dns_cache = DnsCache()
+
+OFFLINE_COMMANDS = (
+    "version",
+    "logo",
+    "show-all-categories",
+    "fact",
+    "list",
+    "sync",
+    "plan",
+    "run",
+    "merge",
+    "touch",
+)
+"""
+The commands that can run without an internet connection, "sync" and "run" check the connection themselves once
+they know that images are missing.
+"""
+
+NETWORK_COMMANDS = (
+    "download",
+    "interactive",
+    "status",
+    "fact",
+    "sync",
+    "run",
+    "reservoir",
+    "serve",
+    "watch",
+)
+"""
+The commands that send requests, their host name lookups go through the DNS cache.
+"""
+
+JSON_OPTION_NAMES = ("--json", "--ndjson")
+"""
+The names of the option that switches a command to machine-readable output.
+"""
 
 app = Typer(
     name="catto",
@@ -39,6 +122,157 @@ app = Typer(
 )
 
 
+def json_option() -> bool:
+    """
+    This function returns the option that switches a command to machine-readable output, with one compact JSON
+    object per line for each event, instead of rich tables.
+    """
+    return typer.Option(
+        False,
+        *JSON_OPTION_NAMES,
+        help="Print one JSON object per line for each event instead of tables, for scripts.",
+        rich_help_panel="Output",
+    )
+
+
+def use_reporter(json_output: bool) -> Reporter:
+    """
+    This function sets the reporter of the client for the invoked command, and returns it.
+
+    Parameters:
+        json_output (bool): This parameter takes whether the command prints NDJSON events.
+
+    Returns:
+        (Reporter): The reporter.
+    """
+    client.reporter = (
+        JsonLinesReporter() if json_output else DownloadProgress(console)
+    )
+    return client.reporter
+
+
+def require_internet_connection(command: str, json_output: bool) -> None:
+    """
+    This function exits with an error if there is no internet connection.
+
+    Parameters:
+        command (str): This parameter takes the name of the command that needs the connection.
+        json_output (bool): This parameter takes whether the command prints NDJSON events.
+    """
+    if check_internet_connection():
+        return
+    if json_output:
+        JsonLinesReporter().emit(
+            "error", command=command, reason="No internet connection."
+        )
+        sys.exit(1)
+    interactive_print(
+        f"[*] Command {command} requires an internet connection to operate. Aborted!",
+        color=ColorEnum.red,
+        end_with_newline=True,
+        bold=True,
+        specific_words_to_color={str(command): ColorEnum.blue},
+    )
+    sys.exit(1)
+
+
+def deadline_option() -> str:
+    """
+    This function returns the option that limits the time a whole download job may take.
+    """
+    return typer.Option(
+        default=None,
+        help="Pass the time the whole job may take, for example '5m'. Once it has passed the images in flight are "
+        "abandoned, and the images saved so far are kept.",
+        rich_help_panel="Limits",
+    )
+
+
+def parse_deadline(deadline: str | None) -> Deadline | None:
+    """
+    This function parses the deadline passed to a command, the time starts right away.
+
+    Raises:
+        typer.BadParameter: If the deadline is not a valid duration.
+    """
+    if deadline is None:
+        return None
+    try:
+        return Deadline(parse_duration(deadline))
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--deadline")
+
+
+@contextmanager
+def use_deadline(deadline: Deadline | None) -> Iterator[None]:
+    """
+    This function sets the deadline of the client for the duration of a job.
+    """
+    client.deadline = deadline
+    try:
+        yield
+    finally:
+        client.deadline = None
+
+
+def parse_targets(targets: str) -> dict[CategoryEnum, int]:
+    """
+    This function parses the target amounts of images of animal categories passed to a command.
+
+    Parameters:
+        targets (str): This parameter takes the targets, for example "cats=500,dogs=500".
+
+    Returns:
+        (dict[CategoryEnum, int]): The amount of images of each category.
+
+    Raises:
+        typer.BadParameter: If one of the targets is not valid.
+    """
+    parsed: dict[CategoryEnum, int] = {}
+    for target in targets.split(","):
+        name, _, amount = target.partition("=")
+        try:
+            parsed[CategoryEnum[name.strip().lower()]] = int(amount)
+        except KeyError as e:
+            raise typer.BadParameter(
+                f"{e} is not a valid category.", param_hint="--target"
+            )
+        except ValueError:
+            raise typer.BadParameter(
+                f"'{target}' is not a valid target, try something like 'cats=500'.",
+                param_hint="--target",
+            )
+        if parsed[CategoryEnum[name.strip().lower()]] < 0:
+            raise typer.BadParameter(
+                f"'{target}' is not a valid target, the amount can't be negative.",
+                param_hint="--target",
+            )
+    return parsed
+
+
+def parse_categories(categories: str) -> list[CategoryEnum]:
+    """
+    This function parses a comma separated list of animal categories passed to a command.
+
+    Parameters:
+        categories (str): This parameter takes the categories, for example "cats,dogs".
+
+    Returns:
+        (list[CategoryEnum]): The categories.
+
+    Raises:
+        typer.BadParameter: If one of the categories does not exist.
+    """
+    try:
+        return [
+            CategoryEnum[name.strip().lower()] for name in categories.split(",")
+        ]
+    except KeyError as e:
+        raise typer.BadParameter(
+            f"{e} is not a valid category.", param_hint="--category"
+        )
+
+
 @app.command(
     name="download",
     help="Use this command to download cute animal images manually in a command line fashion.",
@@ -56,46 +290,635 @@ def download_command(
         default=1,
         help="Pass the amount of animal images to be downloaded.",
     ),
+    workers: int = typer.Option(
+        default=4,
+        min=1,
+        max=32,
+        help="Pass the amount of images to download at the same time.",
+    ),
     path: str = typer.Option(
         help="Pass the directory where the images will be downloaded.",
         exists=True,
         default=Path.cwd(),
     ),
+    cache: bool = typer.Option(
+        default=False,
+        help="Keep downloaded images in a shared on-disk cache, and reuse them instead of downloading them again.",
+        rich_help_panel="Cache",
+    ),
+    cache_dir: Path = typer.Option(
+        default=None,
+        help="Pass the directory of the image cache. Defaults to catto's cache directory.",
+        file_okay=False,
+        rich_help_panel="Cache",
+    ),
+    cache_size: str = typer.Option(
+        default="512MB",
+        help="Pass the maximum size of the image cache, for example '512MB' or '2GB'.",
+        rich_help_panel="Cache",
+    ),
+    reservoir: bool = typer.Option(
+        default=False,
+        help="Take the images from a reservoir of images downloaded ahead of time, and top it up in the background.",
+        rich_help_panel="Reservoir",
+    ),
+    reservoir_dir: Path = typer.Option(
+        default=None,
+        help="Pass the directory of the reservoir. Defaults to catto's cache directory.",
+        file_okay=False,
+        rich_help_panel="Reservoir",
+    ),
+    reservoir_size: int = typer.Option(
+        default=20,
+        min=1,
+        help="Pass the amount of images the reservoir keeps ready for each category.",
+        rich_help_panel="Reservoir",
+    ),
+    max_rate: str = typer.Option(
+        default=None,
+        help="Pass the maximum bandwidth of all the transfers together, for example '5MB/s'.",
+        rich_help_panel="Limits",
+    ),
+    max_bytes: str = typer.Option(
+        default=None,
+        help="Pass the total amount of bytes the download may transfer, for example '2GB'. The download stops "
+        "once it has been spent.",
+        rich_help_panel="Limits",
+    ),
+    retry: str = typer.Option(
+        default=None,
+        help="Pass the amount of retries of an image for each kind of failure, for example 'connect=5,429=10'. "
+        "Kinds are: connect, timeout, 5xx, 429, invalid_image.",
+        rich_help_panel="Limits",
+    ),
+    hedge: bool = typer.Option(
+        default=False,
+        help="Send a copy of the requests that take longer than 95% of the recent ones, and use the first answer.",
+        rich_help_panel="Limits",
+    ),
+    hedge_budget: float = typer.Option(
+        default=0.1,
+        min=0.0,
+        max=1.0,
+        help="Pass the amount of copies allowed for each request when hedging.",
+        rich_help_panel="Limits",
+    ),
+    deadline: str = deadline_option(),
+    verify: bool = typer.Option(
+        default=False,
+        help="Fully decode every downloaded image in the background and report the broken ones, images are "
+        "otherwise only checked by their headers.",
+    ),
+    output_archive: str = typer.Option(
+        default=None,
+        help="Pass a tar or zip archive to write the images into instead of the directory, '-' writes a tar "
+        "archive to the standard output.",
+        rich_help_panel="Output",
+    ),
+    shard_depth: int = typer.Option(
+        default=0,
+        min=0,
+        max=4,
+        help="Spread the images over this many levels of hash-prefix directories, e.g. 'ab/cd/<name>', to keep "
+        "directories with many images fast. Can't be combined with --output-archive.",
+        rich_help_panel="Output",
+    ),
+    writers: int = typer.Option(
+        default=0,
+        min=0,
+        max=32,
+        help="Pass the amount of threads that write the images, so slow disks don't hold up the downloads. 0 writes "
+        "them on the download thread.",
+        rich_help_panel="Output",
+    ),
+    json_output: bool = json_option(),
 ) -> dict[str, Path | list[str]] | None:
     """
     This function is the command "catto download" for manually downloading images from the internet.
     """
     directory = Path(path)
-    table = Table(title="Downloading images...")
-    table.add_column("Category", style="bold")
-    table.add_column("Amount", style="bold")
-    table.add_column("Directory", style="bold")
-    table.add_column("Path", style="bold")
-    table.add_row(
-        category, str(amount), directory.name, str(directory.absolute())
-    )
-    console.print(table)
+    job_deadline = parse_deadline(deadline)
+    if json_output and output_archive == "-":
+        raise typer.BadParameter(
+            "The standard output can not carry both the archive and the JSON events.",
+            param_hint="--json",
+        )
+    if output_archive is not None and shard_depth:
+        raise typer.BadParameter(
+            "An archive can not be spread over shard directories.",
+            param_hint="--shard-depth",
+        )
+    reporter = use_reporter(json_output)
+    # The settings of the module-level client only apply to this download, they are restored when it ends.
+    settings: dict[str, object] = {}
+    if cache:
+        try:
+            maximum_size = parse_size(cache_size)
+        except ValueError as e:
+            raise typer.BadParameter(str(e), param_hint="--cache-size")
+        settings["cache"] = ImageCache(cache_dir, max_size=maximum_size)
+    if max_rate is not None:
+        try:
+            rate = parse_rate(max_rate)
+        except ValueError as e:
+            raise typer.BadParameter(str(e), param_hint="--max-rate")
+        settings["bandwidth_limiter"] = RateLimiter(rate=rate, burst=rate)
+    if max_bytes is not None:
+        try:
+            settings["byte_budget"] = ByteBudget(parse_size(max_bytes))
+        except ValueError as e:
+            raise typer.BadParameter(str(e), param_hint="--max-bytes")
+    if retry is not None:
+        try:
+            settings["retry_policy"] = RetryPolicy.parse(retry)
+        except ValueError as e:
+            raise typer.BadParameter(str(e), param_hint="--retry")
+    if hedge:
+        settings["hedge_policy"] = HedgePolicy(
+            budget=RetryBudget(ratio=hedge_budget, minimum=2)
+        )
+    try:
+        sink = open_sink(
+            directory, output_archive, shard_depth=shard_depth, writers=writers
+        )
+    except PathNotFound:
+        if not reporter.renders_progress:
+            reporter.emit(
+                "error", reason=f"Directory {directory} does not exist."
+            )
+            sys.exit(1)
+        interactive_print(
+            f"[*] Directory {directory} does not exist. Aborted!",
+            color=ColorEnum.red,
+            bold=True,
+            end_with_newline=True,
+            specific_words_to_color={str(directory): ColorEnum.blue},
+        )
+        sys.exit(1)
+
+    with ExitStack() as stack:
+        for name, value in settings.items():
+            stack.callback(setattr, client, name, getattr(client, name))
+            setattr(client, name, value)
+        stack.enter_context(sink)
+        stack.enter_context(use_deadline(job_deadline))
+        if verify:
+            client.verifier = ImageVerifier()
+            stack.callback(setattr, client, "verifier", None)
+            stack.callback(client.verifier.close)
+        if output_archive == "-":
+            # The archive goes to the standard output, so everything else is printed to the standard error.
+            stack.enter_context(redirect_stdout(sys.stderr))
+        return _download(
+            category=category,
+            amount=amount,
+            directory=directory,
+            sink=sink,
+            reservoir=Reservoir(reservoir_dir, target=reservoir_size)
+            if reservoir
+            else None,
+            workers=workers,
+        )
+
+
+def _download(
+    category: str,
+    amount: int,
+    directory: Path,
+    sink: ImageSink,
+    reservoir: Reservoir | None,
+    workers: int,
+) -> dict[str, Path | list[str]] | None:
+    """
+    This function downloads the images of the command "catto download" into the sink.
+    """
+    animal = CategoryEnum[category.lower()]
+    client.warm_up([animal])
+    reporter = client.reporter
+    if reporter.renders_progress:
+        table = Table(title="Downloading images...")
+        table.add_column("Category", style="bold")
+        table.add_column("Amount", style="bold")
+        table.add_column("Directory", style="bold")
+        table.add_column("Path", style="bold")
+        table.add_row(category, str(amount), directory.name, sink.location)
+        console.print(table)
+
+    names: list[str] = []
+    if reservoir is not None:
+        names = reservoir.take(animal, amount, sink, client.catalogue)
+        for name in names:
+            reporter.emit(
+                "image_saved",
+                category=animal.name,
+                name=name,
+                location=sink.location,
+                source="reservoir",
+            )
 
     data = client.download(
-        animal=CategoryEnum[category.lower()], amount=amount, path=directory
+        animal=animal,
+        amount=amount - len(names),
+        path=directory,
+        sink=sink,
+        workers=workers,
     )
+    data["names"] = names + data["names"]
+
+    if reservoir is not None:
+        reservoir.top_up_in_background(animal)
     if len(data["names"]) == 0:
         return
 
+    downloaded = len(data["names"])
+    if not reporter.renders_progress:
+        return data
+    target = sink.sink if isinstance(sink, ThreadedSink) else sink
+    place = (
+        directory.name if isinstance(target, DirectorySink) else sink.location
+    )
     interactive_print(
-        text=f"Downloaded {amount} images of {category} in {directory.name} successfully!",
+        text=f"Downloaded {downloaded} images of {category} in {place} successfully!",
         color=ColorEnum.green,
         bold=True,
         end_with_newline=True,
         specific_words_to_color={
-            str(amount): ColorEnum.blue,
+            str(downloaded): ColorEnum.blue,
             category: ColorEnum.blue,
-            directory.name: ColorEnum.blue,
+            place: ColorEnum.blue,
         },
     )
     return data
 
 
+def download_categories(
+    command: str,
+    missing: dict[CategoryEnum, int],
+    directory: Path,
+    sink: ImageSink,
+    workers: int,
+    json_output: bool,
+    deadline: Deadline | None = None,
+) -> dict[CategoryEnum, list[str]]:
+    """
+    This function downloads the missing images of several categories at the same time, the internet connection is
+    only required if any images are missing.
+
+    Parameters:
+        command (str): This parameter takes the name of the command that downloads the images.
+        missing (dict[CategoryEnum, int]): This parameter takes the amount of images to download of each category.
+        directory (pathlib.Path): This parameter takes the directory the images are downloaded into.
+        sink (ImageSink): This parameter takes the sink the images are written to.
+        workers (int): This parameter takes the amount of images of each category to download at the same time.
+        json_output (bool): This parameter takes whether the command prints NDJSON events.
+        deadline (Deadline | None): This parameter takes the time the downloads may take.
+
+    Returns:
+        (dict[CategoryEnum, list[str]]): The names of the downloaded images of each category.
+    """
+    animals = [animal for animal, amount in missing.items() if amount > 0]
+    if not animals:
+        return {}
+    require_internet_connection(command, json_output)
+    client.warm_up(animals)
+    with use_deadline(deadline), ThreadPoolExecutor(
+        max_workers=len(animals), thread_name_prefix=f"catto-{command}"
+    ) as executor:
+        results = executor.map(
+            lambda animal: client.download(
+                animal, missing[animal], directory, sink, workers=workers
+            ),
+            animals,
+        )
+        return {animal: data["names"] for animal, data in zip(animals, results)}
+
+
+@app.command(
+    name="sync",
+    help="Top a directory up to a target amount of images of each category, only the missing images are downloaded.",
+)
+def sync_command(
+    target: str = typer.Option(
+        ...,
+        help="Pass the amount of images of each category the directory should hold, for example 'cats=500,dogs=500'.",
+    ),
+    path: str = typer.Option(
+        help="Pass the directory to top up.", exists=True, default=Path.cwd()
+    ),
+    workers: int = typer.Option(
+        default=4,
+        min=1,
+        max=32,
+        help="Pass the amount of images of each category to download at the same time.",
+    ),
+    deadline: str = deadline_option(),
+    json_output: bool = json_option(),
+) -> dict[str, int]:
+    """
+    This function is the command "catto sync" that tops a directory up to a target amount of images of each
+    category. The images in the directory are counted from the catalogue, the images that were removed from the
+    directory are forgotten first, and the categories that are missing images are downloaded at the same time.
+    """
+    targets = parse_targets(target)
+    job_deadline = parse_deadline(deadline)
+    reporter = use_reporter(json_output)
+    directory = Path(path).absolute()
+    try:
+        sink = DirectorySink(directory)
+    except PathNotFound:
+        if not reporter.renders_progress:
+            reporter.emit(
+                "error", reason=f"Directory {directory} does not exist."
+            )
+            sys.exit(1)
+        interactive_print(
+            f"[*] Directory {directory} does not exist. Aborted!",
+            color=ColorEnum.red,
+            bold=True,
+            end_with_newline=True,
+            specific_words_to_color={str(directory): ColorEnum.blue},
+        )
+        sys.exit(1)
+
+    catalogue.prune(directory)
+    present = catalogue.count(sink.location)
+    missing: dict[CategoryEnum, int] = {}
+    for animal, amount in targets.items():
+        missing[animal] = max(0, amount - present.get(animal.name, 0))
+        reporter.emit(
+            "sync_planned",
+            category=animal.name,
+            target=amount,
+            present=present.get(animal.name, 0),
+            missing=missing[animal],
+        )
+
+    downloaded = {
+        animal: len(names)
+        for animal, names in download_categories(
+            "sync", missing, directory, sink, workers, json_output, job_deadline
+        ).items()
+    }
+    counts = {
+        animal.name: present.get(animal.name, 0) + downloaded.get(animal, 0)
+        for animal in targets
+    }
+    reporter.emit("sync_finished", location=sink.location, counts=counts)
+    if not reporter.renders_progress:
+        return counts
+    table = Table(title=f"Synced: {directory}")
+    table.add_column("No.", style=ColorEnum.cyan.value, no_wrap=True)
+    table.add_column("Animal", style=ColorEnum.magenta.value)
+    table.add_column("Downloaded", justify="right", style=ColorEnum.green.value)
+    table.add_column("Images", justify="right", style=ColorEnum.green.value)
+    for index, (animal, amount) in enumerate(targets.items(), start=1):
+        table.add_row(
+            f"{index}.)",
+            animal.name,
+            str(downloaded.get(animal, 0)),
+            f"{counts[animal.name]}/{amount}",
+        )
+    console.print(table)
+    return counts
+
+
+@app.command(
+    name="plan",
+    help="Write the manifest of a large download split into shards, so many machines can share it.",
+)
+def plan_command(
+    target: str = typer.Option(
+        ...,
+        help="Pass the amount of images of each category the whole job downloads, for example 'cats=100000'.",
+    ),
+    shards: int = typer.Option(
+        ..., min=1, help="Pass the amount of shards to split the job into."
+    ),
+    output: Path = typer.Option(
+        default=Path("catto-job.json"),
+        dir_okay=False,
+        help="Pass the manifest file to write.",
+    ),
+    namespace: str = typer.Option(
+        default=None,
+        help="Pass the name of the job, the shard directories are named after it. Defaults to a random name.",
+    ),
+    json_output: bool = json_option(),
+) -> Manifest:
+    """
+    This function is the command "catto plan" that writes the manifest of a job split into shards. Every shard is
+    downloaded with "catto run --shard i/N", and the shards are combined with "catto merge".
+    """
+    targets = parse_targets(target)
+    try:
+        manifest = Manifest.plan(targets, shards, namespace)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--namespace")
+    manifest.save(output)
+    reporter = use_reporter(json_output)
+    reporter.emit(
+        "plan_written",
+        path=str(output),
+        namespace=manifest.namespace,
+        shards=manifest.shards,
+        targets=manifest.targets,
+    )
+    if not reporter.renders_progress:
+        return manifest
+    table = Table(title=f"Job {manifest.namespace}: {output}")
+    table.add_column("Shard", style=ColorEnum.cyan.value, no_wrap=True)
+    table.add_column("Directory", style=ColorEnum.blue.value)
+    for animal in targets:
+        table.add_column(animal.name, justify="right")
+    for shard in range(1, manifest.shards + 1):
+        table.add_row(
+            f"{shard}/{manifest.shards}",
+            manifest.shard_directory(shard),
+            *map(str, manifest.shard_targets(shard).values()),
+        )
+    console.print(table)
+    return manifest
+
+
+def load_manifest(path: Path) -> Manifest:
+    """
+    This function reads the manifest passed to a command.
+
+    Raises:
+        typer.BadParameter: If the manifest can't be read.
+    """
+    try:
+        return Manifest.load(path)
+    except (OSError, ValueError) as e:
+        raise typer.BadParameter(str(e), param_hint="MANIFEST")
+
+
+@app.command(
+    name="run",
+    help="Download one shard of a job planned with 'catto plan', only its missing images are downloaded.",
+)
+def run_command(
+    manifest_path: Path = typer.Argument(
+        ..., metavar="MANIFEST", help="Pass the manifest of the job."
+    ),
+    shard: str = typer.Option(
+        ...,
+        help="Pass the shard to download and the amount of shards, for example '3/16'.",
+    ),
+    path: str = typer.Option(
+        help="Pass the directory to create the shard directory in.",
+        exists=True,
+        default=Path.cwd(),
+    ),
+    workers: int = typer.Option(
+        default=4,
+        min=1,
+        max=32,
+        help="Pass the amount of images of each category to download at the same time.",
+    ),
+    deadline: str = deadline_option(),
+    json_output: bool = json_option(),
+) -> dict[str, int]:
+    """
+    This function is the command "catto run" that downloads one shard of a job into its own directory, and lists
+    its images in the index of the directory. A shard that was run before is topped up.
+    """
+    manifest = load_manifest(manifest_path)
+    job_deadline = parse_deadline(deadline)
+    number, _, total = shard.partition("/")
+    try:
+        number, total = int(number), int(total)
+    except ValueError:
+        raise typer.BadParameter(
+            f"'{shard}' is not a valid shard, try something like '3/16'.",
+            param_hint="--shard",
+        )
+    if total != manifest.shards:
+        raise typer.BadParameter(
+            f"The job is split into {manifest.shards} shards, not {total}.",
+            param_hint="--shard",
+        )
+    try:
+        targets = manifest.shard_targets(number)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--shard")
+
+    reporter = use_reporter(json_output)
+    directory = Path(path).absolute() / manifest.shard_directory(number)
+    directory.mkdir(exist_ok=True)
+    sink = DirectorySink(directory)
+    index = ShardIndex(directory, manifest.namespace)
+    try:
+        entries = index.entries()
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--path")
+    present: dict[str, int] = {}
+    for entry in entries:
+        present[entry.category] = present.get(entry.category, 0) + 1
+    missing = {
+        animal: max(0, amount - present.get(animal.name, 0))
+        for animal, amount in targets.items()
+    }
+
+    downloaded = download_categories(
+        "run", missing, directory, sink, workers, json_output, job_deadline
+    )
+    index.append(
+        CatalogueEntry.describe(
+            animal, name, sink.location, (directory / name).read_bytes()
+        )
+        for animal, names in downloaded.items()
+        for name in names
+    )
+    counts = {
+        animal.name: present.get(animal.name, 0)
+        + len(downloaded.get(animal, []))
+        for animal in targets
+    }
+    reporter.emit(
+        "shard_finished",
+        namespace=manifest.namespace,
+        shard=number,
+        location=sink.location,
+        counts=counts,
+    )
+    if not reporter.renders_progress:
+        return counts
+    table = Table(title=f"Shard {number}/{manifest.shards}: {directory}")
+    table.add_column("No.", style=ColorEnum.cyan.value, no_wrap=True)
+    table.add_column("Animal", style=ColorEnum.magenta.value)
+    table.add_column("Downloaded", justify="right", style=ColorEnum.green.value)
+    table.add_column("Images", justify="right", style=ColorEnum.green.value)
+    for position, (animal, amount) in enumerate(targets.items(), start=1):
+        table.add_row(
+            f"{position}.)",
+            animal.name,
+            str(len(downloaded.get(animal, []))),
+            f"{counts[animal.name]}/{amount}",
+        )
+    console.print(table)
+    return counts
+
+
+@app.command(
+    name="merge",
+    help="Combine the shards of a job into one directory, images that were downloaded twice are merged once.",
+)
+def merge_command(
+    manifest_path: Path = typer.Argument(
+        ..., metavar="MANIFEST", help="Pass the manifest of the job."
+    ),
+    path: str = typer.Option(
+        help="Pass the directory holding the shard directories.",
+        exists=True,
+        default=Path.cwd(),
+    ),
+    output: Path = typer.Option(
+        ...,
+        file_okay=False,
+        help="Pass the directory to merge the images into, it is created if it does not exist.",
+    ),
+    json_output: bool = json_option(),
+) -> MergeResult:
+    """
+    This function is the command "catto merge" that combines the images and the indexes of the shards of a job into
+    one directory, without duplicates. Merging again only adds the images that are new.
+    """
+    manifest = load_manifest(manifest_path)
+    reporter = use_reporter(json_output)
+    output.mkdir(parents=True, exist_ok=True)
+    sink = DirectorySink(output)
+    try:
+        result = merge_shards(manifest, Path(path), sink, catalogue)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--path")
+    reporter.emit("merge_finished", location=sink.location, **asdict(result))
+    if not reporter.renders_progress:
+        return result
+    table = Table(title=f"Merged job {manifest.namespace}: {sink.location}")
+    table.add_column("Animal", style=ColorEnum.magenta.value)
+    table.add_column("Merged", justify="right", style=ColorEnum.green.value)
+    for name, amount in result.counts.items():
+        table.add_row(name, str(amount))
+    console.print(table)
+    if result.duplicates:
+        interactive_print(
+            f"[*] Skipped {result.duplicates} duplicate images.",
+            color=ColorEnum.yellow,
+            end_with_newline=True,
+        )
+    if result.missing_shards:
+        missing = ", ".join(map(str, result.missing_shards))
+        interactive_print(
+            f"[*] Shards {missing} were not found in {path}.",
+            color=ColorEnum.red,
+            bold=True,
+            end_with_newline=True,
+            specific_words_to_color={missing: ColorEnum.blue},
+        )
+    return result
+
+
 @app.command(
     "interactive", help="Run catto in interactive mode. Try it and see!"
 )
@@ -145,12 +968,13 @@ def version_command() -> None:
     "status",
     help="Check the status of each animal API endpoint, Catto is currently using.",
 )
-def status_command() -> None:
+def status_command(json_output: bool = json_option()) -> None:
     """
     This function is the command "catto status" that shows the status of each API endpoint, Catto uses for
     downloading images.
     """
-    endpoints = [str(e.value) for e in CategoryEnum]
+    reporter = use_reporter(json_output)
+    client.warm_up(list(CategoryEnum))
     backoff = ExponentialBackoff(base=0.05)
     table = Table(title="Endpoint Statuses.")
 
@@ -161,21 +985,39 @@ def status_command() -> None:
 
     table_data: list[dict[str, str]] = list()
 
-    for endpoint in endpoints:
+    for animal in CategoryEnum:
+        endpoint = str(animal.value)
         try:
-            with httpx.Client(timeout=30.0) as _client:
-                response = _client.get(endpoint)
-                table_data.append(
-                    {
-                        "endpoint": endpoint,
-                        "reason": response.reason_phrase,
-                        "status_code": str(response.status_code),
-                    }
-                )
+            started = time.perf_counter()
+            response = client.probe_endpoint(animal)
+            elapsed = time.perf_counter() - started
+            table_data.append(
+                {
+                    "endpoint": endpoint,
+                    "reason": response.reason_phrase,
+                    "status_code": str(response.status_code),
+                }
+            )
+            reporter.emit(
+                "endpoint_probed",
+                category=animal.name,
+                endpoint=endpoint,
+                status_code=response.status_code,
+                reason=response.reason_phrase,
+                elapsed=round(elapsed, 3),
+            )
 
             time.sleep(backoff.calculate())
 
         except Exception as e:
+            if not reporter.renders_progress:
+                reporter.emit(
+                    "endpoint_failed",
+                    category=animal.name,
+                    endpoint=endpoint,
+                    reason=str(e),
+                )
+                continue
             interactive_print(
                 f"Exception occurred while making an GET HTTP request to {endpoint}:\n{e}",
                 color=ColorEnum.red,
@@ -185,6 +1027,8 @@ def status_command() -> None:
             )
             continue
 
+    if not reporter.renders_progress:
+        return
     for index, data in enumerate(table_data, start=1):
         table.add_row(
             f"{index}.)",
@@ -197,13 +1041,113 @@ def status_command() -> None:
 
 
 @app.command(
-    "show-all-categories", help="This command shows all the categories of animals."
+    "list",
+    help="List the images that catto has saved, newest first, from its catalogue.",
 )
-def all_categories_command() -> list[CategoryEnum]:
+def list_command(
+    category: str = typer.Option(
+        default=None,
+        help="Choose the animal categories to list, separated by commas. Defaults to all of them.",
+        rich_help_panel="Filters",
+    ),
+    image_format: str = typer.Option(
+        None,
+        "--format",
+        help="Pass the format of the images to list, for example 'png'.",
+        rich_help_panel="Filters",
+    ),
+    min_size: str = typer.Option(
+        default=None,
+        help="Pass the smallest size of the images to list, for example '100KB'.",
+        rich_help_panel="Filters",
+    ),
+    max_size: str = typer.Option(
+        default=None,
+        help="Pass the largest size of the images to list, for example '2MB'.",
+        rich_help_panel="Filters",
+    ),
+    since: str = typer.Option(
+        default=None,
+        help="List the images saved since this time, for example 'today', '2022-10-01' or '7d'.",
+        rich_help_panel="Filters",
+    ),
+    until: str = typer.Option(
+        default=None,
+        help="List the images saved before this time, for example 'yesterday' or '2022-10-01T12:00'.",
+        rich_help_panel="Filters",
+    ),
+    limit: int = typer.Option(
+        default=50, min=1, help="Pass the maximum amount of images to list."
+    ),
+    json_output: bool = json_option(),
+) -> list[CatalogueEntry]:
+    """
+    This function is the command "catto list" that queries the catalogue of saved images.
+    """
+    reporter = use_reporter(json_output)
+    filters: dict[str, object] = {
+        "categories": parse_categories(category) if category else None,
+        "image_format": image_format,
+        "limit": limit,
+    }
+    for name, value, parse, hint in (
+        ("minimum_size", min_size, parse_size, "--min-size"),
+        ("maximum_size", max_size, parse_size, "--max-size"),
+        ("since", since, parse_time, "--since"),
+        ("until", until, parse_time, "--until"),
+    ):
+        try:
+            filters[name] = None if value is None else parse(value)
+        except ValueError as e:
+            raise typer.BadParameter(str(e), param_hint=hint)
+    images = catalogue.query(**filters)
+
+    if not reporter.renders_progress:
+        for image in images:
+            reporter.emit("image", **asdict(image))
+        return images
+    table = Table(title=f"Catalogue: {catalogue.path}")
+    table.add_column("No.", style=ColorEnum.cyan.value, no_wrap=True)
+    table.add_column("Animal", style=ColorEnum.magenta.value)
+    table.add_column("Image", style=ColorEnum.green.value)
+    table.add_column("Format")
+    table.add_column("Dimensions", justify="right")
+    table.add_column("Size", justify="right")
+    table.add_column("Saved", justify="right")
+    table.add_column("Location", style=ColorEnum.blue.value)
+    for index, image in enumerate(images, start=1):
+        table.add_row(
+            f"{index}.)",
+            image.category,
+            image.name,
+            image.format or "?",
+            f"{image.width}x{image.height}" if image.width else "?",
+            decimal(image.size),
+            datetime.fromtimestamp(image.saved_at).strftime("%Y-%m-%d %H:%M"),
+            image.location,
+        )
+    console.print(table)
+    return images
+
+
+@app.command(
+    "show-all-categories",
+    help="This command shows all the categories of animals.",
+)
+def all_categories_command(
+    json_output: bool = json_option(),
+) -> list[CategoryEnum]:
     """
     This function is the command "catto show-all-categories" that shows the status of each API endpoint.
     """
     endpoints = [e for e in CategoryEnum]
+    reporter = use_reporter(json_output)
+    if not reporter.renders_progress:
+        for endpoint in endpoints:
+            reporter.emit(
+                "category", name=endpoint.name, endpoint=str(endpoint.value)
+            )
+        return endpoints
     table = Table(title="All available animal categories.")
     table.add_column("No.", style=ColorEnum.cyan.value, no_wrap=True)
     table.add_column("Animal", style=ColorEnum.magenta.value)
@@ -236,64 +1180,462 @@ def logo_command(typewriter: bool = typer.Option(
     return controller.print_logo(typewriter_effect=typewriter)
 
 
-@app.command(name="fact", help="Get a fun fact about the specified animal.")
+@app.command(name="fact", help="Get fun facts about the specified animals.")
 def fact_command(
     category: str = typer.Option(
-        help=f"Choose between different animals categories to download images from.\nCategories are: "
+        help=f"Choose between different animals categories, separated by commas, to get facts about.\nCategories are: "
         f"{', '.join([animal.name for animal in CategoryEnum])}.",
         default="cats",
         rich_help_panel="Secondary Arguments",
-    )
-) -> str | None:
+    ),
+    amount: int = typer.Option(
+        min=1,
+        max=100,
+        default=1,
+        help="Pass the amount of unique facts to get about each animal.",
+    ),
+    json_output: bool = json_option(),
+) -> str | dict[str, list[str]] | None:
     """
-    This function is the command "catto fact" that prints a random fact about the specified animal.
+    This function is the command "catto fact" that prints random facts about the specified animals. Facts are
+    served from the local fact store when there is no internet connection.
     """
-    animal = CategoryEnum[category.lower()]
-    try:
-        fact = controller.fetch_random_fact_about_the_selected_animal(animal)
+    animals = parse_categories(category)
+    reporter = use_reporter(json_output)
+    offline = not check_internet_connection()
+    if not offline:
+        client.warm_up(animals)
+    facts: dict[str, list[str]] = {}
+    for animal in animals:
+        try:
+            facts[animal.name] = client.fetch_facts_about_the_category(
+                animal, amount, offline=offline
+            )
+        except CategoryFactNotFound:
+            facts[animal.name] = []
+        for fact in facts[animal.name]:
+            reporter.emit("fact", category=animal.name, fact=fact)
+        if not facts[animal.name]:
+            reporter.emit("fact_missing", category=animal.name, offline=offline)
+            if not reporter.renders_progress:
+                continue
+            interactive_print(
+                f"Sorry, no fact returned for '{animal.name}' by the API.",
+                color=ColorEnum.red,
+                bold=True,
+                end_with_newline=True,
+                specific_words_to_color={animal.name: ColorEnum.blue},
+            )
+
+    if not reporter.renders_progress:
+        client.fact_store.wait(timeout=10.0)
+        return facts
+
+    if amount == 1 and len(animals) == 1:
+        if not facts[animals[0].name]:
+            return
+        fact = facts[animals[0].name][0]
         interactive_print(
-            f"A fun fact about {animal.name}!:\n{fact}",
+            f"A fun fact about {animals[0].name}!:\n{fact}",
             color=ColorEnum.cyan,
             bold=True,
             end_with_newline=True,
             flush=True,
             specific_words_to_color={
-                animal.name: ColorEnum.green,
+                animals[0].name: ColorEnum.green,
                 fact: ColorEnum.magenta,
             },
         )
+        client.fact_store.wait(timeout=10.0)
         return fact
-    except CategoryFactNotFound:
+
+    table = Table(title="Fun facts about animals.")
+    table.add_column("No.", style=ColorEnum.cyan.value, no_wrap=True)
+    table.add_column("Animal", style=ColorEnum.green.value)
+    table.add_column("Fact", style=ColorEnum.magenta.value)
+    index = 1
+    for name, animal_facts in facts.items():
+        for fact in animal_facts:
+            table.add_row(f"{index}.)", name, fact)
+            index += 1
+    console.print(table)
+    client.fact_store.wait(timeout=10.0)
+    return facts
+
+
+@app.command(
+    name="reservoir",
+    help="Fill the reservoir of images that 'catto download --reservoir' takes its images from.",
+)
+def reservoir_command(
+    category: str = typer.Option(
+        default=",".join(animal.name for animal in CategoryEnum),
+        help="Choose the animal categories to fill, separated by commas.",
+        rich_help_panel="Secondary Arguments",
+    ),
+    target: int = typer.Option(
+        default=20,
+        min=1,
+        help="Pass the amount of images to keep ready for each category.",
+    ),
+    directory: Path = typer.Option(
+        default=None,
+        help="Pass the directory of the reservoir. Defaults to catto's cache directory.",
+        file_okay=False,
+    ),
+    rate: float = typer.Option(
+        default=1.0,
+        min=0.1,
+        help="Pass the maximum amount of requests per second made to the API endpoints while filling.",
+    ),
+) -> dict[str, int]:
+    """
+    This function is the command "catto reservoir" that fills the reservoir of images up to its target, and
+    shows how many images are ready for each category.
+    """
+    animals = parse_categories(category)
+    images_reservoir = Reservoir(directory, target=target)
+    filling_client = Client(
+        cache=client.cache,
+        fact_store=client.fact_store,
+        transport=client.transport,
+        rate_limiter=SharedRateLimiter(API_HOST, rate=rate, burst=1),
+    )
+    levels: dict[str, int] = {}
+    for animal in animals:
+        images_reservoir.fill(filling_client, animal)
+        levels[animal.name] = images_reservoir.count(animal)
+
+    table = Table(title=f"Reservoir: {images_reservoir.directory}")
+    table.add_column("No.", style=ColorEnum.cyan.value, no_wrap=True)
+    table.add_column("Animal", style=ColorEnum.magenta.value)
+    table.add_column("Images", justify="right", style=ColorEnum.green.value)
+    for index, (name, count) in enumerate(levels.items(), start=1):
+        table.add_row(f"{index}.)", name, f"{count}/{target}")
+    console.print(table)
+    return levels
+
+
+@app.command(
+    name="serve",
+    help="Run a local HTTP server that serves random animal images from a pool of pre-fetched images.",
+)
+def serve_command(
+    host: str = typer.Option(
+        default="127.0.0.1", help="Pass the address to listen on."
+    ),
+    port: int = typer.Option(
+        default=8080, min=0, max=65535, help="Pass the port to listen on."
+    ),
+    category: str = typer.Option(
+        default=",".join(animal.name for animal in CategoryEnum),
+        help="Choose the animal categories to serve, separated by commas.",
+        rich_help_panel="Secondary Arguments",
+    ),
+    pool_size: int = typer.Option(
+        default=10,
+        min=1,
+        help="Pass the amount of images to keep ready for each category.",
+    ),
+    rate: float = typer.Option(
+        default=5.0,
+        min=0.1,
+        help="Pass the maximum amount of requests per second made to the API endpoints while refilling the pools.",
+    ),
+) -> None:
+    """
+    This function is the command "catto serve" that runs a local HTTP server, `GET /<category>` answers with a
+    random image of that category, and `GET /health` answers with the amount of images that are ready.
+    """
+    animals = parse_categories(category)
+    serving_client = Client(
+        cache=client.cache,
+        fact_store=client.fact_store,
+        transport=client.transport,
+        rate_limiter=SharedRateLimiter(
+            API_HOST, rate=rate, burst=max(1, int(rate))
+        ),
+    )
+    pool = ImagePool.from_client(serving_client, animals, size=pool_size)
+    server = create_server(pool, host, port)
+
+    table = Table(title=f"Serving on http://{host}:{server.server_address[1]}")
+    table.add_column("No.", style=ColorEnum.cyan.value, no_wrap=True)
+    table.add_column("Animal", style=ColorEnum.magenta.value)
+    table.add_column("Url", style=ColorEnum.green.value)
+    for index, animal in enumerate(animals, start=1):
+        table.add_row(
+            f"{index}.)",
+            animal.name,
+            f"http://{host}:{server.server_address[1]}/{animal.name}",
+        )
+    console.print(table)
+
+    pool.start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
         interactive_print(
-            f"Sorry, no fact returned for '{animal.name}' by the API.",
-            color=ColorEnum.red,
+            "[*] Stopping the server.",
             bold=True,
+            color=ColorEnum.red,
             end_with_newline=True,
-            specific_words_to_color={animal.name: ColorEnum.blue},
         )
-        return
+    finally:
+        server.server_close()
+        pool.stop()
+    return
+
+
+@app.command(
+    name="watch",
+    help="Keep downloading images into a directory, evicting old images to stay within a disk quota.",
+)
+def watch_command(
+    category: str = typer.Option(
+        default=",".join(animal.name for animal in CategoryEnum),
+        help="Choose the animal categories to download in turns, separated by commas.",
+        rich_help_panel="Secondary Arguments",
+    ),
+    path: str = typer.Option(
+        help="Pass the directory to keep downloading images into.",
+        exists=True,
+        default=Path.cwd(),
+    ),
+    rate: str = typer.Option(
+        default="10/min",
+        help="Pass how many images to download, for example '10/min', '2/s' or '100/hour'.",
+    ),
+    max_disk: str = typer.Option(
+        default=None,
+        help="Pass the maximum total size of the images in the directory, for example '1GB'.",
+    ),
+    max_files: int = typer.Option(
+        default=None,
+        min=1,
+        help="Pass the maximum amount of images in the directory.",
+    ),
+    evict: EvictionEnum = typer.Option(
+        default=EvictionEnum.oldest.value,
+        help="Choose which images are evicted first once the directory is over its quota: the oldest ones, or the "
+        "least recently used ones.",
+    ),
+    json_output: bool = json_option(),
+) -> None:
+    """
+    This function is the command "catto watch" that keeps downloading images into a directory until it is stopped
+    with Ctrl+C. The images of the directory are tracked in the catalogue, and once the directory is over its quota,
+    the oldest or least recently used images are evicted.
+    """
+    animals = parse_categories(category)
+    try:
+        per_second = parse_frequency(rate)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--rate")
+    max_bytes = None
+    if max_disk is not None:
+        try:
+            max_bytes = parse_size(max_disk)
+        except ValueError as e:
+            raise typer.BadParameter(str(e), param_hint="--max-disk")
+    if max_bytes is None and max_files is None:
+        raise typer.BadParameter(
+            "Pass a quota, or the directory grows without bound.",
+            param_hint="--max-disk / --max-files",
+        )
+
+    watching_client = Client(
+        cache=client.cache,
+        fact_store=client.fact_store,
+        transport=client.transport,
+        timeout_policy=client.timeout_policy,
+        catalogue=catalogue,
+        rate_limiter=client.rate_limiter,
+        reporter=JsonLinesReporter() if json_output else Reporter(),
+    )
+    directory = Path(path).absolute()
+    try:
+        watcher = Watcher(
+            watching_client,
+            directory,
+            animals,
+            max_files=max_files,
+            max_bytes=max_bytes,
+            order=evict,
+            # Watches of the same directory share their pace, the API requests share the limit of all commands.
+            pace=SharedRateLimiter(
+                f"watch:{directory}", rate=per_second, burst=1
+            ),
+        )
+    except PathNotFound:
+        raise typer.BadParameter(
+            f"Directory {directory} does not exist.", param_hint="--path"
+        )
+    watching_client.reporter.emit(
+        "watch_started",
+        location=str(directory),
+        rate=per_second,
+        max_files=max_files,
+        max_bytes=max_bytes,
+        order=evict,
+    )
+
+    def show(outcome: WatchRound) -> None:
+        if json_output:
+            return
+        saved = ", ".join(outcome.names) or "nothing"
+        evicted = f", evicted {len(outcome.evicted)}" if outcome.evicted else ""
+        console.print(
+            f"[{datetime.now():%H:%M:%S}] {outcome.category.name}: saved {saved}{evicted} "
+            f"({outcome.files} images, {decimal(outcome.size)})",
+            highlight=False,
+            markup=False,
+        )
+
+    try:
+        watcher.run(on_round=show)
+    except KeyboardInterrupt:
+        if not json_output:
+            interactive_print(
+                "[*] Stopped watching.",
+                bold=True,
+                color=ColorEnum.red,
+                end_with_newline=True,
+            )
+    finally:
+        watching_client.close()
+    files, size = catalogue.usage(str(directory))
+    watching_client.reporter.emit(
+        "watch_stopped", location=str(directory), files=files, size=size
+    )
+    return
+
+
+@app.command(
+    name="touch",
+    help="Mark images as used, so 'catto watch --evict lru' keeps them longer.",
+)
+def touch_command(
+    images: list[Path] = typer.Argument(
+        ...,
+        help="Pass the images that were used, for example the current wallpaper.",
+    ),
+    json_output: bool = json_option(),
+) -> int:
+    """
+    This function is the command "catto touch" that records in the catalogue that images were just used, the least
+    recently used images of a directory are the first ones that "catto watch --evict lru" evicts.
+    """
+    reporter = use_reporter(json_output)
+    names: dict[str, list[str]] = {}
+    for image in images:
+        image = image.absolute()
+        names.setdefault(str(image.parent), []).append(image.name)
+    touched = sum(
+        catalogue.touch(location, location_names)
+        for location, location_names in names.items()
+    )
+
+    if not reporter.renders_progress:
+        reporter.emit(
+            "images_touched", count=touched, untracked=len(images) - touched
+        )
+        return touched
+    interactive_print(
+        f"[*] Marked {touched} of {len(images)} images as used.",
+        bold=True,
+        color=ColorEnum.green if touched == len(images) else ColorEnum.yellow,
+        end_with_newline=True,
+    )
+    return touched
 
 
 @app.callback()
-def app_command_callback_middleware(context: typer.Context):
+def app_command_callback_middleware(
+    context: typer.Context,
+    record: Path = typer.Option(
+        default=None,
+        help="Record every HTTP request and response, with its timing, into this cassette file.",
+        dir_okay=False,
+        rich_help_panel="Cassettes",
+    ),
+    replay: Path = typer.Option(
+        default=None,
+        help="Answer the HTTP requests with the responses of this cassette file instead of the network.",
+        exists=True,
+        dir_okay=False,
+        rich_help_panel="Cassettes",
+    ),
+    replay_realtime: bool = typer.Option(
+        default=False,
+        help="Replay every response as slowly as it was recorded, instead of as fast as possible.",
+        rich_help_panel="Cassettes",
+    ),
+    timeout: str = typer.Option(
+        default=None,
+        help="Pass the timeouts of the requests in seconds, for example 'connect=5,image.read=60,probe=3'. "
+        "Phases are: connect, read, write, pool. Kinds of requests are: metadata, image, probe.",
+    ),
+    trace: str = typer.Option(
+        default=None,
+        help="Trace the steps of the command and append the spans to this file as OTLP JSON lines, or post "
+        "them to this OTLP/HTTP collector url, for example 'http://localhost:4318/v1/traces'.",
+    ),
+):
     """
     This function is called when a command is invoked.
     """
-    if context.invoked_subcommand.lower() == "version" or context.invoked_subcommand == "logo" or \
-            context.invoked_subcommand == "show-all-categories":
-        return
-
-    if not check_internet_connection():
-        interactive_print(
-            f"[*] Command {context.invoked_subcommand}"
-            f"requires an internet connection to operate. Aborted!",
-            color=ColorEnum.red,
-            end_with_newline=True,
-            bold=True,
-            specific_words_to_color={
-                str(context.invoked_subcommand): ColorEnum.blue
-            },
+    if context.invoked_subcommand in NETWORK_COMMANDS and replay is None:
+        dns_cache.install()
+        context.call_on_close(dns_cache.uninstall)
+    if trace is not None:
+        exporter = OtlpJsonExporter(
+            trace, resource={"service.version": __version__}
         )
-        sys.exit(1)
+        # The callbacks run in reverse, the span of the command ends before the spans are exported.
+        context.call_on_close(exporter.close)
+        context.call_on_close(partial(setattr, tracer, "exporter", None))
+        tracer.exporter = exporter
+        context.with_resource(
+            tracer.span(
+                f"catto {context.invoked_subcommand}",
+                command=context.invoked_subcommand,
+            )
+        )
+    if timeout is not None:
+        try:
+            timeout_policy = TimeoutPolicy.parse(timeout)
+        except ValueError as e:
+            raise typer.BadParameter(str(e), param_hint="--timeout")
+        context.call_on_close(
+            partial(setattr, client, "timeout_policy", client.timeout_policy)
+        )
+        client.timeout_policy = timeout_policy
+    if record is not None and replay is not None:
+        raise typer.BadParameter(
+            "A cassette can not be recorded and replayed at the same time.",
+            param_hint="--record",
+        )
+    if record is not None or replay is not None:
+        cassette = Cassette(record or replay)
+        context.call_on_close(cassette.close)
+        # Setting the transport closes the connections of the client, before the cassette is closed.
+        context.call_on_close(
+            partial(setattr, client, "transport", client.transport)
+        )
+        client.transport = (
+            RecordingTransport(cassette)
+            if record is not None
+            else ReplayTransport(cassette, realtime=replay_realtime)
+        )
+    if context.invoked_subcommand in OFFLINE_COMMANDS or replay is not None:
+        return
 
+    require_internet_connection(
+        context.invoked_subcommand,
+        any(
+            argument in JSON_OPTION_NAMES
+            for argument in context.protected_args + context.args
+        ),
+    )
     return
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import os
+import shlex
+import sys
+
+__all__ = ("COMPLETE_VARIABLE", "complete", "suggest")
+
+COMPLETE_VARIABLE = "_CATTO_COMPLETE"
+"""
+The environment variable that the completion scripts installed by `catto --install-completion` set.
+"""
+
+CATEGORIES = (
+    "pandas",
+    "dogs",
+    "cats",
+    "birds",
+    "foxes",
+    "redpandas",
+    "kangaroo",
+    "koala",
+    "raccoon",
+)
+
+HELP_OPTIONS = ("-h", "--help", "-help")
+
+GLOBAL_OPTIONS = (
+    ("--record", "--replay", "--timeout", "--trace"),
+    (
+        "--replay-realtime",
+        "--no-replay-realtime",
+        "--install-completion",
+        "--show-completion",
+    ),
+)
+"""
+The options of catto itself, the ones that take a value, and the flags.
+"""
+
+_JSON = ("--json", "--ndjson")
+
+COMMANDS: dict[str, tuple[str, tuple[str, ...], tuple[str, ...]]] = {
+    "download": (
+        "Use this command to download cute animal images manually in a command line fashion.",
+        (
+            "--category",
+            "--amount",
+            "--workers",
+            "--path",
+            "--cache-dir",
+            "--cache-size",
+            "--reservoir-dir",
+            "--reservoir-size",
+            "--max-rate",
+            "--max-bytes",
+            "--retry",
+            "--hedge-budget",
+            "--deadline",
+            "--output-archive",
+            "--shard-depth",
+            "--writers",
+        ),
+        (
+            "--cache",
+            "--no-cache",
+            "--reservoir",
+            "--no-reservoir",
+            "--hedge",
+            "--no-hedge",
+            "--verify",
+            "--no-verify",
+            *_JSON,
+        ),
+    ),
+    "sync": (
+        "Top a directory up to a target amount of images of each category, only the missing images are downloaded.",
+        ("--target", "--path", "--workers", "--deadline"),
+        _JSON,
+    ),
+    "plan": (
+        "Write the manifest of a large download split into shards, so many machines can share it.",
+        ("--target", "--shards", "--output", "--namespace"),
+        _JSON,
+    ),
+    "run": (
+        "Download one shard of a job planned with 'catto plan', only its missing images are downloaded.",
+        ("--shard", "--path", "--workers", "--deadline"),
+        _JSON,
+    ),
+    "merge": (
+        "Combine the shards of a job into one directory, images that were downloaded twice are merged once.",
+        ("--path", "--output"),
+        _JSON,
+    ),
+    "interactive": ("Run catto in interactive mode. Try it and see!", (), ()),
+    "version": ("Print the version of catto.", (), ()),
+    "status": (
+        "Check the status of each animal API endpoint, Catto is currently using.",
+        (),
+        _JSON,
+    ),
+    "list": (
+        "List the images that catto has saved, newest first, from its catalogue.",
+        (
+            "--category",
+            "--format",
+            "--min-size",
+            "--max-size",
+            "--since",
+            "--until",
+            "--limit",
+        ),
+        _JSON,
+    ),
+    "show-all-categories": (
+        "This command shows all the categories of animals.",
+        (),
+        _JSON,
+    ),
+    "logo": ("Print the catto logo.", (), ("--typewriter", "--no-typewriter")),
+    "fact": (
+        "Get fun facts about the specified animals.",
+        ("--category", "--amount"),
+        _JSON,
+    ),
+    "reservoir": (
+        "Fill the reservoir of images that 'catto download --reservoir' takes its images from.",
+        ("--category", "--target", "--directory", "--rate"),
+        (),
+    ),
+    "serve": (
+        "Run a local HTTP server that serves random animal images from a pool of pre-fetched images.",
+        ("--host", "--port", "--category", "--pool-size", "--rate"),
+        (),
+    ),
+    "watch": (
+        "Keep downloading images into a directory, evicting old images to stay within a disk quota.",
+        (
+            "--category",
+            "--path",
+            "--rate",
+            "--max-disk",
+            "--max-files",
+            "--evict",
+        ),
+        _JSON,
+    ),
+    "touch": (
+        "Mark images as used, so 'catto watch --evict lru' keeps them longer.",
+        (),
+        _JSON,
+    ),
+}
+"""
+The commands of catto, with their help, the options that take a value, and the flags.
+"""
+
+
+def suggest(args: list[str], incomplete: str) -> list[tuple[str, str]]:
+    """
+    This function returns the completions of the word being typed, like the completion of Typer would.
+
+    Parameters:
+        args (list[str]): This parameter takes the words before the word being typed, without the program name.
+        incomplete (str): This parameter takes the word being typed.
+
+    Returns:
+        (list[tuple[str, str]]): The completions, each with its help, which is empty for options and values.
+    """
+    command = None
+    options_with_value, flags = GLOBAL_OPTIONS
+    previous = None
+    for word in args:
+        if previous in options_with_value:
+            previous = None
+            continue
+        if command is None and word in COMMANDS:
+            command = word
+            _, options_with_value, flags = COMMANDS[word]
+        previous = word
+
+    if previous in options_with_value:
+        if previous != "--category":
+            return []
+        # Categories can be passed separated by commas, only the last one is completed.
+        head, comma, last = incomplete.rpartition(",")
+        return [
+            (f"{head}{comma}{name}", "")
+            for name in CATEGORIES
+            if name.startswith(last)
+        ]
+    if incomplete.startswith("-"):
+        return [
+            (option, "")
+            for option in (*options_with_value, *flags, *HELP_OPTIONS)
+            if option.startswith(incomplete)
+        ]
+    if command is None:
+        return [
+            (name, help_text)
+            for name, (help_text, _, _) in COMMANDS.items()
+            if name.startswith(incomplete)
+        ]
+    return []
+
+
+def _arguments(shell: str) -> tuple[list[str], str]:
+    """
+    This function returns the words before the word being typed and the word being typed, from the variables that
+    the completion script of the shell sets.
+    """
+    if shell == "bash":
+        words = shlex.split(os.environ.get("COMP_WORDS", ""))
+        index = int(os.environ.get("COMP_CWORD", "0"))
+        return words[1:index], words[index] if index < len(words) else ""
+    line = os.environ.get("_TYPER_COMPLETE_ARGS", "")
+    words = shlex.split(line)[1:]
+    if shell == "powershell":
+        return words, os.environ.get("_TYPER_COMPLETE_WORD_TO_COMPLETE", "")
+    if words and not line.endswith(" "):
+        return words[:-1], words[-1]
+    return words, ""
+
+
+def complete(instruction: str) -> None:
+    """
+    This function is the fast path of the shell completion of catto. It answers from the static table of the
+    commands, their options and the animal categories, and only needs the standard library, so a TAB press does not
+    pay for importing httpx, PIL, questionary and the rest of catto. The completions are printed in the format of
+    the completion scripts of Typer, and the process exits. Unknown instructions are left to Typer.
+
+    Parameters:
+        instruction (str): This parameter takes the value of :data:`COMPLETE_VARIABLE`, for example
+                           "complete_bash".
+    """
+    shell = instruction.removeprefix("complete_")
+    if shell == "pwsh":
+        shell = "powershell"
+    if shell not in ("bash", "zsh", "fish", "powershell"):
+        return
+    try:
+        args, incomplete = _arguments(shell)
+    except ValueError:
+        # An unbalanced quote in the command line.
+        sys.exit(1)
+    completions = suggest(args, incomplete)
+
+    if shell == "bash":
+        print("\n".join(value for value, _ in completions))
+    elif shell == "zsh":
+
+        def escape(text: str) -> str:
+            return (
+                text.replace('"', '""')
+                .replace("'", "''")
+                .replace("$", "\\$")
+                .replace("`", "\\`")
+            )
+
+        items = "\n".join(
+            f'"{escape(value)}":"{escape(help_text)}"'
+            if help_text
+            else f'"{escape(value)}"'
+            for value, help_text in completions
+        )
+        print(f"_arguments '*: :(({items}))'" if completions else "_files")
+    elif shell == "fish":
+        if os.environ.get("_TYPER_COMPLETE_FISH_ACTION") == "is-args":
+            sys.exit(0 if completions else 1)
+        print(
+            "\n".join(
+                f"{value}\t{help_text}" if help_text else value
+                for value, help_text in completions
+            )
+        )
+    else:
+        print(
+            "\n".join(
+                f"{value}:::{help_text or ' '}"
+                for value, help_text in completions
+            )
+        )
+    sys.exit(0)
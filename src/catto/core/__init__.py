@@ -1,2 +1,17 @@
 from .api import *
+from .cache import *
+from .catalogue import *
+from .cassette import *
+from .hedging import *
+from .hosts import *
 from .interactive import *
+from .manifest import *
+from .output import *
+from .partial import *
+from .prefetch import *
+from .reservoir import *
+from .retry import *
+from .server import *
+from .timeouts import *
+from .validation import *
+from .watch import *
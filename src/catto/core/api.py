@@ -1,29 +1,120 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
-import secrets
+import asyncio
+import contextvars
+import itertools
+import sqlite3
 import sys
+import threading
 import time
-from io import BytesIO
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
+from typing import AsyncIterator, Callable, TypeVar
 
 import httpx
-from PIL import Image
-from PIL.Image import Image as PILImage  # weird naming
 from loguru import logger
-from rich.progress import track
 
-from ..utils.enums import CategoryEnum, ResponseEnum
+from ..utils.enums import CategoryEnum, FailureEnum, ResponseEnum
+from ..utils.events import DownloadProgress, Reporter
 from ..utils.exceptions import (
     InvalidImageURL,
     PathNotFound,
     CategoryFactNotFound,
     ImageDownloadFailed,
     DataFetchFailed,
+    ByteBudgetExceeded,
+    RequestCancelled,
+    DeadlineExceeded,
 )
-from ..utils.helpers import ExponentialBackoff
+from ..utils.helpers import ByteBudget, Deadline, RateLimiter
+from ..utils.tracing import tracer
+from .cache import CacheEntry, ImageCache, _parse_http_date
+from .catalogue import Catalogue
+from .facts import FactStore
+from .hedging import HedgePolicy
+from .hosts import KnownHosts
+from .output import DirectorySink, ImageSink, image_name
+from .partial import PartialStore
+from .retry import RetryPolicy
+from .timeouts import TimeoutPolicy
+from .validation import (
+    SNIFF_SIZE,
+    ImageHeader,
+    ImageVerifier,
+    check_content_type,
+    check_structure,
+    sniff_image,
+)
+
+__all__ = ("Client", "AsyncClient", "ImageRecord")
+
+T = TypeVar("T")
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    """
+    This function returns the time in seconds that the Retry-After header of a response asks to wait, if any.
+    """
+    value = response.headers.get("retry-after")
+    if value is None:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    retry_at = _parse_http_date(value)
+    return None if retry_at is None else max(0.0, retry_at - time.time())
+
+
+def _check_length(response: httpx.Response, received: int) -> None:
+    """
+    This function makes sure that the whole body of a streamed response was received.
+
+    Parameters:
+        response (httpx.Response): This parameter takes the response.
+        received (int): This parameter takes the amount of bytes of the body that this response delivered.
 
-__all__ = ("Client",)
+    Raises:
+        InvalidImageURL: If the body is shorter than its Content-Length header.
+    """
+    length = response.headers.get("content-length")
+    if response.headers.get("content-encoding", "identity") != "identity":
+        # The length counts the encoded bytes.
+        received = response.num_bytes_downloaded
+    if length is not None and received < int(length):
+        raise InvalidImageURL(
+            f"The body is not a valid image: it is truncated, {received} of {length} bytes were received"
+        )
+
+
+def _content_range(response: httpx.Response) -> tuple[int, int | None] | None:
+    """
+    This function returns the first byte and the total size of the body that the Content-Range header of a partial
+    response announces, if it is valid. The total size is None if the server does not know it.
+    """
+    unit, _, value = response.headers.get("content-range", "").partition(" ")
+    span, _, total = value.partition("/")
+    start, _, end = span.partition("-")
+    if unit.lower() != "bytes" or not (start.isdigit() and end.isdigit()):
+        return None
+    return int(start), int(total) if total.isdigit() else None
+
+
+def _range_validator(response: httpx.Response) -> str | None:
+    """
+    This function returns the validator that a request for the rest of the body of a response can be sent with in
+    an `If-Range` header, None if the server does not serve ranges of it. Weak ETags can't be used, they don't
+    promise that the bytes are the same.
+    """
+    if response.headers.get("accept-ranges", "").lower() != "bytes":
+        return None
+    if response.headers.get("content-encoding", "identity") != "identity":
+        return None
+    etag = response.headers.get("etag")
+    if etag is not None and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("last-modified")
 
 
 class Client:
@@ -32,14 +123,364 @@ class Client:
     :class:`AnimalAPIEndpoint`.
     """
 
-    def __init__(self):
-        self.__backoff = ExponentialBackoff(base=0.05)
-        self.__inner_url: str | None = None
+    CHUNK_SIZE: int = 16 * 1024
+    """
+    The size in bytes of the chunks that image bodies are read in.
+    """
+
+    MAX_RESUMES: int = 3
+    """
+    The amount of times the transfer of an image body is continued with a `Range` request after its connection
+    failed, before the failure is given up on.
+    """
 
-    @staticmethod
-    def fetch_image_url_of_endpoint(animal: CategoryEnum) -> str | None:
+    def __init__(
+        self,
+        cache: ImageCache | None = None,
+        fact_store: FactStore | None = None,
+        rate_limiter: RateLimiter | None = None,
+        bandwidth_limiter: RateLimiter | None = None,
+        byte_budget: ByteBudget | None = None,
+        reporter: Reporter | None = None,
+        retry_policy: RetryPolicy | None = None,
+        known_hosts: KnownHosts | None = None,
+        verifier: ImageVerifier | None = None,
+        transport: httpx.BaseTransport | None = None,
+        hedge_policy: HedgePolicy | None = None,
+        catalogue: Catalogue | None = None,
+        partial_store: PartialStore | None = None,
+        timeout_policy: TimeoutPolicy | None = None,
+        deadline: Deadline | None = None,
+    ):
+        """
+        Parameters:
+            cache (ImageCache | None): This parameter takes the on-disk cache to serve image bodies from. Caching is
+                                       disabled if set to None. Default: None.
+            fact_store (FactStore | None): This parameter takes the local store of facts. Defaults to the store in
+                                           catto's cache directory.
+            rate_limiter (RateLimiter | None): This parameter takes the rate limiter for the requests made to the
+                                               API endpoints. Default: 5 requests per second.
+            bandwidth_limiter (RateLimiter | None): This parameter takes the rate limiter for the bytes of image
+                                                    bodies, shared by all concurrent transfers. Default: None.
+            byte_budget (ByteBudget | None): This parameter takes the total amount of bytes that image transfers may
+                                             use. Default: None.
+            reporter (Reporter | None): This parameter takes the reporter that receives the events of downloads.
+                                        Defaults to a live progress view.
+            retry_policy (RetryPolicy | None): This parameter takes the policy that retries the images of a download
+                                               that failed temporarily. Defaults to the default rules.
+            known_hosts (KnownHosts | None): This parameter takes the store of the hosts that images were served
+                                             from, which :meth:`warm_up` connects to ahead of time. Defaults to the
+                                             store in catto's cache directory.
+            verifier (ImageVerifier | None): This parameter takes the verifier that fully checks the integrity of
+                                             downloaded images in the background, images are only checked by their
+                                             headers if set to None. Default: None.
+            transport (httpx.BaseTransport | None): This parameter takes the transport the requests are sent with,
+                                                    for example to record or replay them. Defaults to the network.
+            hedge_policy (HedgePolicy | None): This parameter takes the policy that sends a copy of the metadata and
+                                               image requests that are slower than usual. Hedging is disabled if set
+                                               to None. Default: None.
+            catalogue (Catalogue | None): This parameter takes the catalogue that every saved image is recorded in.
+                                          Images are not recorded if set to None. Default: None.
+            partial_store (PartialStore | None): This parameter takes the store that keeps the bodies of failed
+                                                 transfers, so they are continued instead of started over. Defaults
+                                                 to the store in catto's cache directory.
+            timeout_policy (TimeoutPolicy | None): This parameter takes the timeouts of the phases of each kind of
+                                                   request. Default: 30 seconds for every phase.
+            deadline (Deadline | None): This parameter takes the time that downloads may take, once it has passed
+                                        the requests in flight are abandoned and the download stops. Default: None.
+        """
+        self.__local = threading.local()
+        self.__cache = cache
+        self.__fact_store = fact_store or FactStore()
+        self.__rate_limiter = rate_limiter or RateLimiter()
+        self.__bandwidth_limiter = bandwidth_limiter
+        self.__byte_budget = byte_budget
+        self.__reporter = reporter or DownloadProgress()
+        self.__retry_policy = retry_policy or RetryPolicy()
+        self.__known_hosts = known_hosts or KnownHosts()
+        self.__verifier = verifier
+        self.__transport = transport
+        self.__hedge_policy = hedge_policy
+        self.__catalogue = catalogue
+        self.__partial_store = partial_store or PartialStore()
+        self.__timeout_policy = timeout_policy or TimeoutPolicy()
+        self.__deadline = deadline
+        self.__session: httpx.Client | None = None
+        self.__session_lock = threading.Lock()
+
+    @property
+    def cache(self) -> ImageCache | None:
+        """
+        This property returns the on-disk cache of image bodies, or None if caching is disabled.
+        """
+        return self.__cache
+
+    @cache.setter
+    def cache(self, cache: ImageCache | None) -> None:
+        self.__cache = cache
+
+    @property
+    def fact_store(self) -> FactStore:
+        """
+        This property returns the local store of facts.
+        """
+        return self.__fact_store
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        """
+        This property returns the rate limiter for the requests made to the API endpoints.
+        """
+        return self.__rate_limiter
+
+    @property
+    def bandwidth_limiter(self) -> RateLimiter | None:
+        """
+        This property returns the rate limiter for the bytes of image bodies, or None if the bandwidth is unlimited.
+        """
+        return self.__bandwidth_limiter
+
+    @bandwidth_limiter.setter
+    def bandwidth_limiter(self, bandwidth_limiter: RateLimiter | None) -> None:
+        self.__bandwidth_limiter = bandwidth_limiter
+
+    @property
+    def byte_budget(self) -> ByteBudget | None:
+        """
+        This property returns the total amount of bytes that image transfers may use, or None if it is unlimited.
+        """
+        return self.__byte_budget
+
+    @byte_budget.setter
+    def byte_budget(self, byte_budget: ByteBudget | None) -> None:
+        self.__byte_budget = byte_budget
+
+    @property
+    def timeout_policy(self) -> TimeoutPolicy:
+        """
+        This property returns the timeouts of the phases of each kind of request.
+        """
+        return self.__timeout_policy
+
+    @timeout_policy.setter
+    def timeout_policy(self, timeout_policy: TimeoutPolicy) -> None:
+        self.__timeout_policy = timeout_policy
+
+    @property
+    def deadline(self) -> Deadline | None:
+        """
+        This property returns the time that downloads may take, or None if it is unlimited.
+        """
+        return self.__deadline
+
+    @deadline.setter
+    def deadline(self, deadline: Deadline | None) -> None:
+        self.__deadline = deadline
+
+    def __timeout(self, kind: str) -> httpx.Timeout:
+        """
+        This method returns the timeouts of a kind of request, cut to the time left before the deadline.
+
+        Raises:
+            DeadlineExceeded: If the deadline has passed.
+        """
+        return self.__timeout_policy.timeout(kind, self.__deadline)
+
+    @property
+    def session(self) -> httpx.Client:
+        """
+        This property returns the HTTP client shared by all the requests of this client, so connections to the API
+        endpoints and the image hosts are kept open and reused.
+        """
+        with self.__session_lock:
+            if self.__session is None:
+                self.__session = httpx.Client(
+                    timeout=30.0, transport=self.__transport
+                )
+            return self.__session
+
+    @property
+    def transport(self) -> httpx.BaseTransport | None:
+        """
+        This property returns the transport the requests are sent with, None if they are sent over the network.
+        """
+        return self.__transport
+
+    @transport.setter
+    def transport(self, transport: httpx.BaseTransport | None) -> None:
+        self.close()
+        self.__transport = transport
+
+    @property
+    def hedge_policy(self) -> HedgePolicy | None:
+        """
+        This property returns the policy that hedges slow requests, None if hedging is disabled.
+        """
+        return self.__hedge_policy
+
+    @hedge_policy.setter
+    def hedge_policy(self, hedge_policy: HedgePolicy | None) -> None:
+        self.__hedge_policy = hedge_policy
+
+    def __hedged(
+        self, kind: str, request: Callable[[threading.Event | None], T]
+    ) -> T:
+        """
+        This method makes a request through the hedge policy, if hedging is enabled.
+        """
+        if self.__hedge_policy is None:
+            return request(None)
+        return self.__hedge_policy.call(kind, request)
+
+    @property
+    def catalogue(self) -> Catalogue | None:
+        """
+        This property returns the catalogue that saved images are recorded in, None if they are not recorded.
+        """
+        return self.__catalogue
+
+    @catalogue.setter
+    def catalogue(self, catalogue: Catalogue | None) -> None:
+        self.__catalogue = catalogue
+
+    @property
+    def partial_store(self) -> PartialStore:
+        """
+        This property returns the store that keeps the bodies of failed transfers.
+        """
+        return self.__partial_store
+
+    @property
+    def known_hosts(self) -> KnownHosts:
+        """
+        This property returns the store of the hosts that images were served from.
+        """
+        return self.__known_hosts
+
+    def close(self) -> None:
+        """
+        This method closes the connections of the shared HTTP client.
         """
-        This method fetches and returns the image url from the API response for the specified animal category.
+        with self.__session_lock:
+            if self.__session is not None:
+                self.__session.close()
+                self.__session = None
+
+    def warm_up(
+        self, categories: list[CategoryEnum], *, wait: float | None = None
+    ) -> None:
+        """
+        This method resolves and connects to the API endpoint host and the known image hosts of the categories in
+        the background, all at the same time, so the first requests don't pay for DNS, TCP and TLS one after the
+        other. Failures are ignored, the requests will simply connect themselves.
+
+        Parameters:
+            categories (list[CategoryEnum]): This parameter takes the categories that are about to be used.
+            wait (float | None): This parameter takes the maximum time in seconds to wait for the connections,
+                                 None returns right away. Default: None.
+        """
+        hosts: dict[str, None] = {}
+        for category in categories:
+            hosts[httpx.URL(str(category.value)).host] = None
+            for host in self.__known_hosts.hosts(category):
+                hosts[host] = None
+
+        threads = [
+            threading.Thread(
+                target=self.__connect,
+                args=(host,),
+                name=f"catto-warm-up-{host}",
+                daemon=True,
+            )
+            for host in hosts
+        ]
+        for thread in threads:
+            thread.start()
+        if wait is not None:
+            deadline = time.monotonic() + wait
+            for thread in threads:
+                thread.join(max(0.0, deadline - time.monotonic()))
+
+    def __connect(self, host: str) -> None:
+        """
+        This method opens a connection to the host, which stays in the pool of the shared HTTP client.
+        """
+        try:
+            self.session.head(f"https://{host}/", timeout=10.0)
+        except (httpx.HTTPError, OSError) as e:
+            logger.debug(f"Failed to warm up the connection to {host}: {e!r}")
+
+    @property
+    def verifier(self) -> ImageVerifier | None:
+        """
+        This property returns the verifier that fully checks downloaded images in the background, if any.
+        """
+        return self.__verifier
+
+    @verifier.setter
+    def verifier(self, verifier: ImageVerifier | None) -> None:
+        self.__verifier = verifier
+
+    @property
+    def reporter(self) -> Reporter:
+        """
+        This property returns the reporter that receives the events of downloads.
+        """
+        return self.__reporter
+
+    @reporter.setter
+    def reporter(self, reporter: Reporter) -> None:
+        self.__reporter = reporter
+
+    @property
+    def retry_policy(self) -> RetryPolicy:
+        """
+        This property returns the policy that retries the images of a download that failed temporarily.
+        """
+        return self.__retry_policy
+
+    @retry_policy.setter
+    def retry_policy(self, retry_policy: RetryPolicy) -> None:
+        self.__retry_policy = retry_policy
+
+    def probe_endpoint(self, category: CategoryEnum) -> httpx.Response:
+        """
+        This method makes a GET HTTP request to the API endpoint of the specified category, to check its status.
+
+        Parameters:
+            category (CategoryEnum): This parameter takes the animal category.
+
+        Returns:
+            (httpx.Response): The response of the API endpoint.
+        """
+        return self.session.get(
+            str(category.value), timeout=self.__timeout_policy.timeout("probe")
+        )
+
+    def __request_metadata(
+        self, animal: CategoryEnum, cancelled: threading.Event | None = None
+    ) -> httpx.Response:
+        """
+        This method requests the json response holding the image url of a category. Once the `cancelled` event is
+        set, the request is abandoned before it is sent, or when its response arrives.
+
+        Raises:
+            RequestCancelled: If the request was abandoned.
+        """
+        url = str(CategoryEnum[animal.name].value)
+        if cancelled is not None and cancelled.is_set():
+            raise RequestCancelled(f"The request to {url} was abandoned.")
+        response = self.session.get(url=url, timeout=self.__timeout("metadata"))
+        if cancelled is not None and cancelled.is_set():
+            response.close()
+            raise RequestCancelled(f"The request to {url} was abandoned.")
+        return response
+
+    @tracer.traced
+    def fetch_image_url_of_endpoint(self, animal: CategoryEnum) -> str | None:
+        """
+        This method fetches and returns the image url from the API response for the specified animal category. The
+        fact that comes along with the image url is kept in the local fact store.
 
         Parameters:
             animal (AnimalAPIEndpoint): This parameter takes the animal category from the enum.
@@ -48,8 +489,10 @@ class Client:
             (str): The url of the image.
         """
 
-        with httpx.Client(timeout=30) as client:
-            response = client.get(url=str(CategoryEnum[animal.name].value))
+        response = self.__hedged(
+            "metadata", partial(self.__request_metadata, animal)
+        )
+        tracer.current().set(category=animal.name, status=response.status_code)
         if response.status_code != 200:
             raise DataFetchFailed(
                 f"Failed to fetch the image url for animal {animal.name} from  the API endpoint "
@@ -57,6 +500,7 @@ class Client:
                 status_code=response.status_code,
                 reason=response.reason_phrase,
                 url=response.url.__str__(),
+                retry_after=_retry_after(response),
             )
 
         data: dict[str, str] = response.json()
@@ -82,23 +526,34 @@ class Client:
             enum_data.interface.key_that_contains_image_url
         ]  # Getting the corresponding url for the animal type using
         # the Enum which stores the key.
+        fact = data.get(enum_data.interface.key_that_contains_fact)
+        if fact:
+            self.__fact_store.add(animal, [fact], refreshed=False)
+        tracer.current().set(url=url_of_image)
         return url_of_image
 
     @staticmethod
-    def fetch_fact_about_the_category(category: CategoryEnum) -> str | None:
+    def fetch_fact_about_the_category(
+        category: CategoryEnum, session: httpx.Client | None = None
+    ) -> str | None:
         """
         This method gets a random factual information about the specified animal category from
         the enum :class:`AnimalAPIEndpoint`.
 
         Parameters:
             category (AnimalAPIEndpoint): This parameter takes the animal category from the enum.
+            session (httpx.Client | None): This parameter takes the HTTP client to make the request with, to reuse
+                                           its connections. Defaults to a new HTTP client.
 
         Returns:
             Optional[str]: The fact about the animal, if the API endpoint returns the fact in their json response, else
             None.
         """
-        with httpx.Client(timeout=30.0) as client:
-            response = client.get(str(CategoryEnum[category.name].value))
+        if session is not None:
+            response = session.get(str(CategoryEnum[category.name].value))
+        else:
+            with httpx.Client(timeout=30.0) as client:
+                response = client.get(str(CategoryEnum[category.name].value))
 
         if response.status_code != 200:
             logger.error(
@@ -117,83 +572,523 @@ class Client:
             )
         return fact
 
-    @staticmethod
+    def fetch_facts_about_the_category(
+        self,
+        category: CategoryEnum,
+        amount: int,
+        *,
+        workers: int = 4,
+        offline: bool = False,
+    ) -> list[str]:
+        """
+        This method returns unique random facts about the specified animal category. The facts are served from the
+        local fact store when it has enough of them, stale facts are refreshed in the background. Otherwise, the
+        missing facts are fetched concurrently from the API endpoint, as fast as the rate limiter allows.
+
+        Parameters:
+            category (CategoryEnum): This parameter takes the animal category.
+            amount (int): This parameter takes the amount of facts to return.
+            workers (int): This parameter takes the amount of concurrent requests. Default: 4.
+            offline (bool): This parameter takes a boolean, if True, the facts are only served from the store.
+                            Default: False.
+
+        Returns:
+            (list[str]): The facts, there may be less than `amount` facts if the API endpoint or the store did not
+                         return enough unique facts.
+
+        Raises:
+            CategoryFactNotFound: If the APIs json response does not contain a fact about the animal.
+        """
+        stored = self.__fact_store.sample(category, amount)
+        if offline:
+            return stored
+
+        if len(stored) >= amount:
+            if self.__fact_store.is_stale(category):
+                self.__fact_store.refresh_in_background(
+                    category,
+                    lambda: self.__fetch_unique_facts(
+                        category, amount, workers
+                    ),
+                )
+            return stored
+
+        facts = self.__fetch_unique_facts(category, amount, workers)
+        self.__fact_store.add(category, facts)
+        # Top up with the stored facts when the API endpoint keeps repeating itself.
+        facts += [fact for fact in stored if fact not in facts]
+        return facts[:amount]
+
+    def __fetch_unique_facts(
+        self, category: CategoryEnum, amount: int, workers: int
+    ) -> list[str]:
+        """
+        This method fetches facts concurrently until it has `amount` unique facts, or it gave up after making three
+        times as many requests.
+        """
+
+        def fetch() -> str | None:
+            self.__rate_limiter.acquire()
+            return self.fetch_fact_about_the_category(category, self.session)
+
+        facts: dict[str, None] = {}
+        attempts = 0
+        pending: set[Future[str | None]] = set()
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="catto-facts"
+        ) as executor:
+            while len(facts) < amount:
+                while attempts < amount * 3 and len(pending) < min(
+                    workers, amount - len(facts)
+                ):
+                    pending.add(executor.submit(fetch))
+                    attempts += 1
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        fact = future.result()
+                    except httpx.HTTPError as e:
+                        logger.warning(
+                            f"Failed to fetch a fact about {category.name}: {e}"
+                        )
+                        continue
+                    if fact is not None:
+                        facts[fact] = None
+            for future in pending:
+                future.cancel()
+        return list(facts)[:amount]
+
+    def fetch_image_from_url(self, url_of_image: str) -> tuple[bytes, str]:
+        """
+        This method fetches an image into memory, without saving it anywhere. The image cache is used, if one is
+        configured.
+
+        Parameters:
+            url_of_image (str): This parameter takes the url of the image to fetch.
+
+        Returns:
+            (tuple[bytes, str]): The body of the image, and its format in lowercase, for example "png".
+
+        Raises:
+            DataFetchFailed: If the image could not be fetched.
+            InvalidImageURL: If the url does not point to a valid image.
+            ByteBudgetExceeded: If fetching the image would go over the byte budget.
+        """
+        entry, data, header = self.__fetch_image(url_of_image)
+        if data is None:
+            return self.__cache.path_of(entry).read_bytes(), entry.format
+        return data, header.format
+
+    @tracer.traced
     def save_image_from_url(
-        url_of_image: str, path: Path, animal: CategoryEnum
+        self,
+        url_of_image: str,
+        path: Path,
+        animal: CategoryEnum,
+        sink: ImageSink | None = None,
     ) -> dict[str, str | Path] | None:
         """
-        This method takes an image url, fetches it, and saves it to the specified path.
+        This method takes an image url, fetches it, and saves it to the specified path. If a cache is configured,
+        a fresh cached body is placed in the directory without any network transfer, and a stale one is revalidated
+        with the server using a conditional request.
 
         Parameters:
             url_of_image (str): This parameter takes the url of the image to download.
             path (pathlib.Path): This parameter takes the path to the directory where the image needs to be saved.
             animal (CategoryEnum): This parameter takes the animal category that the user chose.
+            sink (ImageSink | None): This parameter takes the sink to write the image to, for example an archive.
+                                     Defaults to writing the image into the directory at `path`.
 
         Returns:
-           Optional[dict[str, Union[str, Path, Image]]]: A dictionary containing the path to directory, where the images are
-                                                 saved, the name of the image file and the image as a :class:`PIL.Image`
-                                                 object.
+           Optional[dict[str, Union[str, Path]]]: A dictionary containing the path to directory, where the images are
+                                                  saved, the name of the image file and the location of the sink.
 
         Raises:
             PathNotFound: If the directory does not exist.
             InvalidImage: If the image is not a valid image.
+            ByteBudgetExceeded: If fetching the image would go over the byte budget.
         """
-        if not path.is_dir():
-            raise PathNotFound(f"'{path.name}' is not a valid directory.")
+        tracer.current().set(category=animal.name, url=url_of_image)
+        if sink is None:
+            sink = DirectorySink(path)
 
-        with httpx.Client(timeout=30.0) as client:
-            response = client.get(url_of_image, follow_redirects=True)
+        name = self.__saved_name(
+            self.__submit_image(url_of_image, animal, sink), url_of_image
+        )
+        return {
+            "path": path.absolute(),
+            "name": name,
+            "location": sink.location,
+        }
 
-        if response.status_code != 200:
-            raise DataFetchFailed(
-                f"Failed to fetch image from url '{url_of_image}",
-                status_code=response.status_code,
-                reason=response.reason_phrase,
-                url=url_of_image,
+    def __submit_image(
+        self, url_of_image: str, animal: CategoryEnum, sink: ImageSink
+    ) -> Future[str]:
+        """
+        This method fetches an image and hands its body to the sink, which may write it in the background. A
+        cached body is read into memory first, so the write doesn't depend on the cache keeping it.
+
+        Returns:
+            (concurrent.futures.Future[str]): A future holding the name the image was written with.
+        """
+        entry, data, header = self.__fetch_image(url_of_image)
+        self.__known_hosts.add(animal, httpx.URL(url_of_image).host)
+        if data is not None and self.__verifier is not None:
+            self.__verifier.submit(url_of_image, data)
+        if data is None:
+            # The cached body is read now, a write that runs later could find it evicted by then.
+            data, format = (
+                self.__cache.path_of(entry).read_bytes(),
+                entry.format,
+            )
+        else:
+            format = header.format
+        future = sink.submit(image_name(animal, format), data)
+        if self.__catalogue is not None:
+            future.add_done_callback(
+                partial(
+                    self.__catalogue_image,
+                    animal,
+                    url_of_image,
+                    sink.location,
+                    data,
+                )
             )
+        return future
 
-        data: bytes = response.content
+    def __catalogue_image(
+        self,
+        animal: CategoryEnum,
+        url_of_image: str,
+        location: str,
+        data: bytes,
+        future: Future[str],
+    ) -> None:
+        """
+        This method records an image in the catalogue once its write has finished, a catalogue that can't be
+        written doesn't fail the download.
+        """
+        if future.exception() is not None:
+            return
         try:
-            image: PILImage = Image.open(BytesIO(data))
-        except Exception as e:
-            raise InvalidImageURL(
-                f"Failed to read image from url {response.url}.\nReason: {e}"
+            self.__catalogue.add(
+                animal, future.result(), location, data, url_of_image
+            )
+        except sqlite3.Error as e:
+            logger.warning(
+                f"Failed to record the image {url_of_image} in the catalogue: {e}"
             )
-        hex_code = secrets.token_hex(4)
 
+    @staticmethod
+    def __saved_name(future: Future[str], url_of_image: str) -> str:
+        """
+        This method waits for the write of an image and returns its name.
+
+        Raises:
+            ImageDownloadFailed: If the image could not be written.
+        """
         try:
-            image.save(
-                f"{str(path.absolute())}/{animal.name}-image-{hex_code}.{image.format.lower()}",
-                format=image.format.lower(),
-            )
-        except Exception as e:
+            return future.result()
+        except OSError as e:
             raise ImageDownloadFailed(
-                f"An exception occurred while trying to save an image: {image.info}/n{e}",
-                image=image.info,
+                f"An exception occurred while trying to save an image: {url_of_image}\n{e}",
+                image=url_of_image,
                 reason=str(e),
             )
 
-        return {
-            "path": path.absolute(),
-            "name": f"{animal.name}-image-{hex_code}.{image.format.lower()}",
-        }
+    def __fetch_and_submit(
+        self, animal: CategoryEnum, sink: ImageSink
+    ) -> tuple[str, Future[str]]:
+        """
+        This method fetches the url of a new image and hands the image to the sink, it is the unit that the retry
+        policy retries, so an invalid image is replaced by a new one.
+
+        Returns:
+            (tuple[str, concurrent.futures.Future[str]]): The url of the image, and the future of its write.
+        """
+        self.__local.url = None
+        url = self.fetch_image_url_of_endpoint(animal=animal)
+        self.__local.url = url
+        return url, self.__submit_image(url, animal, sink)
+
+    def __report_retry(
+        self,
+        animal: CategoryEnum,
+        failure: FailureEnum,
+        attempt: int,
+        wait: float,
+        error: BaseException,
+    ) -> None:
+        """
+        This method reports an image that is retried after a temporary failure.
+
+        Raises:
+            DeadlineExceeded: If the retry would only start after the deadline.
+        """
+        if self.__deadline is not None and wait >= self.__deadline.remaining:
+            raise DeadlineExceeded(
+                f"The retry of an image of {animal.name} would start after the deadline.",
+                deadline=self.__deadline.seconds,
+                elapsed=self.__deadline.elapsed,
+            ) from error
+        logger.warning(
+            f"Retrying an image of {animal.name} in {wait:.2f}s after a {failure} failure "
+            f"(retry {attempt}): {error!r}"
+        )
+        self.__reporter.emit(
+            "image_retry",
+            category=animal.name,
+            failure=failure,
+            attempt=attempt,
+            wait=round(wait, 3),
+            url=getattr(self.__local, "url", None),
+        )
+
+    def __report_saved(
+        self,
+        animal: CategoryEnum,
+        url_of_image: str,
+        location: str,
+        future: Future[str],
+    ) -> None:
+        """
+        This method reports an image once its write has finished, failed writes are reported by the download.
+        """
+        if future.exception() is None:
+            self.__reporter.emit(
+                "image_saved",
+                category=animal.name,
+                name=future.result(),
+                url=url_of_image,
+                location=location,
+            )
+
+    @tracer.traced
+    def __fetch_image(
+        self, url_of_image: str
+    ) -> tuple[CacheEntry | None, bytes | None, ImageHeader | None]:
+        """
+        This method fetches an image through the image cache, if one is configured. A transferred image is only
+        checked by its header and its end, it is not decoded.
+
+        Returns:
+            (tuple[CacheEntry | None, bytes | None, ImageHeader | None]): The cache entry holding the image, if it
+                                                                         is cached, and the body and the header of
+                                                                         the image if it was transferred.
+
+        Raises:
+            InvalidImageURL: If the body is not an image, or it is truncated.
+        """
+        span = tracer.current()
+        span.set(url=url_of_image)
+        headers: dict[str, str] = {}
+        entry = None
+        if self.__cache is not None:
+            entry = self.__cache.lookup(url_of_image)
+            if entry is not None and entry.is_fresh():
+                span.set(cached=True)
+                return entry, None, None
+            if entry is not None:
+                headers = entry.validators()
+
+        response, data, header = self.__hedged(
+            "image", partial(self.__stream_image, url_of_image, headers)
+        )
+        span.set(status=response.status_code)
+        if response.status_code == 304 and entry is not None:
+            entry = self.__cache.revalidated(entry, dict(response.headers))
+            return entry, None, None
+
+        if header is None:
+            raise DataFetchFailed(
+                f"Failed to fetch image from url '{url_of_image}",
+                status_code=response.status_code,
+                reason=response.reason_phrase,
+                url=url_of_image,
+                retry_after=_retry_after(response),
+            )
+
+        check_structure(header, data)
+        span.set(bytes=len(data), format=header.format)
+        entry = None
+        if self.__cache is not None:
+            entry = self.__cache.store(
+                url_of_image, data, header.format, dict(response.headers)
+            )
+        return entry, data, header
+
+    def __stream_image(
+        self,
+        url_of_image: str,
+        headers: dict[str, str],
+        cancelled: threading.Event | None = None,
+    ) -> tuple[httpx.Response, bytes, ImageHeader | None]:
+        """
+        This method streams the body of an image, the bandwidth limiter is applied to every chunk read from the
+        connection, and the bytes are taken from the byte budget as they arrive. The header of the image is checked
+        as soon as its first bytes arrive, so an error page is dropped without transferring the rest of it. Once the
+        `cancelled` event is set, the transfer is abandoned at the next chunk.
+
+        If the connection fails halfway and the host serves ranges of the body, the bytes received so far are kept
+        in the partial store, and the rest is requested with a `Range` request, at most :attr:`MAX_RESUMES` times.
+        A partial body kept by an earlier run is continued the same way. The complete body is checked against the
+        size announced by the host before it is returned.
+
+        Returns:
+            (tuple[httpx.Response, bytes, ImageHeader | None]): The last response, the whole body and the header of
+                                                               the image, the body is empty and the header is None
+                                                               unless the status is 200 or 206.
+
+        Raises:
+            ByteBudgetExceeded: If the body would go over the byte budget.
+            InvalidImageURL: If the body is not an image, or it is truncated.
+            RequestCancelled: If the transfer was abandoned.
+        """
+        body = bytearray()
+        header = None
+        total = validator = None
+        kept = False
+        if not headers:
+            # A conditional request is answered by the cache, not continued.
+            stored = self.__partial_store.load(url_of_image)
+            if stored is not None:
+                kept = True
+                body.extend(stored.data)
+                total, validator = stored.length, stored.validator
 
+        for resumes in itertools.count():
+            request_headers = dict(headers)
+            if body:
+                request_headers.update(
+                    {"range": f"bytes={len(body)}-", "if-range": validator}
+                )
+            offset = len(body)
+            try:
+                with self.session.stream(
+                    "GET",
+                    url_of_image,
+                    follow_redirects=True,
+                    headers=request_headers,
+                    timeout=self.__timeout("image"),
+                ) as response:
+                    content_range = _content_range(response)
+                    if response.status_code == 206 and body:
+                        if content_range is None or content_range[0] != offset:
+                            # The host sent another range than asked for.
+                            self.__partial_store.discard(url_of_image)
+                            body.clear()
+                            header = total = validator = None
+                            continue
+                        total = content_range[1] or total
+                    elif response.status_code == 200:
+                        # The whole body is sent, the host can't continue it.
+                        body.clear()
+                        offset = 0
+                        header = None
+                        validator = _range_validator(response)
+                        length = response.headers.get("content-length")
+                        encoding = response.headers.get(
+                            "content-encoding", "identity"
+                        )
+                        total = (
+                            int(length)
+                            if length is not None and encoding == "identity"
+                            else None
+                        )
+                        check_content_type(response.headers.get("content-type"))
+                    elif body:
+                        # The kept bytes can't be continued, for example because the range is not satisfiable.
+                        self.__partial_store.discard(url_of_image)
+                        body.clear()
+                        header = total = validator = None
+                        continue
+                    else:
+                        return response, b"", None
+                    length = response.headers.get("content-length")
+                    if self.__byte_budget is not None and length is not None:
+                        # Refuse bodies that can't fit before transferring anything.
+                        self.__byte_budget.check(int(length))
+                    self.__reporter.transfer_started(
+                        url_of_image,
+                        int(length) if length is not None else None,
+                    )
+                    for chunk in response.iter_bytes(self.CHUNK_SIZE):
+                        if cancelled is not None and cancelled.is_set():
+                            raise RequestCancelled(
+                                f"The transfer of {url_of_image} was abandoned."
+                            )
+                        if self.__deadline is not None:
+                            self.__deadline.check()
+                        if self.__byte_budget is not None:
+                            self.__byte_budget.consume(len(chunk))
+                        if self.__bandwidth_limiter is not None:
+                            self.__bandwidth_limiter.acquire(len(chunk))
+                        self.__reporter.transferred(len(chunk))
+                        body.extend(chunk)
+                        if header is None and len(body) >= SNIFF_SIZE:
+                            header = sniff_image(bytes(body[:SNIFF_SIZE]))
+                    if header is None:
+                        header = sniff_image(bytes(body))
+                    _check_length(response, len(body) - offset)
+            except DeadlineExceeded:
+                if len(body) > offset and validator is not None and total:
+                    # The next run continues the transfer.
+                    self.__partial_store.save(
+                        url_of_image, bytes(body), total, validator
+                    )
+                raise
+            except httpx.TransportError:
+                if len(body) <= offset or validator is None or total is None:
+                    raise
+                self.__partial_store.save(
+                    url_of_image, bytes(body), total, validator
+                )
+                kept = True
+                if resumes >= self.MAX_RESUMES:
+                    raise
+                logger.debug(
+                    f"The transfer of {url_of_image} failed after {len(body)} of {total} bytes, continuing it."
+                )
+                continue
+
+            if kept:
+                self.__partial_store.discard(url_of_image)
+            if total is not None and len(body) != total:
+                raise InvalidImageURL(
+                    f"The body is not a valid image: {len(body)} of {total} bytes were received"
+                )
+            return response, bytes(body), header
+
+    @tracer.traced
     def download(
-        self, animal: CategoryEnum, amount: int, path: Path
+        self,
+        animal: CategoryEnum,
+        amount: int,
+        path: Path,
+        sink: ImageSink | None = None,
+        *,
+        workers: int = 4,
     ) -> dict[str, Path | list[str]]:
         """
-        This method downloads the image from the url and saves it to the path.
+        This method downloads the image from the url and saves it to the path. The images are downloaded by a pool
+        of worker threads, paced by the rate limiter of the client. An image that fails even after its retries is
+        replaced by another one while the budget of the retry policy allows it, a download that still ends up with
+        fewer images emits a "download_incomplete" event.
 
         Parameters:
             animal (CategoryEnum): This parameter takes the category of animal to download.
             path (pathlib.Path): This parameter takes the path to the directory to download the images into.
             amount (int): This parameter takes the amount of images to download.
+            sink (ImageSink | None): This parameter takes the sink to write the images to, for example an archive.
+                                     Defaults to writing the images into the directory at `path`.
+            workers (int): This parameter takes the amount of images downloaded at the same time. Default: 4.
 
         Returns:
             dict[str, Union[list[str], Path]]: A dictionary containing the names of the images that were downloaded,
                                                and the directory as a Path object.
         """
-        image_names: list[str] = []
         try:
             ImageEnum = CategoryEnum[animal.name]  # returns the enum for that
             # animal
@@ -204,57 +1099,480 @@ class Client:
                 f"{', '.join([animal.name for animal in CategoryEnum])}"
             )
             sys.exit(1)
-        for i in range(amount):
+        if sink is None:
             try:
-                url = self.fetch_image_url_of_endpoint(animal=ImageEnum)
-            except DataFetchFailed as e:
+                sink = DirectorySink(path)
+            except PathNotFound:
                 logger.error(
-                    f"Error occurred while fetching image url for animal {animal.name} from  the API endpoint "
-                    f"{CategoryEnum[animal.name].value}.\n"
-                    f"Status code: {e.status_code}.\nReason: {e.reason}"
-                )
-                continue
-            self.__inner_url = url
-            try:
-                data = self.save_image_from_url(
-                    url_of_image=url, path=path, animal=ImageEnum
+                    f"Directory '{path.name}' does not exist in parent directory '{path.absolute().parent.name}', "
+                    f"failed to save image."
                 )
-                image_names.append(data["name"])
+                sys.exit(1)
+
+        tracer.current().set(
+            category=animal.name, amount=amount, location=sink.location
+        )
+        self.__reporter.emit(
+            "download_started",
+            category=animal.name,
+            amount=amount,
+            location=sink.location,
+        )
+        image_names: list[str] = []
+        if amount > 0:
+            numbers = itertools.count(1)
+            stopped = threading.Event()
+            pending: list[tuple[str, Future[str]]] = []
+            # The live view stays open until the sink has written the images, which may happen in the background.
+            with self.__reporter:
+                with ThreadPoolExecutor(
+                    max_workers=max(1, min(workers, amount)),
+                    thread_name_prefix="catto-download",
+                    initializer=lambda: setattr(
+                        self.__local, "worker", next(numbers)
+                    ),
+                ) as executor:
+
+                    def submit() -> Future[tuple[str, Future[str]] | None]:
+                        # Every image runs in a copy of the context, so its spans are part of the span of the
+                        # download.
+                        return executor.submit(
+                            contextvars.copy_context().run,
+                            self.__download_one,
+                            ImageEnum,
+                            sink,
+                            stopped,
+                        )
+
+                    running = {submit() for _ in range(amount)}
+                    while running:
+                        done, running = wait(
+                            running, return_when=FIRST_COMPLETED
+                        )
+                        for result in done:
+                            if (item := result.result()) is not None:
+                                pending.append(item)
+                            elif (
+                                not stopped.is_set()
+                                and self.__retry_policy.budget.try_retry()
+                            ):
+                                # Another image takes the place of the failed one, while the budget allows it.
+                                running.add(submit())
 
-            except InvalidImageURL:
+                for url, future in pending:
+                    try:
+                        image_names.append(self.__saved_name(future, url))
+                    except ImageDownloadFailed as e:
+                        logger.error(
+                            f"Error occurred while trying to save the image {e.image}\nReason: {e.reason}"
+                        )
+                        self.__reporter.emit(
+                            "image_failed",
+                            category=animal.name,
+                            stage="write",
+                            url=url,
+                            reason=e.reason,
+                        )
+        if self.__verifier is not None:
+            for url, reason in self.__verifier.failures():
                 logger.warning(
-                    f"Image failed to load due to invalid image url: {self.__inner_url}, skipping.."
+                    f"The image {url} failed verification.\nReason: {reason}"
                 )
-                continue
+                self.__reporter.emit(
+                    "image_invalid",
+                    category=animal.name,
+                    url=url,
+                    reason=reason,
+                )
+        if len(image_names) < amount:
+            logger.warning(
+                f"Only {len(image_names)} of {amount} images of {animal.name} were downloaded."
+            )
+            self.__reporter.emit(
+                "download_incomplete",
+                category=animal.name,
+                requested=amount,
+                downloaded=len(image_names),
+                missing=amount - len(image_names),
+            )
+        tracer.current().set(downloaded=len(image_names))
+        self.__reporter.emit(
+            "download_finished",
+            category=animal.name,
+            requested=amount,
+            downloaded=len(image_names),
+            location=sink.location,
+        )
+        return {"names": image_names, "directory": path.absolute()}
 
-            except DataFetchFailed as e:
-                logger.error(
-                    f"Error occurred while fetching the image from the image url: {e.url}\n"
-                    f"Status code: {e.status_code}.\nReason: {e.reason}"
+    def __download_one(
+        self, animal: CategoryEnum, sink: ImageSink, stopped: threading.Event
+    ) -> tuple[str, Future[str]] | None:
+        """
+        This method downloads a single image of a download on a worker thread, failures are reported here.
+
+        Returns:
+            (tuple[str, concurrent.futures.Future[str]] | None): The url of the image and the future of its write, or
+                                                                 None if the image failed or the download stopped.
+        """
+        with tracer.span("rate_limiter.wait"):
+            self.__rate_limiter.acquire()
+        if stopped.is_set():
+            return None
+        if self.__deadline is not None and self.__deadline.remaining <= 0.0:
+            self.__stop_at_deadline(animal, stopped)
+            return None
+        self.__local.url = None
+        self.__reporter.emit(
+            "image_started",
+            category=animal.name,
+            worker=getattr(self.__local, "worker", None),
+        )
+        try:
+            with tracer.span("image", category=animal.name) as span:
+                url, future = self.__retry_policy.call(
+                    self.__fetch_and_submit,
+                    animal,
+                    sink,
+                    on_retry=partial(self.__report_retry, animal),
                 )
-                sys.exit(1)
+                span.set(url=url)
 
-            except ImageDownloadFailed as e:
-                logger.error(
-                    f"Error occurred while trying to save the image {e.image}\nReason: {e.reason}"
+        except DataFetchFailed as e:
+            stage = "metadata" if self.__local.url is None else "image"
+            logger.error(
+                f"Error occurred while fetching the {stage} of an image of {animal.name} from: {e.url}\n"
+                f"Status code: {e.status_code}.\nReason: {e.reason}"
+            )
+            self.__reporter.emit(
+                "image_failed",
+                category=animal.name,
+                stage=stage,
+                failure=RetryPolicy.classify(e),
+                url=e.url,
+                status_code=e.status_code,
+                reason=e.reason,
+            )
+            return None
+
+        except InvalidImageURL as e:
+            logger.warning(
+                f"Image failed to load due to invalid image url: {self.__local.url}, skipping.."
+            )
+            self.__reporter.emit(
+                "image_failed",
+                category=animal.name,
+                stage="image",
+                failure=FailureEnum.invalid_image,
+                url=self.__local.url,
+                reason=str(e),
+            )
+            return None
+
+        except httpx.HTTPError as e:
+            logger.error(
+                f"Error occurred while fetching an image of {animal.name}: {e!r}"
+            )
+            self.__reporter.emit(
+                "image_failed",
+                category=animal.name,
+                stage="metadata" if self.__local.url is None else "image",
+                failure=RetryPolicy.classify(e),
+                url=self.__local.url,
+                reason=str(e) or type(e).__name__,
+            )
+            return None
+
+        except ByteBudgetExceeded as e:
+            if not stopped.is_set():
+                stopped.set()
+                logger.warning(
+                    f"The byte budget of {e.budget} bytes has been spent, stopping the download."
                 )
-                continue
+                self.__reporter.emit(
+                    "budget_exhausted",
+                    category=animal.name,
+                    budget=e.budget,
+                    spent=e.spent,
+                )
+            return None
 
-            except PathNotFound:
-                logger.error(
-                    f"Directory '{path.name}' does not exist in parent directory '{path.absolute().parent.name}', "
-                    f"failed to save image."
+        except DeadlineExceeded:
+            self.__stop_at_deadline(animal, stopped)
+            return None
+
+        future.add_done_callback(
+            partial(self.__report_saved, animal, url, sink.location)
+        )
+        return url, future
+
+    def __stop_at_deadline(
+        self, animal: CategoryEnum, stopped: threading.Event
+    ) -> None:
+        """
+        This method stops a download whose deadline has passed, the images that are not started yet are skipped,
+        and the ones that are saved are kept.
+        """
+        if stopped.is_set():
+            return
+        stopped.set()
+        logger.warning(
+            f"The deadline of {self.__deadline.seconds:g}s has passed, stopping the download."
+        )
+        self.__reporter.emit(
+            "deadline_exceeded",
+            category=animal.name,
+            deadline=self.__deadline.seconds,
+            elapsed=round(self.__deadline.elapsed, 3),
+        )
+
+
+@dataclass
+class ImageRecord:
+    """
+    This :func:`dataclass` stores an image yielded by :meth:`AsyncClient.iter_images`.
+    """
+
+    category: CategoryEnum
+    url: str
+    format: str
+    size: int
+    """
+    The size of the image body in bytes.
+    """
+    data: bytes | None = None
+    """
+    The body of the image, if it was not saved to a directory.
+    """
+    path: Path | None = None
+    """
+    The path of the saved image, if it was saved to a directory.
+    """
+    fact: str | None = None
+    """
+    The fact that the API endpoint returned along with the image, if any.
+    """
+
+
+class AsyncClient:
+    """
+    A class that fetches images asynchronously, for using catto as a library. Unlike :class:`Client`, it never
+    prints anything or exits the process, failures are raised as exceptions.
+
+    For example:
+        async with AsyncClient() as client:
+            async for image in client.iter_images(CategoryEnum.cats, 10):
+                ...
+    """
+
+    def __init__(
+        self,
+        *,
+        concurrency: int = 4,
+        rate_limiter: RateLimiter | None = None,
+        bandwidth_limiter: RateLimiter | None = None,
+        byte_budget: ByteBudget | None = None,
+        timeout: float = 30.0,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        """
+        Parameters:
+            concurrency (int): This parameter takes the maximum amount of images fetched at the same time. Default: 4.
+            rate_limiter (RateLimiter | None): This parameter takes the rate limiter for the requests made to the
+                                               API endpoints. Default: 5 requests per second.
+            bandwidth_limiter (RateLimiter | None): This parameter takes the rate limiter for the bytes of image
+                                                    bodies. Default: None.
+            byte_budget (ByteBudget | None): This parameter takes the total amount of bytes that image transfers may
+                                             use. Default: None.
+            timeout (float): This parameter takes the timeout of every request in seconds. Default: 30.0.
+            transport (httpx.AsyncBaseTransport | None): This parameter takes the transport the requests are sent
+                                                         with. Defaults to the network.
+        """
+        self.__concurrency = concurrency
+        self.__rate_limiter = rate_limiter or RateLimiter()
+        self.__bandwidth_limiter = bandwidth_limiter
+        self.__byte_budget = byte_budget
+        self.__http = httpx.AsyncClient(
+            timeout=timeout, transport=transport, follow_redirects=True
+        )
+
+    async def __aenter__(self) -> AsyncClient:
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """
+        This method closes the connections of the client.
+        """
+        await self.__http.aclose()
+
+    async def fetch_metadata(
+        self, category: CategoryEnum
+    ) -> tuple[str, str | None]:
+        """
+        This method fetches the url of a random image of the specified category, along with a fact.
+
+        Parameters:
+            category (CategoryEnum): This parameter takes the animal category.
+
+        Returns:
+            (tuple[str, str | None]): The url of the image, and the fact if the API endpoint returned one.
+
+        Raises:
+            DataFetchFailed: If the API endpoint did not answer with the expected data.
+        """
+        await asyncio.sleep(self.__rate_limiter.reserve())
+        response = await self.__http.get(str(category.value))
+        interface = ResponseEnum[category.name].interface
+        try:
+            if response.status_code != 200:
+                raise ValueError(response.reason_phrase)
+            data: dict[str, str] = response.json()
+            url_of_image = data[interface.key_that_contains_image_url]
+        except (ValueError, KeyError):
+            raise DataFetchFailed(
+                f"Failed to fetch the image url for animal {category.name} from the API endpoint {category.value}.",
+                status_code=response.status_code,
+                reason=response.reason_phrase,
+                url=str(response.url),
+            )
+        return url_of_image, data.get(interface.key_that_contains_fact)
+
+    async def fetch_image(self, url_of_image: str) -> tuple[bytes, str]:
+        """
+        This method fetches an image into memory.
+
+        Parameters:
+            url_of_image (str): This parameter takes the url of the image.
+
+        Returns:
+            (tuple[bytes, str]): The body of the image, and its format in lowercase, for example "png".
+
+        Raises:
+            DataFetchFailed: If the image could not be fetched.
+            InvalidImageURL: If the url does not point to a valid image.
+            ByteBudgetExceeded: If fetching the image would go over the byte budget.
+        """
+        body = bytearray()
+        header = None
+        async with self.__http.stream("GET", url_of_image) as response:
+            if response.status_code != 200:
+                raise DataFetchFailed(
+                    f"Failed to fetch image from url '{url_of_image}",
+                    status_code=response.status_code,
+                    reason=response.reason_phrase,
+                    url=url_of_image,
                 )
-                sys.exit(1)
+            check_content_type(response.headers.get("content-type"))
+            length = response.headers.get("content-length")
+            if self.__byte_budget is not None and length is not None:
+                self.__byte_budget.check(int(length))
+            async for chunk in response.aiter_bytes(Client.CHUNK_SIZE):
+                if self.__byte_budget is not None:
+                    self.__byte_budget.consume(len(chunk))
+                if self.__bandwidth_limiter is not None:
+                    await asyncio.sleep(
+                        self.__bandwidth_limiter.reserve(len(chunk))
+                    )
+                body.extend(chunk)
+                if header is None and len(body) >= SNIFF_SIZE:
+                    header = sniff_image(bytes(body[:SNIFF_SIZE]))
+            if header is None:
+                header = sniff_image(bytes(body))
+            _check_length(response, len(body))
+        data = bytes(body)
+        check_structure(header, data)
+        return data, header.format
 
-            for _ in track(
-                range(amount),
-                description=f"[bold][magenta]{i + 1}.) Saving image [bold][green]{data['name']}: "
-                f"[bold][blue with underline]"
-                f"{self.__inner_url}",
-            ):
-                time.sleep(
-                    self.__backoff.calculate()
-                )  # This is a simple ratelimit handler to avoid
-                # being banned from the API.
-        return {"names": image_names, "directory": path.absolute()}
+    async def fetch_record(
+        self, category: CategoryEnum, sink: ImageSink | None = None
+    ) -> ImageRecord:
+        """
+        This method fetches a random image of the specified category.
+
+        Parameters:
+            category (CategoryEnum): This parameter takes the animal category.
+            sink (ImageSink | None): This parameter takes the sink to write the image to. If None, the body of the
+                                     image is kept in the record.
+
+        Returns:
+            (ImageRecord): The image.
+        """
+        url_of_image, fact = await self.fetch_metadata(category)
+        data, image_format = await self.fetch_image(url_of_image)
+        record = ImageRecord(
+            category, url_of_image, image_format, len(data), fact=fact
+        )
+        if sink is None:
+            record.data = data
+            return record
+
+        name = await asyncio.to_thread(
+            sink.write, image_name(category, image_format), data
+        )
+        if isinstance(sink, DirectorySink):
+            record.path = sink.directory / name
+        return record
+
+    async def iter_images(
+        self,
+        category: CategoryEnum,
+        limit: int,
+        *,
+        path: Path | None = None,
+        max_failures: int | None = None,
+    ) -> AsyncIterator[ImageRecord]:
+        """
+        This method yields random images of the specified category as soon as each of them is complete, fetching up
+        to `concurrency` images at the same time. Closing the generator, for example by breaking out of a loop
+        wrapped in `contextlib.aclosing`, cancels the images still in flight.
+
+        Parameters:
+            category (CategoryEnum): This parameter takes the animal category.
+            limit (int): This parameter takes the amount of images to yield.
+            path (pathlib.Path | None): This parameter takes the directory to save the images into. If None, the
+                                        images are kept in memory.
+            max_failures (int | None): This parameter takes the amount of failed images tolerated before the last
+                                       failure is raised. Defaults to `limit`.
+
+        Yields:
+            (ImageRecord): The images, in the order they completed.
+
+        Raises:
+            DataFetchFailed: If too many images could not be fetched.
+            InvalidImageURL: If too many urls did not point to a valid image.
+            ByteBudgetExceeded: If the byte budget has been spent.
+            PathNotFound: If the directory does not exist.
+        """
+        sink = DirectorySink(path) if path is not None else None
+        max_failures = limit if max_failures is None else max_failures
+        failures = 0
+        yielded = 0
+        pending: set[asyncio.Task[ImageRecord]] = set()
+        try:
+            while yielded < limit:
+                while len(pending) < min(self.__concurrency, limit - yielded):
+                    pending.add(
+                        asyncio.create_task(self.fetch_record(category, sink))
+                    )
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    try:
+                        record = task.result()
+                    except (DataFetchFailed, InvalidImageURL, httpx.HTTPError):
+                        failures += 1
+                        if failures > max_failures:
+                            raise
+                        continue
+                    if yielded < limit:
+                        yielded += 1
+                        yield record
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import email.utils
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from loguru import logger
+
+from ..utils.helpers import default_cache_directory
+
+__all__ = ("ImageCache", "CacheEntry", "parse_cache_control")
+
+
+def parse_cache_control(header: str | None) -> dict[str, str | None]:
+    """
+    This function parses the value of a `Cache-Control` header into a dictionary of directives.
+
+    Parameters:
+        header (str | None): This parameter takes the raw value of the header.
+
+    Returns:
+        (dict[str, str | None]): The directives in lowercase, mapped to their argument if they have one.
+    """
+    directives: dict[str, str | None] = {}
+    if not header:
+        return directives
+    for directive in header.split(","):
+        name, _, argument = directive.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') or None
+    return directives
+
+
+def _parse_http_date(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class CacheEntry:
+    """
+    This :func:`dataclass` stores the metadata of an image body that is kept in the :class:`ImageCache`.
+    """
+
+    url: str
+    key: str
+    format: str
+    size: int
+    stored_at: float
+    etag: str | None = None
+    last_modified: str | None = None
+    fresh_until: float | None = None
+    """
+    The unix timestamp until which the body may be served without asking the server again.
+    """
+    no_cache: bool = False
+    """
+    Whether the server asked for every use of the body to be revalidated first.
+    """
+
+    def is_fresh(self, now: float | None = None) -> bool:
+        """
+        This method checks if the cached body can be served without revalidating it with the server.
+
+        Returns:
+            (bool): True if the entry is still fresh, False otherwise.
+        """
+        if self.no_cache or self.fresh_until is None:
+            return False
+        return (now or time.time()) < self.fresh_until
+
+    def validators(self) -> dict[str, str]:
+        """
+        This method returns the conditional request headers that revalidate this entry.
+
+        Returns:
+            (dict[str, str]): The `If-None-Match` and `If-Modified-Since` headers, if the server sent validators.
+        """
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def update_freshness(self, headers: dict[str, str]) -> bool:
+        """
+        This method refreshes the validators and the freshness lifetime of this entry from the response headers.
+
+        Parameters:
+            headers (dict[str, str]): This parameter takes the response headers, with lowercase names.
+
+        Returns:
+            (bool): False if the server forbids storing the body, True otherwise.
+        """
+        directives = parse_cache_control(headers.get("cache-control"))
+        if "no-store" in directives:
+            return False
+        now = time.time()
+        self.stored_at = now
+        self.etag = headers.get("etag", self.etag)
+        self.last_modified = headers.get("last-modified", self.last_modified)
+        self.no_cache = "no-cache" in directives
+
+        max_age = directives.get("max-age")
+        if max_age is not None and max_age.isdigit():
+            self.fresh_until = now + int(max_age)
+            return True
+
+        expires = _parse_http_date(headers.get("expires"))
+        if expires is not None:
+            self.fresh_until = expires
+            return True
+
+        # Heuristic freshness as suggested by RFC 9111: a tenth of the time since the body was last modified.
+        modified = _parse_http_date(self.last_modified)
+        self.fresh_until = (
+            now + (now - modified) / 10 if modified is not None else None
+        )
+        return True
+
+
+class ImageCache:
+    """
+    A class that implements a shared on-disk cache of image bodies keyed by their URL. The cache is bounded by
+    size, and the least recently used bodies are evicted first. The time a body was last used is kept as the
+    modification time of its metadata file, so the files of the bodies are never touched after they are written.
+    """
+
+    def __init__(
+        self, directory: Path | None = None, *, max_size: int = 512 * 1000**2
+    ):
+        """
+        Parameters:
+            directory (pathlib.Path | None): This parameter takes the directory where the bodies are stored.
+                                             Defaults to the "images" directory in catto's cache directory.
+            max_size (int): This parameter takes the maximum size of the cache in bytes. Default: 512MB.
+        """
+        self.__directory = (
+            directory or default_cache_directory() / "images"
+        ).absolute()
+        self.__max_size = max_size
+        self.__size: int | None = None
+        self.__lock = threading.Lock()
+        self.__directory.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def directory(self) -> Path:
+        """
+        This property returns the directory where the cache stores its bodies.
+        """
+        return self.__directory
+
+    @staticmethod
+    def key(url: str) -> str:
+        """
+        This method returns the key of the given url in the cache.
+        """
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def __paths(self, key: str) -> tuple[Path, Path]:
+        folder = self.__directory / key[:2]
+        return folder / f"{key}.data", folder / f"{key}.json"
+
+    def lookup(self, url: str) -> CacheEntry | None:
+        """
+        This method looks up the cached body of the given url, and marks it as recently used.
+
+        Parameters:
+            url (str): This parameter takes the url of the image.
+
+        Returns:
+            (CacheEntry | None): The metadata of the cached body, or None if the url is not cached.
+        """
+        data_path, meta_path = self.__paths(self.key(url))
+        try:
+            entry = CacheEntry(**json.loads(meta_path.read_text("utf-8")))
+            if not data_path.is_file():
+                return None
+            os.utime(meta_path)
+        except (OSError, ValueError, TypeError):
+            return None
+        return entry
+
+    def path_of(self, entry: CacheEntry) -> Path:
+        """
+        This method returns the path of the file holding the body of the given entry.
+        """
+        return self.__paths(entry.key)[0]
+
+    def store(
+        self, url: str, data: bytes, image_format: str, headers: dict[str, str]
+    ) -> CacheEntry | None:
+        """
+        This method stores an image body in the cache.
+
+        Parameters:
+            url (str): This parameter takes the url of the image.
+            data (bytes): This parameter takes the body of the response.
+            image_format (str): This parameter takes the format of the image, for example "png".
+            headers (dict[str, str]): This parameter takes the response headers, with lowercase names.
+
+        Returns:
+            (CacheEntry | None): The metadata of the stored body, or None if the server forbids caching it.
+        """
+        key = self.key(url)
+        entry = CacheEntry(
+            url=url,
+            key=key,
+            format=image_format,
+            size=len(data),
+            stored_at=time.time(),
+        )
+        if not entry.update_freshness(headers) or len(data) > self.__max_size:
+            return None
+
+        data_path, meta_path = self.__paths(key)
+        data_path.parent.mkdir(exist_ok=True)
+        try:
+            replaced = data_path.stat().st_size
+        except OSError:
+            replaced = 0
+        self.__write_atomically(data_path, data)
+        self.__write_atomically(
+            meta_path, json.dumps(asdict(entry)).encode("utf-8")
+        )
+        with self.__lock:
+            if self.__size is not None:
+                self.__size += len(data) - replaced
+        self.evict()
+        return entry
+
+    def revalidated(
+        self, entry: CacheEntry, headers: dict[str, str]
+    ) -> CacheEntry:
+        """
+        This method records that the server confirmed the cached body is still valid with a `304 Not Modified`.
+
+        Parameters:
+            entry (CacheEntry): This parameter takes the entry that was revalidated.
+            headers (dict[str, str]): This parameter takes the headers of the 304 response, with lowercase names.
+
+        Returns:
+            (CacheEntry): The updated entry.
+        """
+        if entry.update_freshness(headers):
+            self.__write_atomically(
+                self.__paths(entry.key)[1],
+                json.dumps(asdict(entry)).encode("utf-8"),
+            )
+        return entry
+
+    def export(self, entry: CacheEntry, destination: Path) -> Path:
+        """
+        This method places a copy of the cached body at the destination path without any network transfer. The
+        body is copied rather than hard-linked, so evicting it frees its space, and the exported file is not
+        affected by the cache.
+
+        Parameters:
+            entry (CacheEntry): This parameter takes the entry to export.
+            destination (pathlib.Path): This parameter takes the path of the file to create.
+
+        Returns:
+            (pathlib.Path): The destination path.
+        """
+        return Path(shutil.copyfile(self.path_of(entry), destination))
+
+    def evict(self) -> None:
+        """
+        This method removes the least recently used bodies until the cache fits in its maximum size. The size of
+        the cache is kept as a running total, the directory is only listed when the total goes over the maximum
+        size, which also picks up the bodies that other processes stored.
+        """
+        with self.__lock:
+            if self.__size is not None and self.__size <= self.__max_size:
+                return
+            files = []
+            for data_path in self.__directory.glob("*/*.data"):
+                try:
+                    size = data_path.stat().st_size
+                except OSError:
+                    continue
+                try:
+                    used = data_path.with_suffix(".json").stat().st_mtime
+                except OSError:
+                    # A body without metadata can't be looked up anymore, it goes first.
+                    used = 0.0
+                files.append((used, size, data_path))
+
+            total = sum(size for _, size, _ in files)
+            for _, size, data_path in sorted(files):
+                if total <= self.__max_size:
+                    break
+                data_path.unlink(missing_ok=True)
+                data_path.with_suffix(".json").unlink(missing_ok=True)
+                total -= size
+                logger.debug(f"Evicted {data_path.name} from the image cache.")
+            self.__size = total
+
+    @staticmethod
+    def __write_atomically(path: Path, data: bytes) -> None:
+        temporary = path.with_name(
+            f".{path.name}.{os.getpid()}.{threading.get_ident()}"
+        )
+        temporary.write_bytes(data)
+        os.replace(temporary, path)
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+
+import httpx
+
+__all__ = ("Cassette", "Interaction", "RecordingTransport", "ReplayTransport")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS interactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    method TEXT NOT NULL,
+    url TEXT NOT NULL,
+    status_code INTEGER,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    error TEXT,
+    started REAL NOT NULL,
+    elapsed REAL NOT NULL
+)
+"""
+
+
+@dataclass(frozen=True)
+class Interaction:
+    """
+    This :func:`dataclass` stores a request and the response it got, as recorded in a :class:`Cassette`.
+    """
+
+    method: str
+    url: str
+    status_code: int | None
+    """
+    The status code of the response, None if the request failed with :attr:`error`.
+    """
+    headers: list[tuple[str, str]]
+    body: bytes
+    """
+    The body of the response, as it was received from the connection, before it was decoded.
+    """
+    error: str | None
+    """
+    The name and the message of the :mod:`httpx` exception the request failed with, if any.
+    """
+    started: float
+    """
+    The time in seconds from the start of the recording until the request was sent.
+    """
+    elapsed: float
+    """
+    The time in seconds from sending the request until its whole body was received.
+    """
+
+
+class Cassette:
+    """
+    A class that stores the HTTP requests of catto and their responses, including their timing, in an SQLite
+    database, so that a workload can be replayed without the network.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Parameters:
+            path (pathlib.Path): This parameter takes the database file, it is created if it does not exist.
+        """
+        self.__path = path
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(path, check_same_thread=False)
+        self.__connection.execute(_SCHEMA)
+        self.__connection.commit()
+        self.__opened_at = time.perf_counter()
+
+    @property
+    def path(self) -> Path:
+        """
+        This property returns the database file of the cassette.
+        """
+        return self.__path
+
+    def record(
+        self,
+        request: httpx.Request,
+        response: httpx.Response | None,
+        body: bytes,
+        *,
+        started: float,
+        elapsed: float,
+        error: Exception | None = None,
+    ) -> None:
+        """
+        This method stores a request and its response.
+
+        Parameters:
+            request (httpx.Request): This parameter takes the request.
+            response (httpx.Response | None): This parameter takes the response, None if the request failed.
+            body (bytes): This parameter takes the raw body of the response.
+            started (float): This parameter takes the :func:`time.perf_counter` value the request was sent at.
+            elapsed (float): This parameter takes the time in seconds the request took.
+            error (Exception | None): This parameter takes the exception the request failed with, if any.
+        """
+        with self.__lock:
+            self.__connection.execute(
+                "INSERT INTO interactions (method, url, status_code, headers, body, error, started, elapsed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    request.method,
+                    str(request.url),
+                    None if response is None else response.status_code,
+                    json.dumps(
+                        []
+                        if response is None
+                        else response.headers.multi_items()
+                    ),
+                    body,
+                    None
+                    if error is None
+                    else f"{type(error).__name__}: {error}",
+                    started - self.__opened_at,
+                    elapsed,
+                ),
+            )
+            self.__connection.commit()
+
+    def interactions(self) -> list[Interaction]:
+        """
+        This method returns the stored interactions in the order they were recorded.
+        """
+        with self.__lock:
+            rows = self.__connection.execute(
+                "SELECT method, url, status_code, headers, body, error, started, elapsed FROM interactions "
+                "ORDER BY id"
+            ).fetchall()
+        return [
+            Interaction(
+                method=method,
+                url=url,
+                status_code=status_code,
+                headers=[tuple(header) for header in json.loads(headers)],
+                body=bytes(body),
+                error=error,
+                started=started,
+                elapsed=elapsed,
+            )
+            for method, url, status_code, headers, body, error, started, elapsed in rows
+        ]
+
+    def close(self) -> None:
+        """
+        This method closes the database.
+        """
+        with self.__lock:
+            self.__connection.close()
+
+    def __enter__(self) -> Cassette:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+
+class RecordingTransport(httpx.BaseTransport):
+    """
+    A transport that sends the requests with another transport, and records them with their responses in a
+    :class:`Cassette`. The body of every response is read completely before it is handed on, so it is timed too.
+    """
+
+    def __init__(
+        self, cassette: Cassette, transport: httpx.BaseTransport | None = None
+    ):
+        """
+        Parameters:
+            cassette (Cassette): This parameter takes the cassette to record into.
+            transport (httpx.BaseTransport | None): This parameter takes the transport the requests are sent with.
+                                                    Defaults to the network.
+        """
+        self.__cassette = cassette
+        self.__transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            response = self.__transport.handle_request(request)
+            try:
+                body = b"".join(response.stream)
+            finally:
+                response.close()
+        except httpx.TransportError as e:
+            self.__cassette.record(
+                request,
+                None,
+                b"",
+                started=started,
+                elapsed=time.perf_counter() - started,
+                error=e,
+            )
+            raise
+        self.__cassette.record(
+            request,
+            response,
+            body,
+            started=started,
+            elapsed=time.perf_counter() - started,
+        )
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            content=body,
+            extensions=response.extensions,
+        )
+
+    def close(self) -> None:
+        self.__transport.close()
+
+
+class ReplayTransport(httpx.BaseTransport):
+    """
+    A transport that answers the requests with the responses of a :class:`Cassette`, without the network. The
+    responses recorded for a method and url are played back in order, and from the start again once they are all
+    used, so repeated requests to the same endpoint get the same sequence of answers on every run.
+    """
+
+    def __init__(self, cassette: Cassette, *, realtime: bool = False):
+        """
+        Parameters:
+            cassette (Cassette): This parameter takes the cassette to replay.
+            realtime (bool): This parameter takes whether every response takes as long as it took when it was
+                             recorded, otherwise the responses are returned as fast as possible. Default: False.
+        """
+        self.__realtime = realtime
+        self.__lock = threading.Lock()
+        self.__interactions: dict[
+            tuple[str, str], list[Interaction]
+        ] = defaultdict(list)
+        self.__positions: dict[tuple[str, str], int] = defaultdict(int)
+        for interaction in cassette.interactions():
+            self.__interactions[(interaction.method, interaction.url)].append(
+                interaction
+            )
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        key = (request.method, str(request.url))
+        with self.__lock:
+            interactions = self.__interactions.get(key)
+            if not interactions:
+                raise httpx.ConnectError(
+                    f"The request {request.method} {request.url} is not in the cassette.",
+                    request=request,
+                )
+            interaction = interactions[
+                self.__positions[key] % len(interactions)
+            ]
+            self.__positions[key] += 1
+
+        if self.__realtime:
+            time.sleep(interaction.elapsed)
+        if interaction.error is not None:
+            name, _, message = interaction.error.partition(": ")
+            error = getattr(httpx, name, None)
+            if not (
+                isinstance(error, type)
+                and issubclass(error, httpx.TransportError)
+            ):
+                error = httpx.TransportError
+            raise error(message, request=request)
+        return httpx.Response(
+            interaction.status_code,
+            headers=interaction.headers,
+            content=interaction.body,
+        )
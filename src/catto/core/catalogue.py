@@ -0,0 +1,481 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from ..utils.enums import CategoryEnum, EvictionEnum
+from ..utils.exceptions import InvalidImageURL
+from ..utils.helpers import default_cache_directory
+from .validation import SNIFF_SIZE, sniff_image
+
+__all__ = ("Catalogue", "CatalogueEntry")
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS images (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        category TEXT NOT NULL,
+        name TEXT NOT NULL,
+        location TEXT NOT NULL,
+        url TEXT,
+        sha256 TEXT NOT NULL,
+        format TEXT,
+        width INTEGER,
+        height INTEGER,
+        size INTEGER NOT NULL,
+        saved_at REAL NOT NULL,
+        used_at REAL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS images_by_category ON images (category, saved_at)",
+    "CREATE INDEX IF NOT EXISTS images_by_format ON images (format, saved_at)",
+    "CREATE INDEX IF NOT EXISTS images_by_size ON images (size)",
+    "CREATE INDEX IF NOT EXISTS images_by_time ON images (saved_at)",
+    "CREATE INDEX IF NOT EXISTS images_by_hash ON images (sha256)",
+    "CREATE INDEX IF NOT EXISTS images_by_location ON images (location, category)",
+)
+
+_EVICTION_ORDERS: dict[EvictionEnum, str] = {
+    EvictionEnum.oldest: "saved_at",
+    EvictionEnum.lru: "COALESCE(used_at, saved_at)",
+}
+"""
+The columns that the images of a location are evicted in the order of.
+"""
+
+_EVICTION_INDEXES = tuple(
+    f"CREATE INDEX IF NOT EXISTS images_by_{order.name} ON images (location, {column})"
+    for order, column in _EVICTION_ORDERS.items()
+)
+
+_COLUMNS = "category, name, location, url, sha256, format, width, height, size, saved_at"
+
+
+@dataclass(frozen=True)
+class CatalogueEntry:
+    """
+    This :func:`dataclass` stores an image that was saved, as it is recorded in the :class:`Catalogue`.
+    """
+
+    category: str
+    name: str
+    """
+    The name the image was saved with, relative to :attr:`location`.
+    """
+    location: str
+    """
+    The location of the sink the image was saved to, a directory or an archive.
+    """
+    url: str | None
+    sha256: str
+    """
+    The SHA-256 hash of the body of the image in hex.
+    """
+    format: str | None
+    width: int | None
+    height: int | None
+    size: int
+    saved_at: float
+
+    @classmethod
+    def describe(
+        cls,
+        category: CategoryEnum,
+        name: str,
+        location: str,
+        data: bytes,
+        url: str | None = None,
+        *,
+        saved_at: float | None = None,
+    ) -> CatalogueEntry:
+        """
+        This method returns the entry of a saved image, its hash and dimensions are read from its body.
+
+        Parameters:
+            category (CategoryEnum): This parameter takes the animal category of the image.
+            name (str): This parameter takes the name the image was saved with.
+            location (str): This parameter takes the location of the sink the image was saved to.
+            data (bytes): This parameter takes the body of the image.
+            url (str | None): This parameter takes the url the image was downloaded from, if it is known.
+            saved_at (float | None): This parameter takes the time the image was saved at. Defaults to now.
+
+        Returns:
+            (CatalogueEntry): The entry of the image.
+        """
+        try:
+            header = sniff_image(data[:SNIFF_SIZE])
+        except InvalidImageURL:
+            header = None
+        return cls(
+            category=category.name,
+            name=name,
+            location=location,
+            url=url,
+            sha256=hashlib.sha256(data).hexdigest(),
+            format=None if header is None else header.format,
+            width=None if header is None else header.width,
+            height=None if header is None else header.height,
+            size=len(data),
+            saved_at=time.time() if saved_at is None else saved_at,
+        )
+
+
+class Catalogue:
+    """
+    A class that records every image that catto saves in an SQLite database, indexed by category, format, size and
+    time, so the gallery can be queried without walking directories.
+    """
+
+    def __init__(self, path: Path | None = None):
+        """
+        Parameters:
+            path (pathlib.Path | None): This parameter takes the database file. Defaults to "catalogue.db" in catto's
+                                        cache directory.
+        """
+        self.__path = path or default_cache_directory() / "catalogue.db"
+        self.__connection: sqlite3.Connection | None = None
+        self.__lock = threading.Lock()
+
+    @property
+    def path(self) -> Path:
+        """
+        This property returns the database file of the catalogue.
+        """
+        return self.__path
+
+    def __connect(self) -> sqlite3.Connection:
+        """
+        This method opens the database on first use, and creates its tables and indexes.
+        """
+        if self.__connection is None:
+            self.__path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(
+                self.__path, timeout=10.0, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            for statement in _SCHEMA:
+                connection.execute(statement)
+            columns = {
+                row[1]
+                for row in connection.execute("PRAGMA table_info(images)")
+            }
+            if "used_at" not in columns:
+                # Catalogues created before images could be marked as used.
+                connection.execute("ALTER TABLE images ADD COLUMN used_at REAL")
+            for statement in _EVICTION_INDEXES:
+                connection.execute(statement)
+            connection.commit()
+            self.__connection = connection
+        return self.__connection
+
+    def add(
+        self,
+        category: CategoryEnum,
+        name: str,
+        location: str,
+        data: bytes,
+        url: str | None = None,
+        *,
+        saved_at: float | None = None,
+    ) -> CatalogueEntry:
+        """
+        This method records a saved image, its hash and dimensions are read from its body.
+
+        Parameters:
+            category (CategoryEnum): This parameter takes the animal category of the image.
+            name (str): This parameter takes the name the image was saved with.
+            location (str): This parameter takes the location of the sink the image was saved to.
+            data (bytes): This parameter takes the body of the image.
+            url (str | None): This parameter takes the url the image was downloaded from, if it is known.
+            saved_at (float | None): This parameter takes the time the image was saved at. Defaults to now.
+
+        Returns:
+            (CatalogueEntry): The recorded image.
+
+        Raises:
+            sqlite3.Error: If the database could not be written.
+        """
+        entry = CatalogueEntry.describe(
+            category, name, location, data, url, saved_at=saved_at
+        )
+        self.record(entry)
+        return entry
+
+    def record(self, entry: CatalogueEntry) -> None:
+        """
+        This method records the entry of a saved image, for example one read from the index of another machine.
+
+        Raises:
+            sqlite3.Error: If the database could not be written.
+        """
+        with self.__lock:
+            connection = self.__connect()
+            connection.execute(
+                f"INSERT INTO images ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    entry.category,
+                    entry.name,
+                    entry.location,
+                    entry.url,
+                    entry.sha256,
+                    entry.format,
+                    entry.width,
+                    entry.height,
+                    entry.size,
+                    entry.saved_at,
+                ),
+            )
+            connection.commit()
+
+    def query(
+        self,
+        *,
+        categories: list[CategoryEnum] | None = None,
+        image_format: str | None = None,
+        minimum_size: int | None = None,
+        maximum_size: int | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        limit: int | None = None,
+    ) -> list[CatalogueEntry]:
+        """
+        This method returns the recorded images that match all the given filters, newest first.
+
+        Parameters:
+            categories (list[CategoryEnum] | None): This parameter takes the animal categories to return.
+            image_format (str | None): This parameter takes the format to return, for example "png".
+            minimum_size (int | None): This parameter takes the smallest size in bytes to return.
+            maximum_size (int | None): This parameter takes the largest size in bytes to return.
+            since (float | None): This parameter takes the earliest time the images were saved at.
+            until (float | None): This parameter takes the time the images were saved before.
+            limit (int | None): This parameter takes the maximum amount of images to return.
+
+        Returns:
+            (list[CatalogueEntry]): The images.
+        """
+        conditions: list[str] = []
+        parameters: list[object] = []
+        if categories:
+            conditions.append(
+                f"category IN ({', '.join('?' for _ in categories)})"
+            )
+            parameters.extend(category.name for category in categories)
+        if image_format is not None:
+            conditions.append("format = ?")
+            parameters.append(image_format.lower())
+        if minimum_size is not None:
+            conditions.append("size >= ?")
+            parameters.append(minimum_size)
+        if maximum_size is not None:
+            conditions.append("size <= ?")
+            parameters.append(maximum_size)
+        if since is not None:
+            conditions.append("saved_at >= ?")
+            parameters.append(since)
+        if until is not None:
+            conditions.append("saved_at < ?")
+            parameters.append(until)
+
+        statement = f"SELECT {_COLUMNS} FROM images"
+        if conditions:
+            statement += f" WHERE {' AND '.join(conditions)}"
+        statement += " ORDER BY saved_at DESC"
+        if limit is not None:
+            statement += " LIMIT ?"
+            parameters.append(limit)
+        with self.__lock:
+            rows = self.__connect().execute(statement, parameters).fetchall()
+        return [CatalogueEntry(*row) for row in rows]
+
+    def count(self, location: str) -> dict[str, int]:
+        """
+        This method counts the recorded images of each category saved to a location.
+
+        Parameters:
+            location (str): This parameter takes the location of the sink, for example a directory.
+
+        Returns:
+            (dict[str, int]): The amount of images of each category that has any.
+        """
+        with self.__lock:
+            rows = (
+                self.__connect()
+                .execute(
+                    "SELECT category, COUNT(*) FROM images WHERE location = ? GROUP BY category",
+                    (location,),
+                )
+                .fetchall()
+            )
+        return dict(rows)
+
+    def prune(self, directory: Path) -> int:
+        """
+        This method forgets the recorded images of a directory whose files were removed. The files are only looked
+        up, not read.
+
+        Parameters:
+            directory (pathlib.Path): This parameter takes the directory.
+
+        Returns:
+            (int): The amount of images that were forgotten.
+        """
+        location = str(directory.absolute())
+        with self.__lock:
+            connection = self.__connect()
+            missing = [
+                (identifier,)
+                for identifier, name in connection.execute(
+                    "SELECT id, name FROM images WHERE location = ?",
+                    (location,),
+                )
+                if not (directory / name).is_file()
+            ]
+            connection.executemany("DELETE FROM images WHERE id = ?", missing)
+            connection.commit()
+        return len(missing)
+
+    def usage(self, location: str) -> tuple[int, int]:
+        """
+        This method returns the amount of recorded images saved to a location, and their total size.
+
+        Parameters:
+            location (str): This parameter takes the location of the sink, for example a directory.
+
+        Returns:
+            (tuple[int, int]): The amount of images, and their total size in bytes.
+        """
+        with self.__lock:
+            files, size = (
+                self.__connect()
+                .execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM images WHERE location = ?",
+                    (location,),
+                )
+                .fetchone()
+            )
+        return files, size
+
+    def touch(
+        self, location: str, names: list[str], *, used_at: float | None = None
+    ) -> int:
+        """
+        This method marks images as used, for example by the program that shows them, so the least recently used
+        images are evicted first.
+
+        Parameters:
+            location (str): This parameter takes the location of the sink the images were saved to.
+            names (list[str]): This parameter takes the names of the images.
+            used_at (float | None): This parameter takes the time the images were used at. Defaults to now.
+
+        Returns:
+            (int): The amount of recorded images that were marked.
+
+        Raises:
+            sqlite3.Error: If the database could not be written.
+        """
+        used_at = time.time() if used_at is None else used_at
+        with self.__lock:
+            connection = self.__connect()
+            marked = connection.executemany(
+                "UPDATE images SET used_at = ? WHERE location = ? AND name = ?",
+                [(used_at, location, name) for name in names],
+            ).rowcount
+            connection.commit()
+        return marked
+
+    def relocate(
+        self, location: str, name: str, new_location: str, new_name: str
+    ) -> bool:
+        """
+        This method records that an image was moved to another location, for example out of a temporary directory,
+        the image keeps its url, hash and times.
+
+        Parameters:
+            location (str): This parameter takes the location of the sink the image was saved to.
+            name (str): This parameter takes the name the image was saved with.
+            new_location (str): This parameter takes the location of the sink the image was moved to.
+            new_name (str): This parameter takes the name the image was moved to.
+
+        Returns:
+            (bool): Whether the image was recorded.
+
+        Raises:
+            sqlite3.Error: If the database could not be written.
+        """
+        with self.__lock:
+            connection = self.__connect()
+            moved = connection.execute(
+                "UPDATE images SET location = ?, name = ? WHERE location = ? AND name = ?",
+                (new_location, new_name, location, name),
+            ).rowcount
+            connection.commit()
+        return moved > 0
+
+    def evict(
+        self,
+        directory: Path,
+        *,
+        max_files: int | None = None,
+        max_bytes: int | None = None,
+        order: EvictionEnum = EvictionEnum.oldest,
+    ) -> list[CatalogueEntry]:
+        """
+        This method removes images from a directory until the recorded images in it fit within the quotas. The
+        images are picked from the catalogue in the given order, the directory is not listed.
+
+        Parameters:
+            directory (pathlib.Path): This parameter takes the directory.
+            max_files (int | None): This parameter takes the maximum amount of images the directory may hold.
+            max_bytes (int | None): This parameter takes the maximum total size in bytes of the images.
+            order (EvictionEnum): This parameter takes the order the images are evicted in. Default: oldest first.
+
+        Returns:
+            (list[CatalogueEntry]): The images that were removed.
+
+        Raises:
+            sqlite3.Error: If the database could not be written.
+        """
+        location = str(directory.absolute())
+        files, size = self.usage(location)
+        evicted: list[CatalogueEntry] = []
+        with self.__lock:
+            connection = self.__connect()
+            candidates = connection.execute(
+                f"SELECT id, {_COLUMNS} FROM images WHERE location = ? ORDER BY {_EVICTION_ORDERS[order]}",
+                (location,),
+            )
+            removed: list[tuple[int]] = []
+            for identifier, *columns in candidates:
+                if (max_files is None or files <= max_files) and (
+                    max_bytes is None or size <= max_bytes
+                ):
+                    break
+                entry = CatalogueEntry(*columns)
+                try:
+                    (directory / entry.name).unlink(missing_ok=True)
+                except OSError:
+                    # The file stays, so it still counts towards the quotas.
+                    continue
+                removed.append((identifier,))
+                evicted.append(entry)
+                files -= 1
+                size -= entry.size
+            candidates.close()
+            connection.executemany("DELETE FROM images WHERE id = ?", removed)
+            connection.commit()
+        return evicted
+
+    def close(self) -> None:
+        """
+        This method closes the database.
+        """
+        with self.__lock:
+            if self.__connection is not None:
+                self.__connection.close()
+                self.__connection = None
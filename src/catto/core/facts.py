@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import json
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+from loguru import logger
+
+from ..utils.enums import CategoryEnum
+from ..utils.helpers import default_cache_directory
+
+__all__ = ("FactStore",)
+
+
+class FactStore:
+    """
+    A class that keeps a local store of facts for each animal category, so facts can be served instantly and while
+    offline. The facts of a category are refreshed in the background once they are older than the time to live.
+    """
+
+    def __init__(
+        self,
+        directory: Path | None = None,
+        *,
+        ttl: float = 24 * 60 * 60,
+        capacity: int = 500,
+    ):
+        """
+        Parameters:
+            directory (pathlib.Path | None): This parameter takes the directory where the facts are stored.
+                                             Defaults to the "facts" directory in catto's cache directory.
+            ttl (float): This parameter takes the time in seconds after which the facts of a category are
+                         refreshed. Default: 1 day.
+            capacity (int): This parameter takes the maximum amount of facts kept for each category. Default: 500.
+        """
+        self.__directory = directory or default_cache_directory() / "facts"
+        self.__ttl = ttl
+        self.__capacity = capacity
+        self.__lock = threading.Lock()
+        self.__refreshes: dict[CategoryEnum, threading.Thread] = {}
+
+    def __path(self, category: CategoryEnum) -> Path:
+        return self.__directory / f"{category.name}.json"
+
+    def __read(self, category: CategoryEnum) -> dict[str, float | list[str]]:
+        try:
+            return json.loads(self.__path(category).read_text("utf-8"))
+        except (OSError, ValueError):
+            return {"fetched_at": 0.0, "facts": []}
+
+    def facts(self, category: CategoryEnum) -> list[str]:
+        """
+        This method returns all the stored facts of the specified category.
+
+        Parameters:
+            category (CategoryEnum): This parameter takes the animal category.
+
+        Returns:
+            (list[str]): The stored facts, oldest first.
+        """
+        return list(self.__read(category)["facts"])
+
+    def is_stale(self, category: CategoryEnum) -> bool:
+        """
+        This method checks if the facts of the specified category are older than the time to live.
+
+        Parameters:
+            category (CategoryEnum): This parameter takes the animal category.
+
+        Returns:
+            (bool): True if the facts should be refreshed, False otherwise.
+        """
+        fetched_at = float(self.__read(category)["fetched_at"])
+        return time.time() - fetched_at > self.__ttl
+
+    def add(
+        self,
+        category: CategoryEnum,
+        facts: list[str],
+        *,
+        refreshed: bool = True,
+    ) -> int:
+        """
+        This method adds new facts to the store of the specified category, facts that are already stored are
+        ignored.
+
+        Parameters:
+            category (CategoryEnum): This parameter takes the animal category.
+            facts (list[str]): This parameter takes the facts to add.
+            refreshed (bool): This parameter takes whether the facts are a batch fetched to refresh the store,
+                              which restarts its time to live. Facts that came along with other requests don't
+                              keep stale facts from being refreshed. Default: True.
+
+        Returns:
+            (int): The amount of facts that were not stored before.
+        """
+        if not facts:
+            return 0
+        with self.__lock:
+            data = self.__read(category)
+            stored: list[str] = list(data["facts"])
+            new_facts = [
+                fact for fact in dict.fromkeys(facts) if fact not in stored
+            ]
+            stored = (stored + new_facts)[-self.__capacity :]
+
+            path = self.__path(category)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = path.with_name(f".{path.name}.{os.getpid()}")
+            fetched_at = time.time() if refreshed else data["fetched_at"]
+            temporary.write_text(
+                json.dumps({"fetched_at": fetched_at, "facts": stored}), "utf-8"
+            )
+            os.replace(temporary, path)
+        return len(new_facts)
+
+    def sample(self, category: CategoryEnum, amount: int) -> list[str]:
+        """
+        This method returns random unique facts of the specified category from the store.
+
+        Parameters:
+            category (CategoryEnum): This parameter takes the animal category.
+            amount (int): This parameter takes the amount of facts to return.
+
+        Returns:
+            (list[str]): The facts, there may be less than `amount` facts if the store does not have enough.
+        """
+        facts = self.facts(category)
+        return random.sample(facts, min(amount, len(facts)))
+
+    def refresh_in_background(
+        self, category: CategoryEnum, fetch: Callable[[], list[str]]
+    ) -> None:
+        """
+        This method refreshes the facts of the specified category in a background thread, unless a refresh of the
+        category is already running.
+
+        Parameters:
+            category (CategoryEnum): This parameter takes the animal category.
+            fetch (Callable[[], list[str]]): This parameter takes a function that fetches new facts.
+        """
+
+        def refresh() -> None:
+            try:
+                added = self.add(category, fetch())
+                logger.debug(f"Stored {added} new facts about {category.name}.")
+            except Exception as e:
+                logger.debug(
+                    f"Failed to refresh facts about {category.name}: {e}"
+                )
+
+        with self.__lock:
+            running = self.__refreshes.get(category)
+            if running is not None and running.is_alive():
+                return
+            thread = threading.Thread(
+                target=refresh, name=f"catto-facts-{category.name}", daemon=True
+            )
+            self.__refreshes[category] = thread
+            thread.start()
+
+    def wait(self, timeout: float | None = None) -> None:
+        """
+        This method waits for the running background refreshes to finish.
+
+        Parameters:
+            timeout (float | None): This parameter takes the maximum time in seconds to wait for each refresh.
+        """
+        for thread in list(self.__refreshes.values()):
+            thread.join(timeout)
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import contextvars
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Callable, TypeVar
+
+from .retry import RetryBudget
+
+__all__ = ("LatencyTracker", "HedgePolicy")
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """
+    This class keeps the durations of the most recent requests of a kind, and returns a quantile of them, which is
+    how long a request may take before it is considered slow.
+    """
+
+    def __init__(
+        self,
+        *,
+        quantile: float = 0.95,
+        window: int = 200,
+        minimum_samples: int = 20,
+        initial: float = 2.0,
+        floor: float = 0.05,
+    ):
+        """
+        Parameters:
+            quantile (float): This parameter takes the quantile of the durations to return. Default: 0.95.
+            window (int): This parameter takes the amount of recent durations that are kept. Default: 200.
+            minimum_samples (int): This parameter takes the amount of durations needed before the quantile is
+                                   trusted, the initial threshold is used until then. Default: 20.
+            initial (float): This parameter takes the threshold in seconds used before there are enough durations.
+                             Default: 2.0.
+            floor (float): This parameter takes the shortest threshold in seconds, so fast runs don't double every
+                           request that is slightly slower than usual. Default: 0.05.
+        """
+        self.__quantile = quantile
+        self.__minimum_samples = minimum_samples
+        self.__initial = initial
+        self.__floor = floor
+        self.__durations: deque[float] = deque(maxlen=window)
+        self.__lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        """
+        This method keeps the duration of a request.
+        """
+        with self.__lock:
+            self.__durations.append(seconds)
+
+    def threshold(self) -> float:
+        """
+        This method returns the quantile of the recent durations in seconds.
+        """
+        with self.__lock:
+            if len(self.__durations) < self.__minimum_samples:
+                return self.__initial
+            durations = sorted(self.__durations)
+        index = min(
+            len(durations) - 1, math.ceil(self.__quantile * len(durations)) - 1
+        )
+        return max(self.__floor, durations[index])
+
+
+class HedgePolicy:
+    """
+    This class cuts the tail latency of requests by hedging them: when a request has not answered within the usual
+    quantile of the durations of its kind, a copy of it is sent on another connection, the first answer is used and
+    the other request is cancelled. The copies are limited by a budget, so a slow server doesn't get twice the load.
+    """
+
+    def __init__(
+        self,
+        *,
+        quantile: float = 0.95,
+        initial: float = 2.0,
+        budget: RetryBudget | None = None,
+    ):
+        """
+        Parameters:
+            quantile (float): This parameter takes the quantile of the durations of a kind of request after which it
+                              is hedged. Default: 0.95.
+            initial (float): This parameter takes the time in seconds after which a request is hedged, until enough
+                             requests of its kind were made to know their quantile. Default: 2.0.
+            budget (RetryBudget | None): This parameter takes the budget of the copies of all requests together.
+                                         Defaults to 10% of the requests.
+        """
+        self.__quantile = quantile
+        self.__initial = initial
+        self.__budget = budget or RetryBudget(ratio=0.1, minimum=2)
+        self.__trackers: dict[str, LatencyTracker] = {}
+        self.__lock = threading.Lock()
+
+    @property
+    def budget(self) -> RetryBudget:
+        """
+        This property returns the budget of the copies of the requests.
+        """
+        return self.__budget
+
+    def tracker(self, kind: str) -> LatencyTracker:
+        """
+        This method returns the durations of a kind of request, for example "metadata" or "image".
+        """
+        with self.__lock:
+            if kind not in self.__trackers:
+                self.__trackers[kind] = LatencyTracker(
+                    quantile=self.__quantile, initial=self.__initial
+                )
+            return self.__trackers[kind]
+
+    def call(self, kind: str, function: Callable[[threading.Event], T]) -> T:
+        """
+        This method makes a request, and hedges it if it is slow.
+
+        Parameters:
+            kind (str): This parameter takes the kind of the request, requests of a kind share their durations.
+            function (Callable[[threading.Event], T]): This parameter takes the request, it is passed an event that
+                                                       is set once its answer is not needed anymore, so it can stop
+                                                       early.
+
+        Returns:
+            (T): The first successful answer.
+
+        Raises:
+            Exception: The exception of the first request, if both requests failed.
+        """
+        tracker = self.tracker(kind)
+        self.__budget.record_call()
+        attempts: dict[Future[T], threading.Event] = {}
+        first = self.__start(function, tracker, attempts)
+        done, _ = wait(attempts, timeout=tracker.threshold())
+        if not done and self.__budget.try_retry():
+            self.__start(function, tracker, attempts)
+        pending = set(attempts)
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        return future.result()
+            return first.result()
+        finally:
+            for event in attempts.values():
+                event.set()
+
+    @staticmethod
+    def __start(
+        function: Callable[[threading.Event], T],
+        tracker: LatencyTracker,
+        attempts: dict[Future[T], threading.Event],
+    ) -> Future[T]:
+        """
+        This method starts an attempt of a request on a daemon thread, so a stuck attempt can't keep catto from
+        exiting. The attempt runs in a copy of the context of the caller, and is added to the attempts with the
+        event that cancels it.
+        """
+        future: Future[T] = Future()
+        cancelled = attempts[future] = threading.Event()
+        context = contextvars.copy_context()
+
+        def run() -> None:
+            started = time.perf_counter()
+            try:
+                result = context.run(function, cancelled)
+            except BaseException as e:
+                future.set_exception(e)
+                return
+            tracker.record(time.perf_counter() - started)
+            future.set_result(result)
+
+        threading.Thread(target=run, name="catto-hedge", daemon=True).start()
+        return future
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+
+from ..utils.enums import CategoryEnum
+from ..utils.helpers import default_cache_directory
+
+__all__ = ("KnownHosts",)
+
+
+class KnownHosts:
+    """
+    A class that remembers the hosts that the images of each animal category were served from, so the next run can
+    connect to them before it even knows the url of its first image.
+    """
+
+    def __init__(self, path: Path | None = None, *, capacity: int = 4):
+        """
+        Parameters:
+            path (pathlib.Path | None): This parameter takes the file where the hosts are stored. Defaults to
+                                        "hosts.json" in catto's cache directory.
+            capacity (int): This parameter takes the maximum amount of hosts kept for each category, the most
+                            recently seen are kept. Default: 4.
+        """
+        self.__path = path or default_cache_directory() / "hosts.json"
+        self.__capacity = capacity
+        self.__lock = threading.Lock()
+        self.__hosts: dict[str, list[str]] | None = None
+
+    def __load(self) -> dict[str, list[str]]:
+        if self.__hosts is None:
+            try:
+                self.__hosts = json.loads(self.__path.read_text("utf-8"))
+            except (OSError, ValueError):
+                self.__hosts = {}
+        return self.__hosts
+
+    def hosts(self, category: CategoryEnum) -> list[str]:
+        """
+        This method returns the hosts that images of the specified category were served from, most recent last.
+        """
+        with self.__lock:
+            return list(self.__load().get(category.name, []))
+
+    def add(self, category: CategoryEnum, host: str) -> None:
+        """
+        This method remembers that an image of the specified category was served from the host. The file is only
+        written when the host is new to the category.
+
+        Parameters:
+            category (CategoryEnum): This parameter takes the animal category.
+            host (str): This parameter takes the host, for example "i.some-random-api.ml".
+        """
+        with self.__lock:
+            hosts = self.__load().setdefault(category.name, [])
+            if host in hosts:
+                return
+            hosts.append(host)
+            del hosts[: -self.__capacity]
+            try:
+                self.__path.parent.mkdir(parents=True, exist_ok=True)
+                temporary = self.__path.with_name(
+                    f".{self.__path.name}.{os.getpid()}"
+                )
+                temporary.write_text(json.dumps(self.__hosts), "utf-8")
+                os.replace(temporary, self.__path)
+            except OSError:
+                pass
@@ -13,6 +13,8 @@ import questionary
 from colorama import Fore
 
 from ..core.api import Client
+from ..core.output import DirectorySink
+from ..core.prefetch import Prefetcher
 from ..utils.enums import CategoryEnum, ColorEnum
 from ..utils.exceptions import CategoryFactNotFound
 from ..utils.helpers import interactive_print
@@ -25,8 +27,20 @@ class Controller:
     This class is responsible for the interactive mode of the program.
     """
 
-    def __init__(self):
-        self.__client = Client()
+    def __init__(self, client: Client):
+        """
+        Parameters:
+            client (Client): This parameter takes the client to download the images and the facts with, the one
+                             that the command line configures, so the images are recorded in its catalogue.
+        """
+        self.__client = client
+
+    @property
+    def client(self) -> Client:
+        """
+        This property returns the client that the images and the facts are downloaded with.
+        """
+        return self.__client
 
     @staticmethod
     def print_logo(typewriter_effect: bool = False) -> str | None:
@@ -50,7 +64,8 @@ class Controller:
         self, category: CategoryEnum
     ) -> str | None:
         """
-        This method returns a random fact about the animal that the user selected.
+        This method returns a random fact about the animal that the user selected, served from the local fact
+        store when possible.
 
         Parameters:
             category (CategoryEnum): This parameter takes animal that the user selected.
@@ -62,10 +77,10 @@ class Controller:
             CategoryFactNotFound: If the APIs json response does not contain a fact about the animal.
         """
         chosen_category = CategoryEnum[category.name]
-        fact = self.__client.fetch_fact_about_the_category(chosen_category)
-        if fact is None:
+        facts = self.__client.fetch_facts_about_the_category(chosen_category, 1)
+        if not facts:
             raise CategoryFactNotFound()
-        return fact
+        return facts[0]
 
     @staticmethod
     def ask_for_category_choice() -> CategoryEnum:
@@ -195,13 +210,22 @@ class Controller:
             end_with_newline=True,
         )
         category = self.ask_for_category_choice()
-        amount = self.ask_for_amount_of_images()
-        path = self.ask_for_path()
-        user_confirm = self.ask_for_confirmation(
-            category=category, amount=amount, path=path
-        )
+        # Start downloading while the remaining questions are answered, the images are kept aside until the
+        # download is confirmed.
+        prefetcher = Prefetcher(self.__client, category).start()
+        try:
+            amount = self.ask_for_amount_of_images()
+            prefetcher.limit = amount
+            path = self.ask_for_path()
+            user_confirm = self.ask_for_confirmation(
+                category=category, amount=amount, path=path
+            )
+        except BaseException:
+            prefetcher.discard()
+            raise
 
         if not user_confirm:
+            prefetcher.discard()
             interactive_print(
                 text="Download has been cancelled by user. Exiting.",
                 color=ColorEnum.red,
@@ -210,7 +234,15 @@ class Controller:
             )
             sys.exit(0)
         print("\n")
-        self.__client.download(animal=category, amount=amount, path=path)
+        sink = DirectorySink(path)
+        prefetched = prefetcher.commit(sink, amount)
+        if len(prefetched) < amount:
+            self.__client.download(
+                animal=category,
+                amount=amount - len(prefetched),
+                path=path,
+                sink=sink,
+            )
         interactive_print(
             text=f"Downloaded {amount} images of {category.name} to directory {path.name} successfully!",
             color=ColorEnum.cyan,
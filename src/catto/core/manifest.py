@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import secrets
+import threading
+import time
+from dataclasses import asdict, dataclass, field, replace
+from functools import partial
+from pathlib import Path
+from typing import Iterable
+
+from ..utils.enums import CategoryEnum
+from .catalogue import Catalogue, CatalogueEntry
+from .output import DirectorySink
+
+__all__ = ("Manifest", "ShardIndex", "MergeResult", "merge_shards")
+
+INDEX_NAME = "index.jsonl"
+"""
+The name of the file in a shard directory that lists the images of the shard.
+"""
+
+
+@dataclass(frozen=True)
+class Manifest:
+    """
+    This :func:`dataclass` stores a job that downloads a large amount of images split into shards, so every shard can
+    be downloaded by another machine without any coordination, and the shards merged afterwards.
+    """
+
+    namespace: str
+    """
+    The name of the job, the shard directories are named after it and only the indexes of the same job are merged.
+    """
+    shards: int
+    targets: dict[str, int]
+    """
+    The amount of images of each category that the whole job downloads.
+    """
+    created_at: float = field(default_factory=time.time)
+    version: int = 1
+
+    @classmethod
+    def plan(
+        cls,
+        targets: dict[CategoryEnum, int],
+        shards: int,
+        namespace: str | None = None,
+    ) -> Manifest:
+        """
+        This method returns a new job.
+
+        Parameters:
+            targets (dict[CategoryEnum, int]): This parameter takes the amount of images of each category.
+            shards (int): This parameter takes the amount of shards the job is split into.
+            namespace (str | None): This parameter takes the name of the job. Defaults to a random name.
+
+        Returns:
+            (Manifest): The job.
+
+        Raises:
+            ValueError: If the amount of shards is not positive, or the name can't be used in directory names.
+        """
+        if shards < 1:
+            raise ValueError("A job needs at least one shard.")
+        namespace = namespace or f"catto-{secrets.token_hex(4)}"
+        if not namespace.replace("-", "").replace("_", "").isalnum():
+            raise ValueError(
+                f"'{namespace}' is not a valid namespace, use letters, digits, '-' and '_'."
+            )
+        return cls(
+            namespace=namespace,
+            shards=shards,
+            targets={animal.name: amount for animal, amount in targets.items()},
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> Manifest:
+        """
+        This method reads a job from its manifest file.
+
+        Raises:
+            OSError: If the file can't be read.
+            ValueError: If the file is not a valid manifest.
+        """
+        try:
+            fields = json.loads(path.read_text("utf-8"))
+            manifest = cls(**fields)
+            for name in manifest.targets:
+                CategoryEnum[name]
+        except (TypeError, KeyError, AttributeError) as e:
+            raise ValueError(f"{path} is not a valid manifest: {e}")
+        if manifest.version != 1 or manifest.shards < 1:
+            raise ValueError(
+                f"{path} is not a valid manifest: version {manifest.version} with {manifest.shards} shards."
+            )
+        return manifest
+
+    def save(self, path: Path) -> None:
+        """
+        This method writes the manifest file of the job.
+        """
+        path.write_text(json.dumps(asdict(self), indent=2) + "\n", "utf-8")
+
+    def shard_targets(self, shard: int) -> dict[CategoryEnum, int]:
+        """
+        This method returns the amount of images of each category that a shard downloads. The amounts are split as
+        evenly as possible, the first shards take the remainder.
+
+        Parameters:
+            shard (int): This parameter takes the number of the shard, from 1 to :attr:`shards`.
+
+        Raises:
+            ValueError: If the shard does not exist.
+        """
+        if not 1 <= shard <= self.shards:
+            raise ValueError(
+                f"The job has shards 1 to {self.shards}, not shard {shard}."
+            )
+        return {
+            CategoryEnum[name]: amount // self.shards
+            + (1 if shard <= amount % self.shards else 0)
+            for name, amount in self.targets.items()
+        }
+
+    def shard_directory(self, shard: int) -> str:
+        """
+        This method returns the name of the directory that a shard writes its images and its index into.
+        """
+        width = len(str(self.shards))
+        return f"{self.namespace}-shard-{shard:0{width}d}-of-{self.shards}"
+
+
+class ShardIndex:
+    """
+    A class that lists the images of a directory in a JSON lines file next to them, so the directory can be moved to
+    another machine and merged without its catalogue.
+    """
+
+    def __init__(self, directory: Path, namespace: str):
+        """
+        Parameters:
+            directory (pathlib.Path): This parameter takes the directory of the images.
+            namespace (str): This parameter takes the name of the job the images belong to.
+        """
+        self.__path = directory / INDEX_NAME
+        self.__namespace = namespace
+        self.__lock = threading.Lock()
+
+    @property
+    def path(self) -> Path:
+        """
+        This property returns the index file.
+        """
+        return self.__path
+
+    def entries(self) -> list[CatalogueEntry]:
+        """
+        This method returns the images in the index whose files still exist.
+
+        Raises:
+            ValueError: If the index belongs to another job, or is not valid.
+        """
+        entries: list[CatalogueEntry] = []
+        with self.__lock:
+            try:
+                lines = self.__path.read_text("utf-8").splitlines()
+            except FileNotFoundError:
+                return entries
+        for line in filter(None, lines):
+            fields = json.loads(line)
+            namespace = fields.pop("namespace", None)
+            if namespace != self.__namespace:
+                raise ValueError(
+                    f"{self.__path} belongs to the job '{namespace}', not '{self.__namespace}'."
+                )
+            try:
+                entry = CatalogueEntry(**fields)
+            except TypeError as e:
+                raise ValueError(f"{self.__path} is not a valid index: {e}")
+            if (self.__path.parent / entry.name).is_file():
+                entries.append(entry)
+        return entries
+
+    def append(self, entries: Iterable[CatalogueEntry]) -> None:
+        """
+        This method adds images to the index.
+        """
+        lines = "".join(
+            json.dumps({"namespace": self.__namespace, **asdict(entry)}) + "\n"
+            for entry in entries
+        )
+        with self.__lock:
+            with self.__path.open("a", encoding="utf-8") as file:
+                file.write(lines)
+                file.flush()
+                os.fsync(file.fileno())
+
+
+def _sha256(path: Path) -> str:
+    """
+    This function returns the SHA-256 hash of the body of a file in hex.
+    """
+    digest = hashlib.sha256()
+    with path.open("rb") as file:
+        # hashlib.file_digest is only available from Python 3.11 on.
+        for chunk in iter(partial(file.read, 1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class MergeResult:
+    """
+    This :func:`dataclass` stores the outcome of :func:`merge_shards`.
+    """
+
+    counts: dict[str, int]
+    """
+    The amount of images of each category that were merged.
+    """
+    duplicates: int
+    """
+    The amount of images that were skipped, because an image with the same body was merged already.
+    """
+    missing_shards: list[int]
+    """
+    The numbers of the shards whose directories were not found.
+    """
+
+
+def merge_shards(
+    manifest: Manifest,
+    directory: Path,
+    sink: DirectorySink,
+    catalogue: Catalogue | None = None,
+) -> MergeResult:
+    """
+    This function combines the images of the shards of a job into one directory, images with the same body are only
+    merged once, also across runs. The images are linked instead of copied if the file system allows it, and the
+    directory gets an index of its own, so merged directories can be merged again.
+
+    Parameters:
+        manifest (Manifest): This parameter takes the job.
+        directory (pathlib.Path): This parameter takes the directory holding the shard directories.
+        sink (DirectorySink): This parameter takes the directory to merge the images into.
+        catalogue (Catalogue | None): This parameter takes the catalogue to record the merged images in.
+
+    Returns:
+        (MergeResult): The outcome of the merge.
+
+    Raises:
+        ValueError: If one of the indexes belongs to another job.
+    """
+    merged_index = ShardIndex(sink.directory, manifest.namespace)
+    seen = {entry.sha256 for entry in merged_index.entries()}
+    result = MergeResult(counts={}, duplicates=0, missing_shards=[])
+    for shard in range(1, manifest.shards + 1):
+        shard_directory = directory / manifest.shard_directory(shard)
+        if not shard_directory.is_dir():
+            result.missing_shards.append(shard)
+            continue
+        merged: list[CatalogueEntry] = []
+        for entry in ShardIndex(shard_directory, manifest.namespace).entries():
+            if entry.sha256 in seen:
+                result.duplicates += 1
+                continue
+            seen.add(entry.sha256)
+            target = sink.directory / entry.name
+            if target.is_file() and _sha256(target) == entry.sha256:
+                # The image was placed by a merge that was interrupted before it indexed the shard.
+                name = entry.name
+            else:
+                name = sink.add_file(entry.name, shard_directory / entry.name)
+            merged.append(replace(entry, name=name, location=sink.location))
+            result.counts[entry.category] = (
+                result.counts.get(entry.category, 0) + 1
+            )
+        # Every shard is indexed as soon as it is merged, so an interrupted merge only repeats the shard it stopped
+        # in.
+        merged_index.append(merged)
+        if catalogue is not None:
+            for entry in merged:
+                catalogue.record(entry)
+    return result
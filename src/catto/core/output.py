@@ -0,0 +1,457 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import contextvars
+import hashlib
+import os
+import queue
+import re
+import secrets
+import shutil
+import sys
+import tarfile
+import threading
+import time
+import zipfile
+from concurrent.futures import Future
+from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO, Callable, TypeVar
+
+from ..utils.enums import CategoryEnum
+from ..utils.exceptions import PathNotFound
+from ..utils.helpers import link_or_copy
+from ..utils.tracing import tracer
+
+__all__ = (
+    "ImageSink",
+    "DirectorySink",
+    "TarSink",
+    "ZipSink",
+    "ThreadedSink",
+    "open_sink",
+    "image_name",
+)
+
+_HEX_CODE = re.compile(r"-[0-9a-f]+(?=\.[^.]+$)")
+
+T = TypeVar("T")
+
+
+def _run_now(function: Callable[..., T], *args: object) -> Future[T]:
+    """
+    This function calls the function right away, and returns a future holding its result or its exception.
+    """
+    future: Future[T] = Future()
+    try:
+        future.set_result(function(*args))
+    except BaseException as e:
+        future.set_exception(e)
+    return future
+
+
+def image_name(animal: CategoryEnum, image_format: str) -> str:
+    """
+    This function returns a new name for an image, in the `<category>-image-<random-hex>.<format>` format.
+
+    Parameters:
+        animal (CategoryEnum): This parameter takes the animal category of the image.
+        image_format (str): This parameter takes the format of the image, for example "png".
+
+    Returns:
+        (str): The name of the image.
+    """
+    return f"{animal.name}-image-{secrets.token_hex(4)}.{image_format}"
+
+
+class ImageSink:
+    """
+    The base class of the destinations that downloaded images are written to. Sinks are safe to use from several
+    threads at once.
+    """
+
+    def write(self, name: str, data: bytes) -> str:
+        """
+        This method writes an image to the sink.
+
+        Parameters:
+            name (str): This parameter takes the name of the image.
+            data (bytes): This parameter takes the body of the image.
+
+        Returns:
+            (str): The name the image was written with, which differs from `name` if it was already taken.
+        """
+        raise NotImplementedError
+
+    def add_file(self, name: str, source: Path) -> str:
+        """
+        This method writes the image stored in the source file to the sink, the source file is left untouched.
+
+        Parameters:
+            name (str): This parameter takes the name of the image.
+            source (pathlib.Path): This parameter takes the path of the file holding the image.
+
+        Returns:
+            (str): The name the image was written with.
+        """
+        return self.write(name, source.read_bytes())
+
+    def move_file(self, name: str, source: Path) -> str:
+        """
+        This method moves the image stored in the source file to the sink.
+
+        Parameters:
+            name (str): This parameter takes the name of the image.
+            source (pathlib.Path): This parameter takes the path of the file holding the image.
+
+        Returns:
+            (str): The name the image was written with.
+        """
+        name = self.add_file(name, source)
+        source.unlink(missing_ok=True)
+        return name
+
+    def submit(self, name: str, data: bytes) -> Future[str]:
+        """
+        This method writes an image to the sink like :meth:`write`, but may do so in the background.
+
+        Parameters:
+            name (str): This parameter takes the name of the image.
+            data (bytes): This parameter takes the body of the image.
+
+        Returns:
+            (concurrent.futures.Future[str]): A future holding the name the image was written with, or the
+                                              :class:`OSError` that the write failed with.
+        """
+        return _run_now(self.write, name, data)
+
+    def submit_file(self, name: str, source: Path) -> Future[str]:
+        """
+        This method writes the image stored in the source file to the sink like :meth:`add_file`, but may do so in
+        the background.
+
+        Returns:
+            (concurrent.futures.Future[str]): A future holding the name the image was written with.
+        """
+        return _run_now(self.add_file, name, source)
+
+    def close(self) -> None:
+        """
+        This method finishes writing to the sink.
+        """
+        return
+
+    @property
+    def location(self) -> str:
+        """
+        This property returns a human-readable description of where the images are written.
+        """
+        raise NotImplementedError
+
+    def __enter__(self) -> ImageSink:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+
+class DirectorySink(ImageSink):
+    """
+    A sink that writes every image as its own file in a directory. Files are written under a temporary name and
+    renamed once complete, so a file with its final name is always a complete image.
+
+    With sharding, the images are spread over nested directories named after the hash of their name, for example
+    `3f/a9/cats-image-0c1d2e3f.png`, so no directory grows too large to list quickly.
+    """
+
+    def __init__(self, directory: Path, *, shard_depth: int = 0):
+        """
+        Parameters:
+            directory (pathlib.Path): This parameter takes the directory to write the images into.
+            shard_depth (int): This parameter takes the amount of nested hash-prefix directories to spread the
+                               images over, 0 writes them straight into the directory. Default: 0.
+
+        Raises:
+            PathNotFound: If the directory does not exist.
+        """
+        if not directory.is_dir():
+            raise PathNotFound(f"'{directory.name}' is not a valid directory.")
+        self.__directory = directory.absolute()
+        self.__shard_depth = shard_depth
+        self.__lock = threading.Lock()
+
+    @property
+    def directory(self) -> Path:
+        """
+        This property returns the directory that the images are written into.
+        """
+        return self.__directory
+
+    @property
+    def location(self) -> str:
+        return str(self.__directory)
+
+    def shard_of(self, name: str) -> Path:
+        """
+        This method returns the directory, relative to the sink's directory, that an image with the given name is
+        written into.
+        """
+        digest = hashlib.sha256(name.encode()).hexdigest()
+        return Path(
+            *(digest[2 * i : 2 * i + 2] for i in range(self.__shard_depth))
+        )
+
+    def write(self, name: str, data: bytes) -> str:
+        with tracer.span("sink.write", name=name, bytes=len(data)):
+            temporary = (
+                self.__directory / f".{name}.{threading.get_ident()}.part"
+            )
+            temporary.write_bytes(data)
+            return self.__commit(
+                name, lambda target: os.replace(temporary, target)
+            )
+
+    def add_file(self, name: str, source: Path) -> str:
+        with tracer.span("sink.add_file", name=name):
+            return self.__commit(
+                name, lambda target: link_or_copy(source, target)
+            )
+
+    def move_file(self, name: str, source: Path) -> str:
+        with tracer.span("sink.move_file", name=name):
+            return self.__commit(
+                name, lambda target: shutil.move(source, target)
+            )
+
+    def __commit(self, name: str, place: Callable[[Path], object]) -> str:
+        """
+        This method places a file under the given name, picking a new random hex code if the name is taken. The
+        returned name includes the shard directories, if any.
+        """
+        with self.__lock:
+            target = self.__directory / self.shard_of(name) / name
+            while target.exists():
+                name = _HEX_CODE.sub(f"-{secrets.token_hex(4)}", name, count=1)
+                target = self.__directory / self.shard_of(name) / name
+            if self.__shard_depth:
+                target.parent.mkdir(parents=True, exist_ok=True)
+            place(target)
+        return target.relative_to(self.__directory).as_posix()
+
+
+class _ArchiveSink(ImageSink):
+    """
+    The base class of the sinks that write the images into a single archive file, or into the standard output
+    when the target is "-". Each image is appended to the archive as soon as it is complete, without going through
+    intermediate files.
+    """
+
+    def __init__(self, target: Path | str):
+        self.__target = str(target)
+        self._lock = threading.Lock()
+        self._stream: BinaryIO = (
+            sys.stdout.buffer
+            if self.__target == "-"
+            else open(self.__target, "wb")
+        )
+
+    @property
+    def location(self) -> str:
+        return "standard output" if self.__target == "-" else self.__target
+
+    def close(self) -> None:
+        self._stream.flush()
+        if self.__target != "-":
+            self._stream.close()
+
+
+class TarSink(_ArchiveSink):
+    """
+    A sink that writes the images into a tar archive, compressed with gzip when the target ends with ".gz" or
+    ".tgz".
+    """
+
+    def __init__(self, target: Path | str):
+        """
+        Parameters:
+            target (pathlib.Path | str): This parameter takes the path of the archive, or "-" for the standard
+                                         output.
+        """
+        super().__init__(target)
+        compression = "gz" if str(target).endswith((".gz", ".tgz")) else ""
+        self.__archive = tarfile.open(
+            fileobj=self._stream, mode=f"w|{compression}"
+        )
+
+    def write(self, name: str, data: bytes) -> str:
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        info.mode = 0o644
+        with tracer.span("sink.write", name=name, bytes=len(data)):
+            with self._lock:
+                self.__archive.addfile(info, BytesIO(data))
+                self._stream.flush()
+        return name
+
+    def close(self) -> None:
+        with self._lock:
+            self.__archive.close()
+            super().close()
+
+
+class ZipSink(_ArchiveSink):
+    """
+    A sink that writes the images into a zip archive. The images are stored without compression, as image formats
+    are already compressed.
+    """
+
+    def __init__(self, target: Path | str):
+        """
+        Parameters:
+            target (pathlib.Path | str): This parameter takes the path of the archive, or "-" for the standard
+                                         output.
+        """
+        super().__init__(target)
+        self.__archive = zipfile.ZipFile(
+            self._stream, mode="w", compression=zipfile.ZIP_STORED
+        )
+
+    def write(self, name: str, data: bytes) -> str:
+        info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+        info.external_attr = 0o644 << 16
+        with tracer.span("sink.write", name=name, bytes=len(data)):
+            with self._lock:
+                self.__archive.writestr(info, data)
+                self._stream.flush()
+        return name
+
+    def close(self) -> None:
+        with self._lock:
+            self.__archive.close()
+            super().close()
+
+
+class ThreadedSink(ImageSink):
+    """
+    A sink that hands the writes to a pool of writer threads, so slow disks or network filesystems don't hold up
+    the downloads. The queue of pending writes is bounded, once it is full :meth:`submit` waits for a free slot.
+    """
+
+    def __init__(
+        self, sink: ImageSink, *, workers: int = 2, queue_size: int = 16
+    ):
+        """
+        Parameters:
+            sink (ImageSink): This parameter takes the sink that the writer threads write to.
+            workers (int): This parameter takes the amount of writer threads. Default: 2.
+            queue_size (int): This parameter takes the maximum amount of writes waiting for a writer. Default: 16.
+        """
+        self.__sink = sink
+        self.__queue: queue.Queue[
+            tuple[Future, contextvars.Context, Callable[..., str], tuple] | None
+        ] = queue.Queue(maxsize=queue_size)
+        self.__threads = [
+            threading.Thread(
+                target=self.__work, name=f"catto-writer-{index}", daemon=True
+            )
+            for index in range(workers)
+        ]
+        for thread in self.__threads:
+            thread.start()
+
+    @property
+    def sink(self) -> ImageSink:
+        """
+        This property returns the sink that the writer threads write to.
+        """
+        return self.__sink
+
+    @property
+    def location(self) -> str:
+        return self.__sink.location
+
+    def write(self, name: str, data: bytes) -> str:
+        return self.submit(name, data).result()
+
+    def add_file(self, name: str, source: Path) -> str:
+        return self.submit_file(name, source).result()
+
+    def move_file(self, name: str, source: Path) -> str:
+        return self.__sink.move_file(name, source)
+
+    def submit(self, name: str, data: bytes) -> Future[str]:
+        return self.__enqueue(self.__sink.write, name, data)
+
+    def submit_file(self, name: str, source: Path) -> Future[str]:
+        return self.__enqueue(self.__sink.add_file, name, source)
+
+    def close(self) -> None:
+        """
+        This method waits for the pending writes to finish, stops the writer threads and closes the sink.
+        """
+        for _ in self.__threads:
+            self.__queue.put(None)
+        for thread in self.__threads:
+            thread.join()
+        self.__sink.close()
+
+    def __enqueue(
+        self, function: Callable[..., str], *args: object
+    ) -> Future[str]:
+        future: Future[str] = Future()
+        # The write runs in a copy of the context of the caller, so its span is part of the span of the image.
+        self.__queue.put((future, contextvars.copy_context(), function, args))
+        return future
+
+    def __work(self) -> None:
+        """
+        This method runs the writes of the queue until it receives the signal to stop.
+        """
+        while (item := self.__queue.get()) is not None:
+            future, context, function, args = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(context.run(function, *args))
+            except BaseException as e:
+                future.set_exception(e)
+
+
+def open_sink(
+    path: Path,
+    archive: str | None = None,
+    *,
+    shard_depth: int = 0,
+    writers: int = 0,
+) -> ImageSink:
+    """
+    This function opens the sink that a download writes its images to.
+
+    Parameters:
+        path (pathlib.Path): This parameter takes the directory to write the images into, when no archive is given.
+        archive (str | None): This parameter takes the path of an archive to write the images into instead. Paths
+                              ending with ".zip" create a zip archive, anything else a tar archive, and "-" writes a
+                              tar archive to the standard output.
+        shard_depth (int): This parameter takes the amount of nested hash-prefix directories to spread the images
+                           of a directory over, archives can't be sharded. Default: 0.
+        writers (int): This parameter takes the amount of writer threads, 0 writes the images on the download
+                       thread. Default: 0.
+
+    Returns:
+        (ImageSink): The sink.
+
+    Raises:
+        ValueError: If both an archive and a shard depth are given.
+    """
+    if archive is not None and shard_depth:
+        raise ValueError("An archive can not be spread over shard directories.")
+    if archive is None:
+        sink: ImageSink = DirectorySink(path, shard_depth=shard_depth)
+    elif archive.lower().endswith(".zip"):
+        sink = ZipSink(archive)
+    else:
+        sink = TarSink(archive)
+    if writers > 0:
+        return ThreadedSink(sink, workers=writers)
+    return sink
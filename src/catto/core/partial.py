@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from ..utils.helpers import default_cache_directory
+
+__all__ = ("PartialDownload", "PartialStore")
+
+
+@dataclass
+class PartialDownload:
+    """
+    This :func:`dataclass` stores the first bytes of a body whose transfer failed halfway, and what is needed to
+    continue it with a `Range` request.
+    """
+
+    url: str
+    data: bytes
+    length: int
+    """
+    The size of the whole body in bytes.
+    """
+    validator: str
+    """
+    The strong ETag or the Last-Modified date of the body, which is sent as `If-Range`, so a body that changed in
+    the meantime is sent whole instead of being spliced.
+    """
+    stored_at: float
+
+
+class PartialStore:
+    """
+    A class that keeps partial downloads on disk, each as a `.part` file with the body received so far and a `.json`
+    file with its expected length and validator, so a failed transfer can continue where it stopped.
+    """
+
+    def __init__(
+        self, directory: Path | None = None, *, max_age: float = 86400.0
+    ):
+        """
+        Parameters:
+            directory (pathlib.Path | None): This parameter takes the directory to keep the partial downloads in.
+                                             Defaults to "partial" in catto's cache directory.
+            max_age (float): This parameter takes the time in seconds after which a partial download is thrown away.
+                             Default: 86400.0.
+        """
+        self.__directory = directory or default_cache_directory() / "partial"
+        self.__max_age = max_age
+        self.__lock = threading.Lock()
+
+    @property
+    def directory(self) -> Path:
+        """
+        This property returns the directory that the partial downloads are kept in.
+        """
+        return self.__directory
+
+    def __paths(self, url: str) -> tuple[Path, Path]:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return (
+            self.__directory / f"{key}.part",
+            self.__directory / f"{key}.json",
+        )
+
+    def load(self, url: str) -> PartialDownload | None:
+        """
+        This method returns the partial download of a url, if one was kept and it is not too old.
+        """
+        body, metadata = self.__paths(url)
+        with self.__lock:
+            try:
+                fields = json.loads(metadata.read_text("utf-8"))
+                data = body.read_bytes()
+            except (OSError, ValueError):
+                return None
+        partial = PartialDownload(**{**fields, "data": data})
+        if (
+            partial.url != url
+            or time.time() - partial.stored_at > self.__max_age
+        ):
+            self.discard(url)
+            return None
+        return partial
+
+    def save(self, url: str, data: bytes, length: int, validator: str) -> None:
+        """
+        This method keeps the partial download of a url, replacing an older one.
+
+        Parameters:
+            url (str): This parameter takes the url of the body.
+            data (bytes): This parameter takes the first bytes of the body.
+            length (int): This parameter takes the size of the whole body in bytes.
+            validator (str): This parameter takes the strong ETag or the Last-Modified date of the body.
+        """
+        body, metadata = self.__paths(url)
+        fields = asdict(
+            PartialDownload(url, b"", length, validator, time.time())
+        )
+        del fields["data"]
+        with self.__lock:
+            try:
+                self.__directory.mkdir(parents=True, exist_ok=True)
+                for path, content in (
+                    (body, data),
+                    (metadata, json.dumps(fields).encode()),
+                ):
+                    temporary = path.with_name(f".{path.name}.{os.getpid()}")
+                    temporary.write_bytes(content)
+                    os.replace(temporary, path)
+            except OSError:
+                pass
+
+    def discard(self, url: str) -> None:
+        """
+        This method forgets the partial download of a url.
+        """
+        with self.__lock:
+            for path in self.__paths(url):
+                path.unlink(missing_ok=True)
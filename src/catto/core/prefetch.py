@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import shutil
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+
+import httpx
+from loguru import logger
+
+from ..utils.enums import CategoryEnum
+from ..utils.exceptions import (
+    ByteBudgetExceeded,
+    DataFetchFailed,
+    ImageDownloadFailed,
+    InvalidImageURL,
+)
+from .api import Client
+from .output import DirectorySink, ImageSink
+
+__all__ = ("Prefetcher",)
+
+
+class Prefetcher:
+    """
+    A class that speculatively downloads images of a category into a temporary directory in the background, while
+    the user is still answering questions. Once the answers are known, the images are either committed to their
+    real destination or discarded. The images that the client records in its catalogue are moved in the catalogue
+    too, so they are recorded under their real destination, and the discarded ones are forgotten.
+    """
+
+    def __init__(
+        self, client: Client, category: CategoryEnum, *, limit: int = 1
+    ):
+        """
+        Parameters:
+            client (Client): This parameter takes the client to download the images with, its rate limiter paces the
+                             prefetch too.
+            category (CategoryEnum): This parameter takes the category of the images to prefetch.
+            limit (int): This parameter takes the amount of images to prefetch at most, it can be raised later with
+                         :attr:`limit`. Default: 1.
+        """
+        self.__client = client
+        self.__category = category
+        self.__limit = limit
+        self.__directory = Path(tempfile.mkdtemp(prefix="catto-prefetch-"))
+        self.__sink = DirectorySink(self.__directory)
+        self.__names: list[str] = []
+        self.__condition = threading.Condition()
+        self.__stopped = False
+        self.__thread = threading.Thread(
+            target=self.__run, name="catto-prefetch", daemon=True
+        )
+
+    @property
+    def category(self) -> CategoryEnum:
+        """
+        This property returns the category of the images that are prefetched.
+        """
+        return self.__category
+
+    @property
+    def directory(self) -> Path:
+        """
+        This property returns the temporary directory that the images are prefetched into.
+        """
+        return self.__directory
+
+    @property
+    def limit(self) -> int:
+        """
+        This property returns the amount of images to prefetch at most.
+        """
+        return self.__limit
+
+    @limit.setter
+    def limit(self, limit: int) -> None:
+        with self.__condition:
+            self.__limit = limit
+            self.__condition.notify_all()
+
+    @property
+    def ready(self) -> int:
+        """
+        This property returns the amount of images that were prefetched so far.
+        """
+        with self.__condition:
+            return len(self.__names)
+
+    def start(self) -> Prefetcher:
+        """
+        This method starts prefetching in the background.
+
+        Returns:
+            (Prefetcher): The prefetcher itself.
+        """
+        self.__thread.start()
+        return self
+
+    def commit(self, sink: ImageSink, amount: int) -> list[str]:
+        """
+        This method stops prefetching, and moves up to `amount` of the prefetched images into the sink. An image
+        that is being downloaded at that moment is waited for, the temporary directory is removed afterwards.
+
+        Parameters:
+            sink (ImageSink): This parameter takes the sink to move the images into.
+            amount (int): This parameter takes the amount of images that the user asked for.
+
+        Returns:
+            (list[str]): The names the images were written with, there may be less than `amount` of them.
+        """
+        self.__stop()
+        names: list[str] = []
+        try:
+            for name in self.__names[:amount]:
+                names.append(
+                    sink.move_file(Path(name).name, self.__directory / name)
+                )
+                self.__relocate(name, sink.location, names[-1])
+            return names
+        finally:
+            self.__remove()
+
+    def discard(self) -> None:
+        """
+        This method stops prefetching and deletes the prefetched images.
+        """
+        self.__stop()
+        self.__remove()
+
+    def __stop(self) -> None:
+        with self.__condition:
+            self.__stopped = True
+            self.__condition.notify_all()
+        if self.__thread.is_alive():
+            self.__thread.join()
+
+    def __relocate(self, name: str, location: str, new_name: str) -> None:
+        """
+        This method moves the catalogue entry of a committed image to its real destination.
+        """
+        catalogue = self.__client.catalogue
+        if catalogue is None:
+            return
+        try:
+            catalogue.relocate(self.__sink.location, name, location, new_name)
+        except sqlite3.Error as e:
+            logger.warning(
+                f"Failed to record the image {new_name} in the catalogue: {e}"
+            )
+
+    def __remove(self) -> None:
+        """
+        This method removes the temporary directory, and forgets the images that were left in it.
+        """
+        shutil.rmtree(self.__directory, ignore_errors=True)
+        if self.__client.catalogue is None:
+            return
+        try:
+            self.__client.catalogue.prune(self.__directory)
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to forget the prefetched images: {e}")
+
+    def __run(self) -> None:
+        """
+        This method downloads images into the temporary directory until the limit is reached, and waits for the
+        limit to be raised until it is stopped. Failures are not retried, the prefetch just ends, and the download
+        that follows fetches the missing images.
+        """
+        while True:
+            with self.__condition:
+                self.__condition.wait_for(
+                    lambda: self.__stopped or len(self.__names) < self.__limit
+                )
+                if self.__stopped:
+                    return
+            try:
+                name = self.__fetch()
+            except (
+                DataFetchFailed,
+                InvalidImageURL,
+                ImageDownloadFailed,
+                ByteBudgetExceeded,
+                httpx.HTTPError,
+            ) as e:
+                logger.debug(
+                    f"Stopped prefetching images of {self.__category.name}: {e!r}"
+                )
+                return
+            with self.__condition:
+                self.__names.append(name)
+
+    def __fetch(self) -> str:
+        self.__client.rate_limiter.acquire()
+        url = self.__client.fetch_image_url_of_endpoint(self.__category)
+        return self.__client.save_image_from_url(
+            url_of_image=url,
+            path=self.__directory,
+            animal=self.__category,
+            sink=self.__sink,
+        )["name"]
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import os
+import secrets
+import sqlite3
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+from loguru import logger
+
+from ..utils.enums import CategoryEnum
+from ..utils.exceptions import (
+    DataFetchFailed,
+    ImageDownloadFailed,
+    InvalidImageURL,
+)
+from ..utils.helpers import DecorrelatedJitterBackoff, default_cache_directory
+from .api import Client
+from .catalogue import Catalogue
+from .output import ImageSink
+
+__all__ = ("Reservoir",)
+
+
+class Reservoir:
+    """
+    A class that keeps a directory of images for each animal category filled up ahead of time, so a download can
+    just move the images that are already there into its directory, and top the reservoir up afterwards.
+    """
+
+    LOCK_TIMEOUT: float = 10 * 60
+    """
+    The time in seconds after which the lock of a fill that never finished is considered abandoned.
+    """
+
+    MAX_FAILURES: int = 5
+    """
+    The amount of images in a row that may fail before a fill gives up, for example while the API is down.
+    """
+
+    FAILURE_BACKOFF: float = 2.0
+    """
+    The shortest time in seconds that a fill waits after a failed image, the wait grows with every failure in a row.
+    """
+
+    def __init__(self, directory: Path | None = None, *, target: int = 20):
+        """
+        Parameters:
+            directory (pathlib.Path | None): This parameter takes the directory of the reservoir. Defaults to the
+                                             "reservoir" directory in catto's cache directory.
+            target (int): This parameter takes the amount of images to keep for each category. Default: 20.
+        """
+        self.__directory = (
+            directory or default_cache_directory() / "reservoir"
+        ).absolute()
+        self.__target = target
+
+    @property
+    def directory(self) -> Path:
+        """
+        This property returns the directory of the reservoir.
+        """
+        return self.__directory
+
+    @property
+    def target(self) -> int:
+        """
+        This property returns the amount of images to keep for each category.
+        """
+        return self.__target
+
+    def path_of(self, category: CategoryEnum) -> Path:
+        """
+        This method returns the directory that holds the images of the specified category.
+        """
+        return self.__directory / category.name
+
+    def images(self, category: CategoryEnum) -> list[Path]:
+        """
+        This method returns the images that are ready in the reservoir of the specified category, oldest first.
+        """
+        try:
+            entries = list(os.scandir(self.path_of(category)))
+        except FileNotFoundError:
+            return []
+        files: list[tuple[float, Path]] = []
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            try:
+                if entry.is_file():
+                    files.append((entry.stat().st_mtime, Path(entry.path)))
+            except FileNotFoundError:
+                # Another download took the image after the directory was listed.
+                continue
+        return [path for _, path in sorted(files)]
+
+    def count(self, category: CategoryEnum) -> int:
+        """
+        This method returns the amount of images that are ready in the reservoir of the specified category.
+        """
+        return len(self.images(category))
+
+    def take(
+        self,
+        category: CategoryEnum,
+        amount: int,
+        sink: ImageSink,
+        catalogue: Catalogue | None = None,
+    ) -> list[str]:
+        """
+        This method moves up to `amount` images of the specified category from the reservoir into the sink.
+
+        Parameters:
+            category (CategoryEnum): This parameter takes the animal category.
+            amount (int): This parameter takes the amount of images to move.
+            sink (ImageSink): This parameter takes the sink to move the images into, for example a directory.
+            catalogue (Catalogue | None): This parameter takes the catalogue to record the moved images in, if any.
+
+        Returns:
+            (list[str]): The names of the images that were moved, there may be less than `amount` of them.
+        """
+        names: list[str] = []
+        for image in self.images(category)[:amount]:
+            # Claim the image first, so concurrent downloads never take the same one.
+            claimed = image.with_name(f".taken-{os.getpid()}-{image.name}")
+            try:
+                os.replace(image, claimed)
+            except FileNotFoundError:
+                continue
+            try:
+                data = claimed.read_bytes() if catalogue is not None else b""
+                names.append(sink.move_file(image.name, claimed))
+            except OSError:
+                # Give the image back, so it isn't left claimed by nobody.
+                os.replace(claimed, image)
+                raise
+            if catalogue is None:
+                continue
+            try:
+                catalogue.add(category, names[-1], sink.location, data)
+            except sqlite3.Error as e:
+                logger.warning(
+                    f"Failed to record the image {names[-1]} in the catalogue: {e}"
+                )
+        return names
+
+    def fill(self, client: Client, category: CategoryEnum) -> int:
+        """
+        This method downloads images of the specified category until the reservoir holds its target amount. Only one
+        fill of a category runs at a time, a fill that finds another one running returns right away. After a failed
+        image the fill waits longer and longer, and it gives up after :attr:`MAX_FAILURES` failures in a row.
+
+        Parameters:
+            client (Client): This parameter takes the client to download the images with, its rate limiter paces
+                             the requests.
+            category (CategoryEnum): This parameter takes the animal category.
+
+        Returns:
+            (int): The amount of images that were added to the reservoir.
+        """
+        folder = self.path_of(category)
+        folder.mkdir(parents=True, exist_ok=True)
+        lock = folder / ".fill.lock"
+        owner = self.__acquire(lock)
+        if owner is None:
+            return 0
+
+        added = failures = 0
+        backoff = DecorrelatedJitterBackoff(
+            base=self.FAILURE_BACKOFF, maximum_time=60.0
+        )
+        try:
+            while self.count(category) < self.__target:
+                if not self.__refresh(lock, owner):
+                    logger.warning(
+                        f"The fill of the reservoir of {category.name} was taken over by another process."
+                    )
+                    break
+                client.rate_limiter.acquire()
+                try:
+                    url = client.fetch_image_url_of_endpoint(category)
+                    client.save_image_from_url(
+                        url_of_image=url, path=folder, animal=category
+                    )
+                except (
+                    DataFetchFailed,
+                    InvalidImageURL,
+                    ImageDownloadFailed,
+                    httpx.HTTPError,
+                ) as e:
+                    logger.warning(
+                        f"Failed to add an image of {category.name} to the reservoir: {e}"
+                    )
+                    failures += 1
+                    if failures >= self.MAX_FAILURES:
+                        logger.error(
+                            f"Giving up on the reservoir of {category.name} after {failures} failures in a row."
+                        )
+                        break
+                    time.sleep(backoff.calculate())
+                    continue
+                failures = 0
+                backoff.reset()
+                added += 1
+        finally:
+            if self.__refresh(lock, owner):
+                lock.unlink(missing_ok=True)
+        return added
+
+    def top_up_in_background(self, category: CategoryEnum) -> None:
+        """
+        This method starts a detached `catto reservoir` process that tops the reservoir of the specified category
+        up, it keeps running after the current process exits.
+
+        Parameters:
+            category (CategoryEnum): This parameter takes the animal category.
+        """
+        if self.count(category) >= self.__target:
+            return
+        arguments = [
+            sys.executable,
+            "-m",
+            "catto",
+            "reservoir",
+            "--category",
+            category.name,
+            "--target",
+            str(self.__target),
+            "--directory",
+            str(self.__directory),
+        ]
+        options: dict[str, object] = {}
+        if sys.platform == "win32":
+            options["creationflags"] = subprocess.DETACHED_PROCESS
+        else:
+            options["start_new_session"] = True
+        subprocess.Popen(
+            arguments,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            **options,
+        )
+
+    @classmethod
+    def __acquire(cls, lock: Path) -> str | None:
+        """
+        This method creates the lock file of a fill, replacing it if it was abandoned.
+
+        Returns:
+            (str | None): The token written into the lock file, which tells the fill that holds it, or None if
+                          another fill holds the lock.
+        """
+        try:
+            if time.time() - lock.stat().st_mtime > cls.LOCK_TIMEOUT:
+                lock.unlink(missing_ok=True)
+        except FileNotFoundError:
+            pass
+        owner = f"{os.getpid()}-{secrets.token_hex(8)}"
+        try:
+            descriptor = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return None
+        with os.fdopen(descriptor, "w") as file:
+            file.write(owner)
+        return owner
+
+    @staticmethod
+    def __refresh(lock: Path, owner: str) -> bool:
+        """
+        This method marks the lock file of a fill as still in use, if the fill still holds it.
+
+        Returns:
+            (bool): Whether the fill still holds the lock.
+        """
+        try:
+            if lock.read_text() != owner:
+                return False
+            os.utime(lock)
+        except FileNotFoundError:
+            return False
+        return True
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, TypeVar
+
+import httpx
+
+from ..utils.enums import FailureEnum
+from ..utils.exceptions import DataFetchFailed, InvalidImageURL
+from ..utils.helpers import DecorrelatedJitterBackoff
+from ..utils.tracing import tracer
+
+__all__ = ("RetryRule", "RetryBudget", "RetryPolicy")
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class RetryRule:
+    """
+    This :func:`dataclass` stores how a kind of failure is retried.
+    """
+
+    attempts: int
+    """
+    The maximum amount of retries of a single call after this kind of failure.
+    """
+    base: float = 1.0
+    """
+    The shortest time in seconds to wait before a retry.
+    """
+    maximum_time: float = 30.0
+    """
+    The longest time in seconds to wait before a retry.
+    """
+
+
+class RetryBudget:
+    """
+    This class limits the retries of all calls together to a fraction of the calls, so retries can't multiply the
+    load on the API endpoints while they are failing. A few retries are always allowed, so a short run can still
+    recover from a blip.
+    """
+
+    def __init__(self, *, ratio: float = 0.2, minimum: int = 10):
+        """
+        Parameters:
+            ratio (float): This parameter takes the amount of retries allowed for each call. Default: 0.2.
+            minimum (int): This parameter takes the amount of retries that are always allowed. Default: 10.
+        """
+        self.__ratio = ratio
+        self.__minimum = minimum
+        self.__calls = 0
+        self.__retries = 0
+        self.__lock = threading.Lock()
+
+    @property
+    def retries(self) -> int:
+        """
+        This property returns the amount of retries that were made.
+        """
+        return self.__retries
+
+    def record_call(self) -> None:
+        """
+        This method counts a new call, which earns a fraction of a retry.
+        """
+        with self.__lock:
+            self.__calls += 1
+
+    def try_retry(self) -> bool:
+        """
+        This method takes a retry from the budget.
+
+        Returns:
+            (bool): Whether the retry is allowed.
+        """
+        with self.__lock:
+            if self.__retries >= self.__minimum + self.__ratio * self.__calls:
+                return False
+            self.__retries += 1
+            return True
+
+
+class RetryPolicy:
+    """
+    This class retries calls that fail with a temporary failure, such as a connection error, a timeout, a 5xx or a
+    429 response, or an invalid image. Each kind of failure has its own :class:`RetryRule`, and waits between the
+    retries with a :class:`DecorrelatedJitterBackoff`. Other failures are raised right away.
+    """
+
+    DEFAULT_RULES: dict[FailureEnum, RetryRule] = {
+        FailureEnum.connect: RetryRule(attempts=4, base=0.5),
+        FailureEnum.timeout: RetryRule(attempts=3, base=1.0),
+        FailureEnum.server_error: RetryRule(attempts=4, base=1.0),
+        FailureEnum.rate_limited: RetryRule(
+            attempts=6, base=2.0, maximum_time=60.0
+        ),
+        FailureEnum.invalid_image: RetryRule(
+            attempts=3, base=0.25, maximum_time=2.0
+        ),
+    }
+    """
+    The rules that are used for the kinds of failures that no rule is given for.
+    """
+
+    def __init__(
+        self,
+        rules: dict[FailureEnum, RetryRule] | None = None,
+        *,
+        budget: RetryBudget | None = None,
+    ):
+        """
+        Parameters:
+            rules (dict[FailureEnum, RetryRule] | None): This parameter takes the rules of the kinds of failures to
+                                                         change, a rule with 0 attempts disables retrying that kind.
+            budget (RetryBudget | None): This parameter takes the budget of the retries of all calls together.
+                                         Defaults to 20% of the calls.
+        """
+        self.__rules = {**self.DEFAULT_RULES, **(rules or {})}
+        self.__budget = budget or RetryBudget()
+
+    @classmethod
+    def parse(cls, specification: str) -> RetryPolicy:
+        """
+        This method creates a policy from a comma separated list of retry attempts for kinds of failures, for
+        example "connect=5,429=10,invalid_image=0".
+
+        Raises:
+            ValueError: If the specification is not valid.
+        """
+        rules: dict[FailureEnum, RetryRule] = {}
+        for item in filter(
+            None, (part.strip() for part in specification.split(","))
+        ):
+            name, _, attempts = item.partition("=")
+            try:
+                failure = FailureEnum(name.strip())
+            except ValueError:
+                try:
+                    failure = FailureEnum[name.strip()]
+                except KeyError:
+                    raise ValueError(
+                        f"'{name}' is not a kind of failure, choose from: "
+                        f"{', '.join(failure.value for failure in FailureEnum)}."
+                    )
+            if not attempts.strip().isdigit():
+                raise ValueError(
+                    f"'{item}' does not give a number of attempts."
+                )
+            rules[failure] = RetryRule(
+                attempts=int(attempts),
+                base=cls.DEFAULT_RULES[failure].base,
+                maximum_time=cls.DEFAULT_RULES[failure].maximum_time,
+            )
+        return cls(rules)
+
+    @property
+    def budget(self) -> RetryBudget:
+        """
+        This property returns the budget of the retries of all calls together.
+        """
+        return self.__budget
+
+    def rule_of(self, failure: FailureEnum) -> RetryRule:
+        """
+        This method returns the rule of the specified kind of failure.
+        """
+        return self.__rules[failure]
+
+    @staticmethod
+    def classify(error: BaseException) -> FailureEnum | None:
+        """
+        This method returns the kind of failure of an exception.
+
+        Returns:
+            (FailureEnum | None): The kind of failure, or None if the exception is not a temporary failure.
+        """
+        if isinstance(error, httpx.TimeoutException):
+            return FailureEnum.timeout
+        if isinstance(error, (httpx.NetworkError, httpx.RemoteProtocolError)):
+            return FailureEnum.connect
+        if isinstance(error, InvalidImageURL):
+            return FailureEnum.invalid_image
+        if isinstance(error, DataFetchFailed):
+            if error.status_code == 429:
+                return FailureEnum.rate_limited
+            if error.status_code >= 500:
+                return FailureEnum.server_error
+        return None
+
+    def call(
+        self,
+        function: Callable[..., T],
+        *args: object,
+        on_retry: Callable[[FailureEnum, int, float, BaseException], object]
+        | None = None,
+    ) -> T:
+        """
+        This method calls the function, and retries it according to the rules while it fails temporarily.
+
+        Parameters:
+            function (Callable[..., T]): This parameter takes the function to call.
+            args (object): This parameter takes the arguments of the function.
+            on_retry (Callable | None): This parameter takes a function that is called before each retry, with the
+                                        kind of failure, the number of the retry, the time to wait and the exception.
+
+        Returns:
+            (T): The result of the function.
+
+        Raises:
+            Exception: The exception of the last failure, when it can't be retried.
+        """
+        self.__budget.record_call()
+        retries: dict[FailureEnum, int] = {}
+        backoffs: dict[FailureEnum, DecorrelatedJitterBackoff] = {}
+        while True:
+            try:
+                return function(*args)
+            except Exception as e:
+                failure = self.classify(e)
+                if failure is None:
+                    raise
+                rule = self.__rules[failure]
+                retries[failure] = retries.get(failure, 0) + 1
+                if (
+                    retries[failure] > rule.attempts
+                    or not self.__budget.try_retry()
+                ):
+                    raise
+                if failure not in backoffs:
+                    backoffs[failure] = DecorrelatedJitterBackoff(
+                        base=rule.base, maximum_time=rule.maximum_time
+                    )
+                wait = backoffs[failure].calculate()
+                retry_after = getattr(e, "retry_after", None)
+                if retry_after is not None:
+                    wait = max(wait, min(retry_after, rule.maximum_time))
+                if on_retry is not None:
+                    on_retry(failure, retries[failure], wait, e)
+                with tracer.span(
+                    "retry.wait",
+                    failure=failure,
+                    attempt=retries[failure],
+                    wait=wait,
+                ):
+                    time.sleep(wait)
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import json
+import threading
+from collections import deque
+from dataclasses import dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+from loguru import logger
+
+from ..utils.enums import CategoryEnum
+from ..utils.helpers import ExponentialBackoff
+from .api import Client
+
+__all__ = ("PooledImage", "ImagePool", "create_server")
+
+
+@dataclass
+class PooledImage:
+    """
+    This :func:`dataclass` stores an image that was fetched ahead of time and is waiting in the :class:`ImagePool`.
+    """
+
+    category: CategoryEnum
+    data: bytes
+    format: str
+    url: str
+
+
+class ImagePool:
+    """
+    A class that keeps a pool of pre-fetched images in memory for each animal category. Each category has a
+    background thread that refills its pool whenever an image is taken out of it.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[CategoryEnum], PooledImage],
+        categories: list[CategoryEnum],
+        *,
+        size: int = 10,
+    ):
+        """
+        Parameters:
+            fetch (Callable[[CategoryEnum], PooledImage]): This parameter takes the function that fetches a new
+                                                          image of the given category, it is expected to respect
+                                                          the rate limits of the API endpoints.
+            categories (list[CategoryEnum]): This parameter takes the categories to keep a pool of.
+            size (int): This parameter takes the amount of images to keep in the pool of each category. Default: 10.
+        """
+        self.__fetch = fetch
+        self.__size = size
+        self.__images: dict[CategoryEnum, deque[PooledImage]] = {
+            category: deque() for category in categories
+        }
+        self.__condition = threading.Condition()
+        self.__stopped = threading.Event()
+        self.__threads: list[threading.Thread] = []
+
+    @classmethod
+    def from_client(
+        cls, client: Client, categories: list[CategoryEnum], *, size: int = 10
+    ) -> ImagePool:
+        """
+        This method creates a pool that fetches its images with the given :class:`Client`, using its rate limiter.
+
+        Parameters:
+            client (Client): This parameter takes the client to fetch the images with.
+            categories (list[CategoryEnum]): This parameter takes the categories to keep a pool of.
+            size (int): This parameter takes the amount of images to keep in the pool of each category. Default: 10.
+
+        Returns:
+            (ImagePool): The pool, which still needs to be started.
+        """
+
+        def fetch(category: CategoryEnum) -> PooledImage:
+            client.rate_limiter.acquire()
+            url = client.fetch_image_url_of_endpoint(category)
+            data, image_format = client.fetch_image_from_url(url)
+            return PooledImage(category, data, image_format, url)
+
+        return cls(fetch, categories, size=size)
+
+    @property
+    def categories(self) -> list[CategoryEnum]:
+        """
+        This property returns the categories that the pool keeps images of.
+        """
+        return list(self.__images)
+
+    def levels(self) -> dict[str, int]:
+        """
+        This method returns the amount of images that are currently waiting in the pool of each category.
+        """
+        with self.__condition:
+            return {
+                category.name: len(images)
+                for category, images in self.__images.items()
+            }
+
+    def start(self) -> None:
+        """
+        This method starts the background threads that fill the pools.
+        """
+        for category in self.__images:
+            thread = threading.Thread(
+                target=self.__refill,
+                args=(category,),
+                name=f"catto-pool-{category.name}",
+                daemon=True,
+            )
+            self.__threads.append(thread)
+            thread.start()
+
+    def stop(self) -> None:
+        """
+        This method stops the background threads that fill the pools.
+        """
+        self.__stopped.set()
+        with self.__condition:
+            self.__condition.notify_all()
+        for thread in self.__threads:
+            thread.join(timeout=30)
+
+    def take(
+        self, category: CategoryEnum, timeout: float = 30.0
+    ) -> PooledImage | None:
+        """
+        This method takes an image out of the pool of the specified category, waiting for one if the pool is empty.
+
+        Parameters:
+            category (CategoryEnum): This parameter takes the category of the image.
+            timeout (float): This parameter takes the maximum time in seconds to wait for an image. Default: 30.0.
+
+        Returns:
+            (PooledImage | None): The image, or None if the pool stayed empty until the timeout.
+        """
+        with self.__condition:
+            images = self.__images[category]
+            if not self.__condition.wait_for(lambda: len(images) > 0, timeout):
+                return None
+            image = images.popleft()
+            self.__condition.notify_all()
+            return image
+
+    def __refill(self, category: CategoryEnum) -> None:
+        """
+        This method keeps the pool of the specified category full until the pool is stopped.
+        """
+        backoff = ExponentialBackoff(base=0.5, maximum_tries=None)
+        images = self.__images[category]
+        while not self.__stopped.is_set():
+            with self.__condition:
+                self.__condition.wait_for(
+                    lambda: len(images) < self.__size or self.__stopped.is_set()
+                )
+            if self.__stopped.is_set():
+                return
+            try:
+                image = self.__fetch(category)
+            except Exception as e:
+                logger.warning(
+                    f"Failed to refill the pool of {category.name}: {e}"
+                )
+                self.__stopped.wait(backoff.calculate())
+                continue
+            with self.__condition:
+                images.append(image)
+                self.__condition.notify_all()
+
+
+class _PoolRequestHandler(BaseHTTPRequestHandler):
+    """
+    This class handles the requests made to the server created by :func:`create_server`.
+    """
+
+    server: _PoolServer
+    server_version = "catto"
+
+    def do_GET(self) -> None:
+        name = self.path.split("?", 1)[0].strip("/").lower()
+        if name in ("", "health"):
+            self.__send(
+                HTTPStatus.OK,
+                json.dumps({"pools": self.server.pool.levels()}).encode(),
+                "application/json",
+            )
+            return
+
+        try:
+            category = CategoryEnum[name]
+        except KeyError:
+            self.__send_error(
+                HTTPStatus.NOT_FOUND, f"Unknown category '{name}'."
+            )
+            return
+        if category not in self.server.pool.categories:
+            self.__send_error(
+                HTTPStatus.NOT_FOUND, f"Category '{name}' is not being served."
+            )
+            return
+
+        image = self.server.pool.take(
+            category, timeout=self.server.wait_timeout
+        )
+        if image is None:
+            self.__send_error(
+                HTTPStatus.SERVICE_UNAVAILABLE,
+                f"No image of {name} is available right now.",
+            )
+            return
+        self.__send(
+            HTTPStatus.OK,
+            image.data,
+            f"image/{image.format}",
+            {"X-Catto-Source-Url": image.url},
+        )
+
+    def __send(
+        self,
+        status: HTTPStatus,
+        body: bytes,
+        content_type: str,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def __send_error(self, status: HTTPStatus, message: str) -> None:
+        self.__send(
+            status, json.dumps({"error": message}).encode(), "application/json"
+        )
+
+    def log_message(self, format: str, *args: object) -> None:
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+
+class _PoolServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self, address: tuple[str, int], pool: ImagePool, timeout: float
+    ):
+        super().__init__(address, _PoolRequestHandler)
+        self.pool = pool
+        self.wait_timeout = timeout
+
+
+def create_server(
+    pool: ImagePool,
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    *,
+    timeout: float = 30.0,
+) -> ThreadingHTTPServer:
+    """
+    This function creates a local HTTP server that serves random images from the pool, for example `GET /cats`
+    answers with the body of a random cat image. `GET /health` answers with the amount of images in each pool.
+
+    Parameters:
+        pool (ImagePool): This parameter takes the pool to serve the images from.
+        host (str): This parameter takes the address to listen on. Default: "127.0.0.1".
+        port (int): This parameter takes the port to listen on, 0 picks a free port. Default: 8080.
+        timeout (float): This parameter takes the maximum time in seconds that a request waits for an image when the
+                         pool is empty. Default: 30.0.
+
+    Returns:
+        (http.server.ThreadingHTTPServer): The server, call its `serve_forever` method to start serving.
+    """
+    return _PoolServer((host, port), pool, timeout)
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import httpx
+
+from ..utils.helpers import Deadline
+
+__all__ = ("TimeoutPolicy",)
+
+KINDS = ("metadata", "image", "probe")
+"""
+The kinds of requests that have their own timeouts.
+"""
+
+PHASES = ("connect", "read", "write", "pool")
+"""
+The phases of a request that :class:`httpx.Timeout` limits separately.
+"""
+
+
+class TimeoutPolicy:
+    """
+    This class holds the connect, read, write and pool timeouts of each kind of request: the metadata requests to
+    the API endpoints, the transfers of the images, and the probes of the status of the endpoints. With a
+    :class:`Deadline`, no phase may take longer than the time the job has left.
+    """
+
+    DEFAULT_TIMEOUT: float = 30.0
+    """
+    The timeout in seconds of every phase that no timeout is given for.
+    """
+
+    def __init__(
+        self, timeouts: dict[str, dict[str, float | None]] | None = None
+    ):
+        """
+        Parameters:
+            timeouts (dict[str, dict[str, float | None]] | None): This parameter takes the timeouts in seconds of
+                                                                 the phases of the kinds of requests to change, for
+                                                                 example {"image": {"read": 60.0}}. None disables
+                                                                 the timeout of a phase.
+
+        Raises:
+            ValueError: If a kind of request or a phase does not exist.
+        """
+        self.__timeouts = {
+            kind: dict.fromkeys(PHASES, self.DEFAULT_TIMEOUT) for kind in KINDS
+        }
+        for kind, phases in (timeouts or {}).items():
+            if kind not in KINDS:
+                raise ValueError(
+                    f"'{kind}' is not a kind of request, choose from: {', '.join(KINDS)}."
+                )
+            for phase, seconds in phases.items():
+                if phase not in PHASES:
+                    raise ValueError(
+                        f"'{phase}' is not a phase of a request, choose from: {', '.join(PHASES)}."
+                    )
+                self.__timeouts[kind][phase] = seconds
+
+    @classmethod
+    def parse(cls, specification: str) -> TimeoutPolicy:
+        """
+        This method creates a policy from a comma separated list of timeouts in seconds, for example
+        "connect=5,image.read=60,probe=3". A phase alone sets it for all kinds of requests, a kind alone sets all
+        its phases, later timeouts override earlier ones.
+
+        Raises:
+            ValueError: If the specification is not valid.
+        """
+        timeouts: dict[str, dict[str, float | None]] = {}
+        for item in filter(
+            None, (part.strip() for part in specification.split(","))
+        ):
+            name, _, value = item.partition("=")
+            try:
+                seconds = float(value)
+            except ValueError:
+                raise ValueError(
+                    f"'{item}' does not give a timeout in seconds."
+                )
+            if seconds <= 0:
+                raise ValueError(f"'{item}' does not give a positive timeout.")
+            kind, _, phase = name.strip().rpartition(".")
+            if not kind and phase in KINDS:
+                kind, phase = phase, ""
+            kinds = [kind] if kind else list(KINDS)
+            phases = [phase] if phase else list(PHASES)
+            for kind in kinds:
+                for phase in phases:
+                    timeouts.setdefault(kind, {})[phase] = seconds
+        return cls(timeouts)
+
+    def timeout(
+        self, kind: str, deadline: Deadline | None = None
+    ) -> httpx.Timeout:
+        """
+        This method returns the timeouts of a kind of request.
+
+        Parameters:
+            kind (str): This parameter takes the kind of request, "metadata", "image" or "probe".
+            deadline (Deadline | None): This parameter takes the deadline of the job, the timeouts are cut to the
+                                        time it has left.
+
+        Returns:
+            (httpx.Timeout): The timeouts.
+
+        Raises:
+            DeadlineExceeded: If the deadline has passed.
+        """
+        phases = self.__timeouts[kind]
+        if deadline is None:
+            return httpx.Timeout(**phases)
+        deadline.check()
+        remaining = deadline.remaining
+        return httpx.Timeout(
+            **{
+                phase: remaining if seconds is None else min(seconds, remaining)
+                for phase, seconds in phases.items()
+            }
+        )
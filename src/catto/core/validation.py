@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import struct
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+
+from PIL import Image
+
+from ..utils.exceptions import InvalidImageURL
+
+__all__ = (
+    "ImageHeader",
+    "SNIFF_SIZE",
+    "sniff_image",
+    "check_structure",
+    "check_content_type",
+    "ImageVerifier",
+)
+
+SNIFF_SIZE: int = 4 * 1024
+"""
+The amount of bytes at the start of a body that :func:`sniff_image` needs to recognize the image.
+"""
+
+_TRAILERS: dict[str, tuple[bytes, ...]] = {
+    "png": (b"IEND\xaeB`\x82",),
+    "gif": (b";",),
+    "jpeg": (b"\xff\xd9",),
+}
+"""
+The bytes that a complete image of each format ends with, JPEG files sometimes have padding after the marker.
+"""
+
+_JPEG_FRAMES = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+@dataclass(frozen=True)
+class ImageHeader:
+    """
+    This :func:`dataclass` stores what :func:`sniff_image` read from the start of an image body.
+    """
+
+    format: str
+    """
+    The format of the image in lowercase, for example "png".
+    """
+    width: int | None = None
+    height: int | None = None
+    """
+    The dimensions of the image, None if they are not within the first bytes (for example after large JPEG metadata).
+    """
+    size: int | None = None
+    """
+    The size of the whole file as declared by its header, only WEBP and BMP images declare it.
+    """
+
+
+def _invalid(reason: str) -> InvalidImageURL:
+    return InvalidImageURL(f"The body is not a valid image: {reason}")
+
+
+def sniff_image(head: bytes) -> ImageHeader:
+    """
+    This function recognizes an image from the first bytes of its body, by its magic bytes, and reads its dimensions
+    without decoding it. PNG, JPEG, GIF, WEBP and BMP images are recognized.
+
+    Parameters:
+        head (bytes): This parameter takes the first bytes of the body, :data:`SNIFF_SIZE` bytes are enough.
+
+    Returns:
+        (ImageHeader): The format and the dimensions of the image.
+
+    Raises:
+        InvalidImageURL: If the body is not an image, for example an HTML error page, or its header is broken.
+    """
+    try:
+        header = _read_header(head)
+    except struct.error:
+        raise _invalid("the header is truncated")
+    if header is None:
+        if head.lstrip()[:1] in (b"<", b"{"):
+            raise _invalid("it is an HTML, XML or JSON document")
+        raise _invalid("unknown format")
+    if header.width == 0 or header.height == 0:
+        raise _invalid("it has no pixels")
+    return header
+
+
+def _read_header(head: bytes) -> ImageHeader | None:
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        if head[12:16] != b"IHDR":
+            raise _invalid("the PNG header chunk is missing")
+        width, height = struct.unpack(">II", head[16:24])
+        return ImageHeader("png", width, height)
+
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        width, height = struct.unpack("<HH", head[6:10])
+        return ImageHeader("gif", width, height)
+
+    if head.startswith(b"\xff\xd8\xff"):
+        position = 2
+        while position + 9 <= len(head):
+            if head[position] != 0xFF:
+                raise _invalid("the JPEG segments are broken")
+            marker = head[position + 1]
+            if marker in _JPEG_FRAMES:
+                height, width = struct.unpack(
+                    ">HH", head[position + 5 : position + 9]
+                )
+                return ImageHeader("jpeg", width, height)
+            (length,) = struct.unpack(">H", head[position + 2 : position + 4])
+            position += 2 + length
+        return ImageHeader("jpeg")
+
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        (size,) = struct.unpack("<I", head[4:8])
+        chunk = head[12:16]
+        if chunk == b"VP8 ":
+            width, height = struct.unpack("<HH", head[26:30])
+            return ImageHeader(
+                "webp", width & 0x3FFF, height & 0x3FFF, size + 8
+            )
+        if chunk == b"VP8L":
+            (bits,) = struct.unpack("<I", head[21:25])
+            return ImageHeader(
+                "webp",
+                (bits & 0x3FFF) + 1,
+                ((bits >> 14) & 0x3FFF) + 1,
+                size + 8,
+            )
+        if chunk == b"VP8X":
+            width = int.from_bytes(head[24:27], "little") + 1
+            height = int.from_bytes(head[27:30], "little") + 1
+            return ImageHeader("webp", width, height, size + 8)
+        raise _invalid("unknown WEBP chunk")
+
+    if head[:2] == b"BM":
+        (size,) = struct.unpack("<I", head[2:6])
+        width, height = struct.unpack("<ii", head[18:26])
+        return ImageHeader("bmp", abs(width), abs(height), size)
+    return None
+
+
+def check_structure(header: ImageHeader, data: bytes) -> None:
+    """
+    This function checks that a complete body looks complete, it must be as long as its header declares, and the
+    formats that have an end marker must end with it.
+
+    Parameters:
+        header (ImageHeader): This parameter takes the header that was read from the start of the body.
+        data (bytes): This parameter takes the complete body.
+
+    Raises:
+        InvalidImageURL: If the body is truncated.
+    """
+    if header.size is not None and len(data) < header.size:
+        raise _invalid(f"the {header.format} body is truncated")
+    trailers = _TRAILERS.get(header.format)
+    if trailers is None:
+        return
+    tail = data[-64:].rstrip(b"\x00") if header.format == "jpeg" else data
+    if not tail.endswith(trailers):
+        raise _invalid(f"the {header.format} body is truncated")
+
+
+class ImageVerifier:
+    """
+    A class that fully checks the integrity of downloaded images with :meth:`PIL.Image.Image.verify` on background
+    threads, which is much slower than the header checks that every image goes through.
+    """
+
+    def __init__(self, *, workers: int = 2):
+        """
+        Parameters:
+            workers (int): This parameter takes the amount of threads that verify images. Default: 2.
+        """
+        self.__executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="catto-verify"
+        )
+        self.__pending: list[tuple[str, Future[None]]] = []
+        self.__lock = threading.Lock()
+
+    def submit(self, url_of_image: str, data: bytes) -> None:
+        """
+        This method queues an image to be verified.
+
+        Parameters:
+            url_of_image (str): This parameter takes the url of the image, which the failures are reported with.
+            data (bytes): This parameter takes the body of the image.
+        """
+        future = self.__executor.submit(self.verify, data)
+        with self.__lock:
+            self.__pending.append((url_of_image, future))
+
+    def failures(self) -> list[tuple[str, str]]:
+        """
+        This method waits for the queued images to be verified.
+
+        Returns:
+            (list[tuple[str, str]]): The url and the reason of every image that failed since the last call.
+        """
+        with self.__lock:
+            pending, self.__pending = self.__pending, []
+        failures: list[tuple[str, str]] = []
+        for url_of_image, future in pending:
+            try:
+                future.result()
+            except InvalidImageURL as e:
+                failures.append((url_of_image, str(e)))
+        return failures
+
+    @staticmethod
+    def verify(data: bytes) -> None:
+        """
+        This method fully checks the integrity of an image.
+
+        Raises:
+            InvalidImageURL: If the image is broken.
+        """
+        try:
+            with Image.open(BytesIO(data)) as image:
+                image.verify()
+        except Exception as e:
+            raise InvalidImageURL(f"The image is broken: {e}")
+
+    def close(self) -> None:
+        """
+        This method stops the verifying threads once the queued images are verified.
+        """
+        self.__executor.shutdown(wait=True)
+
+
+def check_content_type(content_type: str | None) -> None:
+    """
+    This function rejects a response by its Content-Type header before its body is read, error pages are usually
+    served as text. A missing or generic content type is accepted, the body is sniffed anyway.
+
+    Raises:
+        InvalidImageURL: If the response is a text or JSON document.
+    """
+    if content_type is None:
+        return
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type.startswith("text/") or media_type == "application/json":
+        raise _invalid(f"it is served as {media_type}")
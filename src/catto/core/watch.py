@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import itertools
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from ..utils.enums import CategoryEnum, EvictionEnum
+from ..utils.helpers import RateLimiter
+from .api import Client
+from .catalogue import Catalogue, CatalogueEntry
+from .output import DirectorySink
+
+__all__ = ("Watcher", "WatchRound")
+
+
+@dataclass
+class WatchRound:
+    """
+    This :func:`dataclass` stores the outcome of a round of a :class:`Watcher`.
+    """
+
+    category: CategoryEnum
+    names: list[str]
+    """
+    The names of the images that were downloaded.
+    """
+    evicted: list[CatalogueEntry]
+    """
+    The images that were removed to stay within the quotas.
+    """
+    files: int
+    """
+    The amount of images in the directory after the round.
+    """
+    size: int
+    """
+    The total size in bytes of the images in the directory after the round.
+    """
+
+
+class Watcher:
+    """
+    A class that keeps downloading images into a directory, one category after the other, paced by a rate limiter of
+    its own, so the rate limiter of the client only paces the requests to the API. After every image, the images
+    that are over the quotas of the directory are evicted. The images of the directory are tracked in the catalogue
+    of the client, so the directory is never listed, and files that are added to it by hand don't count towards the
+    quotas.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        directory: Path,
+        animals: list[CategoryEnum],
+        *,
+        max_files: int | None = None,
+        max_bytes: int | None = None,
+        order: EvictionEnum = EvictionEnum.oldest,
+        pace: RateLimiter | None = None,
+    ):
+        """
+        Parameters:
+            client (Client): This parameter takes the client that downloads the images, it needs a catalogue.
+            directory (pathlib.Path): This parameter takes the directory to download the images into.
+            animals (list[CategoryEnum]): This parameter takes the animal categories to download, in turns.
+            max_files (int | None): This parameter takes the maximum amount of images the directory may hold.
+            max_bytes (int | None): This parameter takes the maximum total size in bytes of the images.
+            order (EvictionEnum): This parameter takes the order the images are evicted in. Default: oldest first.
+            pace (RateLimiter | None): This parameter takes the rate limiter that every image waits for. Defaults
+                                       to downloading as fast as the client allows.
+
+        Raises:
+            ValueError: If the client has no catalogue, or no categories are given.
+            PathNotFound: If the directory does not exist.
+        """
+        if client.catalogue is None:
+            raise ValueError(
+                "Watching a directory needs a client with a catalogue."
+            )
+        if not animals:
+            raise ValueError("Watching a directory needs a category.")
+        self.__client = client
+        self.__sink = DirectorySink(directory)
+        self.__animals = itertools.cycle(animals)
+        self.__max_files = max_files
+        self.__max_bytes = max_bytes
+        self.__order = order
+        self.__pace = pace
+        self.__stopped = threading.Event()
+
+    @property
+    def directory(self) -> Path:
+        """
+        This property returns the directory that the images are downloaded into.
+        """
+        return self.__sink.directory
+
+    @property
+    def catalogue(self) -> Catalogue:
+        """
+        This property returns the catalogue that tracks the images of the directory.
+        """
+        return self.__client.catalogue
+
+    def enforce(self) -> list[CatalogueEntry]:
+        """
+        This method evicts the images that are over the quotas of the directory.
+
+        Returns:
+            (list[CatalogueEntry]): The images that were removed.
+        """
+        evicted = self.catalogue.evict(
+            self.directory,
+            max_files=self.__max_files,
+            max_bytes=self.__max_bytes,
+            order=self.__order,
+        )
+        for entry in evicted:
+            self.__client.reporter.emit(
+                "image_evicted",
+                category=entry.category,
+                name=entry.name,
+                size=entry.size,
+                location=entry.location,
+                order=self.__order,
+            )
+        return evicted
+
+    def step(self) -> WatchRound:
+        """
+        This method downloads an image of the next category, and evicts the images that are over the quotas.
+
+        Returns:
+            (WatchRound): The outcome of the round.
+        """
+        animal = next(self.__animals)
+        data = self.__client.download(
+            animal, 1, self.directory, self.__sink, workers=1
+        )
+        evicted = self.enforce()
+        files, size = self.catalogue.usage(self.__sink.location)
+        return WatchRound(animal, data["names"], evicted, files, size)
+
+    def run(
+        self,
+        rounds: int | None = None,
+        on_round: Callable[[WatchRound], object] | None = None,
+    ) -> None:
+        """
+        This method downloads images until :meth:`stop` is called, or the amount of rounds is reached. The images
+        whose files were removed are forgotten first, and the directory is brought within its quotas, also when the
+        run is interrupted.
+
+        Parameters:
+            rounds (int | None): This parameter takes the amount of images to download. Defaults to no limit.
+            on_round (Callable[[WatchRound], object] | None): This parameter takes a function that is called with
+                                                              the outcome of every round.
+        """
+        self.catalogue.prune(self.directory)
+        self.enforce()
+        try:
+            for _ in range(rounds) if rounds is not None else itertools.count():
+                if self.__stopped.is_set():
+                    return
+                if self.__pace is not None and self.__stopped.wait(
+                    self.__pace.reserve()
+                ):
+                    return
+                outcome = self.step()
+                if on_round is not None:
+                    on_round(outcome)
+        finally:
+            # An image saved by an interrupted round is evicted too, if it is over the quotas.
+            self.enforce()
+
+    def stop(self) -> None:
+        """
+        This method stops :meth:`run` once the image being downloaded is saved, or right away if it is waiting for
+        the next image.
+        """
+        self.__stopped.set()
@@ -1,3 +1,5 @@
 from .enums import *
+from .events import *
 from .exceptions import *
 from .helpers import *
+from .tracing import *
@@ -5,7 +5,13 @@ from dataclasses import dataclass
 from enum import Enum
 
 
-__all__ = ("CategoryEnum", "ResponseEnum", "ColorEnum")
+__all__ = (
+    "CategoryEnum",
+    "ResponseEnum",
+    "ColorEnum",
+    "FailureEnum",
+    "EvictionEnum",
+)
 
 
 class CategoryEnum(Enum):
@@ -117,3 +123,44 @@ class ColorEnum(Enum):
 
     def __repr__(self):
         return f"{self.__class__.__name__}.{self.name}"
+
+
+class FailureEnum(Enum):
+    """
+    This :class:`Enum` stores the kinds of failures that fetching an image can run into, each kind has its own
+    retry rule in the :class:`RetryPolicy`.
+    """
+
+    connect = "connect"
+    timeout = "timeout"
+    server_error = "5xx"
+    rate_limited = "429"
+    invalid_image = "invalid_image"
+
+    def __str__(self):
+        return self.value
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}.{self.name}"
+
+
+class EvictionEnum(Enum):
+    """
+    This :class:`Enum` stores the orders in which the images of a directory are evicted once it is over its quota.
+    """
+
+    oldest = "oldest"
+    """
+    The images that were saved first are evicted first.
+    """
+    lru = "lru"
+    """
+    The images that were used least recently are evicted first, images that were never marked as used count as
+    used when they were saved.
+    """
+
+    def __str__(self):
+        return self.value
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}.{self.name}"
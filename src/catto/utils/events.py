@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from typing import TextIO
+
+from rich.console import Console, Group
+from rich.filesize import decimal
+from rich.live import Live
+from rich.progress import (
+    BarColumn,
+    DownloadColumn,
+    MofNCompleteColumn,
+    Progress,
+    ProgressColumn,
+    Task,
+    TaskID,
+    TextColumn,
+    TimeRemainingColumn,
+    TransferSpeedColumn,
+)
+from rich.text import Text
+
+__all__ = ("Reporter", "JsonLinesReporter", "DownloadProgress")
+
+_worker: ContextVar[int | None] = ContextVar("catto_worker", default=None)
+"""
+The thread that started the image being transferred, transfers made on helper threads that run in a copy of its
+context, such as hedged requests, are shown in the row of that thread.
+"""
+
+
+class Reporter:
+    """
+    This class receives the events of catto's commands, such as an image being saved or an endpoint being probed.
+    The base reporter discards the events, as the commands already show their progress with rich.
+    """
+
+    renders_progress: bool = True
+    """
+    Whether the commands may render rich tables and progress bars next to the events.
+    """
+
+    def emit(self, event: str, **fields: object) -> None:
+        """
+        This method reports an event.
+
+        Parameters:
+            event (str): This parameter takes the name of the event, for example "image_saved".
+            fields (object): This parameter takes the data of the event.
+        """
+        return
+
+    def transfer_started(self, url: str, total: int | None) -> None:
+        """
+        This method reports that the current thread started transferring an image body.
+
+        Parameters:
+            url (str): This parameter takes the url of the image.
+            total (int | None): This parameter takes the size of the body in bytes, if it is known.
+        """
+        return
+
+    def transferred(self, size: int) -> None:
+        """
+        This method reports a chunk of an image body that the current thread received. It is called for every
+        chunk, so it must be cheap.
+
+        Parameters:
+            size (int): This parameter takes the size of the chunk in bytes.
+        """
+        return
+
+    def __enter__(self) -> Reporter:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        return
+
+
+class JsonLinesReporter(Reporter):
+    """
+    This class writes every event as one compact line of JSON (NDJSON), and flushes it right away, so scripts can
+    consume the events as they happen.
+    """
+
+    renders_progress = False
+
+    def __init__(self, stream: TextIO | None = None):
+        """
+        Parameters:
+            stream (TextIO | None): This parameter takes the stream to write the events to. Defaults to the
+                                    standard output.
+        """
+        self.__stream = stream
+        self.__lock = threading.Lock()
+
+    def emit(self, event: str, **fields: object) -> None:
+        line = json.dumps(
+            {"event": event, "time": round(time.time(), 3), **fields},
+            separators=(",", ":"),
+            default=str,
+        )
+        stream = self.__stream or sys.stdout
+        with self.__lock:
+            stream.write(line + "\n")
+            stream.flush()
+
+
+class _ByteRateColumn(ProgressColumn):
+    """
+    This column renders the average transfer speed of a task from its "bytes" field.
+    """
+
+    def render(self, task: Task) -> Text:
+        elapsed = task.elapsed or 0
+        rate = task.fields.get("bytes", 0) / elapsed if elapsed > 0 else 0
+        return Text(f"{decimal(int(rate))}/s", style="progress.data.speed")
+
+
+class DownloadProgress(Reporter):
+    """
+    This class shows the events of downloads in a single live view, with a bar for each category (images, average
+    speed, time remaining and failures) and a bar for each worker thread (the image body it is transferring). The
+    view is redrawn at a fixed rate, so the cost of rendering doesn't grow with the amount of images.
+    """
+
+    def __init__(
+        self, console: Console | None = None, *, refresh_per_second: float = 4
+    ):
+        """
+        Parameters:
+            console (rich.console.Console | None): This parameter takes the console to draw the view on. Defaults to
+                                                   a new console on the standard output.
+            refresh_per_second (float): This parameter takes the maximum amount of times per second that the view is
+                                        redrawn. Default: 4.
+        """
+        self.__categories = Progress(
+            TextColumn("[bold][magenta]{task.description}"),
+            BarColumn(),
+            MofNCompleteColumn(),
+            _ByteRateColumn(),
+            TimeRemainingColumn(),
+            TextColumn("[bold][red]{task.fields[errors]} failed"),
+            auto_refresh=False,
+        )
+        self.__workers = Progress(
+            TextColumn("  [green]{task.description}"),
+            BarColumn(),
+            DownloadColumn(),
+            TransferSpeedColumn(),
+            auto_refresh=False,
+        )
+        self.__live = Live(
+            Group(self.__categories, self.__workers),
+            console=console,
+            refresh_per_second=refresh_per_second,
+            transient=False,
+        )
+        self.__category_tasks: dict[str, TaskID] = {}
+        self.__worker_tasks: dict[int, TaskID] = {}
+        self.__current: dict[int, str] = {}
+        self.__labels: dict[int, str] = {}
+        self.__errors: dict[str, int] = {}
+        self.__bytes: dict[str, int] = {}
+        self.__lock = threading.Lock()
+        self.__depth = 0
+
+    def emit(self, event: str, **fields: object) -> None:
+        category = str(fields.get("category", ""))
+        with self.__lock:
+            if event == "download_started":
+                self.__category_tasks[category] = self.__categories.add_task(
+                    category, total=int(fields["amount"]), errors=0, bytes=0
+                )
+                self.__errors[category] = 0
+                self.__bytes[category] = 0
+            elif event == "image_started":
+                worker = threading.get_ident()
+                _worker.set(worker)
+                self.__current[worker] = category
+                number = fields.get("worker") or len(self.__worker_tasks) + 1
+                self.__labels[worker] = f"{number}.) {category}"
+                description = self.__labels[worker]
+                if worker not in self.__worker_tasks:
+                    self.__worker_tasks[worker] = self.__workers.add_task(
+                        description, total=None
+                    )
+                else:
+                    self.__workers.reset(
+                        self.__worker_tasks[worker],
+                        total=None,
+                        description=description,
+                    )
+            elif event == "image_saved" and category in self.__category_tasks:
+                self.__categories.advance(self.__category_tasks[category])
+            elif event == "image_failed":
+                task = self.__category_tasks.get(category)
+                if task is not None:
+                    self.__errors[category] += 1
+                    self.__categories.update(
+                        task, errors=self.__errors[category]
+                    )
+
+    def transfer_started(self, url: str, total: int | None) -> None:
+        worker = _worker.get() or threading.get_ident()
+        with self.__lock:
+            task = self.__worker_tasks.get(worker)
+            if task is not None:
+                self.__workers.update(
+                    task,
+                    total=total,
+                    completed=0,
+                    description=f"{self.__labels[worker]}: {url.rsplit('/', 1)[-1]}",
+                )
+
+    def transferred(self, size: int) -> None:
+        worker = _worker.get() or threading.get_ident()
+        with self.__lock:
+            task = self.__worker_tasks.get(worker)
+            if task is not None:
+                self.__workers.advance(task, size)
+            category = self.__current.get(worker, "")
+            if category in self.__category_tasks:
+                self.__bytes[category] += size
+                self.__categories.update(
+                    self.__category_tasks[category],
+                    bytes=self.__bytes[category],
+                )
+
+    def __enter__(self) -> DownloadProgress:
+        with self.__lock:
+            self.__depth += 1
+            if self.__depth == 1:
+                self.__live.start()
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        with self.__lock:
+            self.__depth -= 1
+            if self.__depth == 0:
+                self.__live.stop()
+                for task in self.__workers.task_ids:
+                    self.__workers.remove_task(task)
+                self.__worker_tasks.clear()
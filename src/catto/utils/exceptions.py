@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-z
+from __future__ import annotations
 
 __all__ = (
     "PathNotFound",
@@ -6,6 +7,9 @@ __all__ = (
     "CategoryFactNotFound",
     "DataFetchFailed",
     "ImageDownloadFailed",
+    "ByteBudgetExceeded",
+    "RequestCancelled",
+    "DeadlineExceeded",
 )
 
 
@@ -48,7 +52,44 @@ class DataFetchFailed(Exception):
     This exception is raised when the API request fails return the expected data.
     """
 
-    def __init__(self, error: str, /, status_code: int, reason: str, url: str):
+    def __init__(
+        self,
+        error: str,
+        /,
+        status_code: int,
+        reason: str,
+        url: str,
+        retry_after: float | None = None,
+    ):
         self.status_code = status_code
         self.reason = reason
         self.url = url
+        self.retry_after = retry_after
+
+
+class ByteBudgetExceeded(Exception):
+    """
+    This exception is raised when a transfer would go over the total amount of bytes a job may use.
+    """
+
+    def __init__(self, error: str, /, budget: int, spent: int):
+        self.budget = budget
+        self.spent = spent
+
+
+class RequestCancelled(Exception):
+    """
+    This exception is raised when a request is abandoned halfway, for example the slower copy of a hedged request.
+    """
+
+    pass
+
+
+class DeadlineExceeded(Exception):
+    """
+    This exception is raised when a job has run out of the time it may take.
+    """
+
+    def __init__(self, error: str, /, deadline: float, elapsed: float):
+        self.deadline = deadline
+        self.elapsed = elapsed
@@ -1,17 +1,58 @@
 # -*- coding: utf-8 -*-
+import os
 import random
+import re
+import shutil
 import socket
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable
 
 from rich.console import Console
 
 from .enums import ColorEnum
+from .exceptions import ByteBudgetExceeded, DeadlineExceeded
 
 __all__ = (
     "interactive_print",
     "ExponentialBackoff",
+    "DecorrelatedJitterBackoff",
+    "RateLimiter",
+    "SharedRateLimiter",
+    "ByteBudget",
+    "Deadline",
+    "DnsCache",
     "check_internet_connection",
+    "parse_size",
+    "parse_rate",
+    "parse_time",
+    "parse_duration",
+    "parse_frequency",
+    "default_cache_directory",
+    "link_or_copy",
 )
 
+_SIZE_UNITS: dict[str, int] = {
+    "": 1,
+    "b": 1,
+    "k": 1000,
+    "kb": 1000,
+    "kib": 1024,
+    "m": 1000**2,
+    "mb": 1000**2,
+    "mib": 1024**2,
+    "g": 1000**3,
+    "gb": 1000**3,
+    "gib": 1024**3,
+    "t": 1000**4,
+    "tb": 1000**4,
+    "tib": 1024**4,
+}
+
 
 class ExponentialBackoff:
     """
@@ -85,6 +126,389 @@ class ExponentialBackoff:
         return
 
 
+class DecorrelatedJitterBackoff:
+    """
+    This class implements an exponential backoff with decorrelated jitter, each wait is picked at random between the
+    base time and three times the previous wait, and capped at the maximum time. Compared to the
+    :class:`ExponentialBackoff`, clients that failed at the same moment quickly spread out, instead of retrying in
+    lockstep.
+    """
+
+    def __init__(
+        self, *, base: float | int = 1, maximum_time: float | int = 30.0
+    ):
+        """
+        Parameters:
+            base (int | float): This parameter takes the shortest time to wait in seconds. Default: 1.
+            maximum_time (int | float): This parameter takes the maximum time in seconds to wait. Default: 30.0.
+        """
+        self.__base = base
+        self.__maximum_time = maximum_time
+        self.__inner_random = random.Random()
+        self.__last_wait: float = base
+
+    def calculate(self) -> float:
+        """
+        This method calculates the time to wait. It returns the time to wait in seconds.
+
+        Returns:
+            (float): The next wait time.
+        """
+        wait = min(
+            self.__maximum_time,
+            self.__inner_random.uniform(self.__base, self.__last_wait * 3),
+        )
+        self.__last_wait = wait
+        return wait
+
+    def reset(self) -> None:
+        """
+        This method starts the backoff over from the base time, for example after a success.
+        """
+        self.__last_wait = self.__base
+
+
+class RateLimiter:
+    """
+    This class implements a thread-safe token bucket rate limiter. The bucket holds up to `burst` tokens and is
+    refilled at `rate` tokens per second, each request takes a token and waits for one if the bucket is empty.
+    """
+
+    def __init__(
+        self,
+        *,
+        rate: float = 5.0,
+        burst: int = 5,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], object] = time.sleep,
+    ):
+        """
+        Parameters:
+            rate (float): This parameter takes the amount of tokens added to the bucket every second. Default: 5.0.
+            burst (int): This parameter takes the maximum amount of tokens the bucket can hold. Default: 5.
+            clock (Callable[[], float]): This parameter takes the clock the bucket is refilled by, in seconds.
+                                         Default: time.monotonic.
+            sleep (Callable[[float], object]): This parameter takes the function that waits for tokens. Default:
+                                               time.sleep.
+        """
+        self.__rate = rate
+        self.__burst = burst
+        self.__clock = clock
+        self.__sleep = sleep
+        self.__tokens: float = burst
+        self.__updated = clock()
+        self.__lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        """
+        This property returns the amount of tokens added to the bucket every second.
+        """
+        return self.__rate
+
+    def reserve(self, tokens: float = 1) -> float:
+        """
+        This method takes tokens from the bucket and returns how long the caller has to wait before the tokens are
+        actually available. The tokens are reserved right away, so concurrent callers queue up behind each other.
+
+        Parameters:
+            tokens (float): This parameter takes the amount of tokens to take. Default: 1.
+
+        Returns:
+            (float): The time to wait in seconds.
+        """
+        with self.__lock:
+            now = self.__clock()
+            self.__tokens = min(
+                self.__burst,
+                self.__tokens + (now - self.__updated) * self.__rate,
+            )
+            self.__updated = now
+            self.__tokens -= tokens
+            if self.__tokens >= 0:
+                return 0.0
+            return -self.__tokens / self.__rate
+
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        This method takes tokens from the bucket, and blocks until they are available.
+
+        Parameters:
+            tokens (float): This parameter takes the amount of tokens to take. Default: 1.
+
+        Returns:
+            (float): The time that was spent waiting in seconds.
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            self.__sleep(wait)
+        return wait
+
+
+class SharedRateLimiter(RateLimiter):
+    """
+    This class implements a token bucket rate limiter whose bucket is shared by every catto process on the machine,
+    the buckets are kept in an SQLite database, one for each key, so parallel invocations stay under the rate
+    together. If the database can't be used, the bucket of this process is used instead.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        *,
+        rate: float = 5.0,
+        burst: int = 5,
+        path: Path | None = None,
+    ):
+        """
+        Parameters:
+            key (str): This parameter takes the name of the bucket, for example the host of an API endpoint.
+            rate (float): This parameter takes the amount of tokens added to the bucket every second. Default: 5.0.
+            burst (int): This parameter takes the maximum amount of tokens the bucket can hold. Default: 5.
+            path (pathlib.Path | None): This parameter takes the database file. Defaults to "limits.db" in catto's
+                                        cache directory.
+        """
+        super().__init__(rate=rate, burst=burst)
+        self.__key = key
+        self.__rate = rate
+        self.__burst = burst
+        self.__path = path or default_cache_directory() / "limits.db"
+        self.__connection: sqlite3.Connection | None = None
+        self.__shared = True
+        self.__lock = threading.Lock()
+
+    @property
+    def key(self) -> str:
+        """
+        This property returns the name of the bucket.
+        """
+        return self.__key
+
+    def reserve(self, tokens: float = 1) -> float:
+        with self.__lock:
+            if self.__shared:
+                try:
+                    return self.__reserve(tokens)
+                except sqlite3.Error:
+                    self.__shared = False
+        return super().reserve(tokens)
+
+    def __reserve(self, tokens: float) -> float:
+        """
+        This method takes tokens from the shared bucket, the database is locked for writing while the bucket is
+        updated, so concurrent processes queue up behind each other.
+        """
+        if self.__connection is None:
+            self.__path.parent.mkdir(parents=True, exist_ok=True)
+            self.__connection = sqlite3.connect(
+                self.__path,
+                timeout=10.0,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, "
+                "updated REAL NOT NULL)"
+            )
+        connection = self.__connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT tokens, updated FROM buckets WHERE key = ?",
+                (self.__key,),
+            ).fetchone()
+            # The wall clock is the only clock that processes share.
+            now = time.time()
+            available: float = self.__burst
+            if row is not None:
+                available = min(
+                    self.__burst, row[0] + max(0.0, now - row[1]) * self.__rate
+                )
+            available -= tokens
+            connection.execute(
+                "INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                (self.__key, available, now),
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        if available >= 0:
+            return 0.0
+        return -available / self.__rate
+
+
+class ByteBudget:
+    """
+    This class keeps track of the total amount of bytes a job may transfer, it is shared by all concurrent transfers.
+    """
+
+    def __init__(self, budget: int):
+        """
+        Parameters:
+            budget (int): This parameter takes the total amount of bytes that may be transferred.
+        """
+        self.__budget = budget
+        self.__spent = 0
+        self.__lock = threading.Lock()
+
+    @property
+    def remaining(self) -> int:
+        """
+        This property returns the amount of bytes that may still be transferred.
+        """
+        return max(0, self.__budget - self.__spent)
+
+    @property
+    def spent(self) -> int:
+        """
+        This property returns the amount of bytes that were transferred.
+        """
+        return self.__spent
+
+    def check(self, size: int) -> None:
+        """
+        This method checks that a transfer of the specified size still fits in the budget, without taking anything.
+
+        Raises:
+            ByteBudgetExceeded: If the transfer does not fit.
+        """
+        with self.__lock:
+            remaining = self.__budget - self.__spent
+            if size > remaining:
+                raise ByteBudgetExceeded(
+                    f"A transfer of {size} bytes does not fit in the remaining {max(0, remaining)} bytes.",
+                    budget=self.__budget,
+                    spent=self.__spent,
+                )
+
+    def consume(self, size: int) -> None:
+        """
+        This method takes the specified amount of bytes from the budget.
+
+        Raises:
+            ByteBudgetExceeded: If the budget has been spent.
+        """
+        with self.__lock:
+            self.__spent += size
+            if self.__spent > self.__budget:
+                raise ByteBudgetExceeded(
+                    f"The byte budget of {self.__budget} bytes has been spent.",
+                    budget=self.__budget,
+                    spent=self.__spent,
+                )
+
+
+class Deadline:
+    """
+    This class keeps track of the time a job may take, it is shared by all concurrent requests. The time starts
+    when the deadline is created.
+    """
+
+    def __init__(self, seconds: float):
+        """
+        Parameters:
+            seconds (float): This parameter takes the time in seconds the job may take.
+        """
+        self.__seconds = seconds
+        self.__started = time.monotonic()
+
+    @property
+    def seconds(self) -> float:
+        """
+        This property returns the time in seconds the job may take.
+        """
+        return self.__seconds
+
+    @property
+    def elapsed(self) -> float:
+        """
+        This property returns the time in seconds since the job started.
+        """
+        return time.monotonic() - self.__started
+
+    @property
+    def remaining(self) -> float:
+        """
+        This property returns the time in seconds the job may still take.
+        """
+        return max(0.0, self.__seconds - self.elapsed)
+
+    def check(self) -> None:
+        """
+        This method checks that the job still has time left.
+
+        Raises:
+            DeadlineExceeded: If the deadline has passed.
+        """
+        if self.remaining <= 0.0:
+            raise DeadlineExceeded(
+                f"The deadline of {self.__seconds:g}s has passed.",
+                deadline=self.__seconds,
+                elapsed=self.elapsed,
+            )
+
+
+class DnsCache:
+    """
+    This class keeps the answers of host name lookups in memory for a while, so the hosts that catto talks to are
+    resolved once per run instead of once per connection. The standard library doesn't expose the time to live of
+    the DNS records, so every answer is kept for the same amount of time.
+    """
+
+    def __init__(self, *, ttl: float = 300.0):
+        """
+        Parameters:
+            ttl (float): This parameter takes the time in seconds that an answer is kept for. Default: 300.0.
+        """
+        self.__ttl = ttl
+        self.__answers: dict[tuple, tuple[float, list]] = {}
+        self.__lock = threading.Lock()
+        self.__original: Callable[..., list] | None = None
+
+    def resolve(
+        self,
+        host: str | bytes | None,
+        port: str | int | None,
+        family: int = 0,
+        type: int = 0,
+        proto: int = 0,
+        flags: int = 0,
+    ) -> list:
+        """
+        This method resolves a host like :func:`socket.getaddrinfo`, answering from the cache when possible. Failed
+        lookups are not cached.
+        """
+        key = (host, port, family, type, proto, flags)
+        now = time.monotonic()
+        with self.__lock:
+            answer = self.__answers.get(key)
+        if answer is not None and answer[0] > now:
+            return answer[1]
+        lookup = self.__original or socket.getaddrinfo
+        addresses = lookup(host, port, family, type, proto, flags)
+        with self.__lock:
+            self.__answers[key] = (now + self.__ttl, addresses)
+        return addresses
+
+    def install(self) -> None:
+        """
+        This method makes every host name lookup of the process go through the cache.
+        """
+        if self.__original is None:
+            self.__original = socket.getaddrinfo
+            socket.getaddrinfo = self.resolve
+
+    def uninstall(self) -> None:
+        """
+        This method restores the host name lookups of the process.
+        """
+        if self.__original is not None:
+            socket.getaddrinfo = self.__original
+            self.__original = None
+
+
 def interactive_print(
     text: str,
     color: ColorEnum = ColorEnum.white,
@@ -161,3 +585,207 @@ def check_internet_connection() -> bool:
         return True
     except socket.gaierror:
         return False
+
+
+def parse_size(size: str | int) -> int:
+    """
+    This function parses a human-readable size such as "512MB", "1.5GiB" or "2048" into bytes.
+
+    Parameters:
+        size (str | int): This parameter takes the size to parse, integers are returned as they are.
+
+    Returns:
+        (int): The size in bytes.
+
+    Raises:
+        ValueError: If the size could not be parsed.
+    """
+    if isinstance(size, int):
+        return size
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([a-zA-Z]*)\s*", size)
+    if match is None or match.group(2).lower() not in _SIZE_UNITS:
+        raise ValueError(
+            f"'{size}' is not a valid size, try something like '512MB' or '2GB'."
+        )
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).lower()])
+
+
+def parse_rate(rate: str) -> int:
+    """
+    This function parses a human-readable transfer rate such as "5MB/s" or "512KiB" into bytes per second.
+
+    Parameters:
+        rate (str): This parameter takes the rate to parse, the "/s" suffix is optional.
+
+    Returns:
+        (int): The rate in bytes per second.
+
+    Raises:
+        ValueError: If the rate could not be parsed, or is less than a byte per second.
+    """
+    parsed = parse_size(re.sub(r"/\s*s(ec)?\s*$", "", rate.strip(), flags=re.I))
+    if parsed < 1:
+        raise ValueError(
+            f"The rate '{rate}' has to be at least 1 byte per second."
+        )
+    return parsed
+
+
+_DURATION_UNITS: dict[str, int] = {
+    "s": 1,
+    "m": 60,
+    "h": 3600,
+    "d": 86400,
+    "w": 604800,
+}
+
+
+def parse_time(moment: str) -> float:
+    """
+    This function parses a point in time such as "today", "yesterday", "2022-10-01", "2022-10-01T12:30" or a
+    duration ago such as "3h" or "7d" into a timestamp. Dates without a timezone are in local time.
+
+    Parameters:
+        moment (str): This parameter takes the point in time to parse.
+
+    Returns:
+        (float): The timestamp in seconds.
+
+    Raises:
+        ValueError: If the point in time could not be parsed.
+    """
+    value = moment.strip().lower()
+    midnight = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    if value == "today":
+        return midnight.timestamp()
+    if value == "yesterday":
+        return (midnight - timedelta(days=1)).timestamp()
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)\s*([smhdw])", value)
+    if match is not None:
+        return (
+            time.time()
+            - float(match.group(1)) * _DURATION_UNITS[match.group(2)]
+        )
+    try:
+        return datetime.fromisoformat(moment.strip()).timestamp()
+    except ValueError:
+        raise ValueError(
+            f"'{moment}' is not a valid time, try something like 'today', '2022-10-01' or '7d'."
+        )
+
+
+def parse_duration(duration: str) -> float:
+    """
+    This function parses a duration such as "90", "30s", "5m" or "1h30m" into seconds, a number without a unit is
+    in seconds.
+
+    Parameters:
+        duration (str): This parameter takes the duration to parse.
+
+    Returns:
+        (float): The duration in seconds.
+
+    Raises:
+        ValueError: If the duration could not be parsed, or is not positive.
+    """
+    value = duration.strip().lower()
+    parts = re.findall(r"(\d+(?:\.\d+)?)\s*([smhdw]?)", value)
+    if (
+        not parts
+        or re.fullmatch(r"(?:\d+(?:\.\d+)?\s*[smhdw]?\s*)+", value) is None
+    ):
+        raise ValueError(
+            f"'{duration}' is not a valid duration, try something like '30s', '5m' or '1h30m'."
+        )
+    seconds = sum(
+        float(number) * _DURATION_UNITS[unit or "s"] for number, unit in parts
+    )
+    if seconds <= 0:
+        raise ValueError(f"'{duration}' is not a positive duration.")
+    return seconds
+
+
+_PERIOD_NAMES: dict[str, str] = {
+    "sec": "s",
+    "second": "s",
+    "min": "m",
+    "minute": "m",
+    "hr": "h",
+    "hour": "h",
+    "day": "d",
+    "week": "w",
+}
+
+
+def parse_frequency(frequency: str) -> float:
+    """
+    This function parses a frequency such as "10/min", "2/s", "100/hour" or "5/10m" into the amount of times per
+    second, a number without a period is per second.
+
+    Parameters:
+        frequency (str): This parameter takes the frequency to parse.
+
+    Returns:
+        (float): The amount of times per second.
+
+    Raises:
+        ValueError: If the frequency could not be parsed, or is not positive.
+    """
+    count, _, period = frequency.partition("/")
+    try:
+        amount = float(count)
+    except ValueError:
+        raise ValueError(
+            f"'{frequency}' is not a valid frequency, try something like '10/min' or '2/s'."
+        )
+    if amount <= 0:
+        raise ValueError(f"'{frequency}' is not a positive frequency.")
+    period = period.strip().lower() or "s"
+    if len(period) > 1:
+        period = period.removesuffix("s")
+    period = _PERIOD_NAMES.get(period, period)
+    try:
+        seconds = parse_duration(
+            period if period[0].isdigit() else f"1{period}"
+        )
+    except ValueError:
+        raise ValueError(
+            f"'{frequency}' is not a valid frequency, try something like '10/min' or '2/s'."
+        )
+    return amount / seconds
+
+
+def default_cache_directory() -> Path:
+    """
+    This function returns the directory where catto keeps its caches, following the conventions of the
+    operating system.
+
+    Returns:
+        (pathlib.Path): The path to catto's cache directory, it may not exist yet.
+    """
+    if sys.platform == "win32":
+        base = (
+            os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+        )
+        return Path(base) / "catto" / "cache"
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "catto"
+
+
+def link_or_copy(source: Path, destination: Path) -> Path:
+    """
+    This function hard-links the source file to the destination, and copies it when they are on different
+    filesystems or hard links are not supported.
+
+    Parameters:
+        source (pathlib.Path): This parameter takes the path of the file to link.
+        destination (pathlib.Path): This parameter takes the path of the file to create.
+
+    Returns:
+        (pathlib.Path): The destination path.
+    """
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+    return destination
@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import functools
+import json
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator, ParamSpec, TypeVar
+
+import httpx
+from loguru import logger
+
+__all__ = ("Span", "Tracer", "OtlpJsonExporter", "tracer")
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+_current_span: ContextVar[Span | None] = ContextVar("catto_span", default=None)
+"""
+The span that new spans are started in. Threads that run in a copy of the context of a span, such as the download
+workers and the writer threads, start their spans in it.
+"""
+
+
+@dataclass
+class Span:
+    """
+    This :func:`dataclass` stores a timed step of a command, such as the request of an image url or the write of an
+    image, with the span that it is part of.
+    """
+
+    name: str
+    trace_id: str
+    """
+    The id of the trace in hex, the spans of one command share it.
+    """
+    span_id: str
+    parent_id: str | None = None
+    start: int = field(default_factory=time.time_ns)
+    """
+    The time the span started in nanoseconds since the epoch.
+    """
+    end: int | None = None
+    attributes: dict[str, object] = field(default_factory=dict)
+    events: list[tuple[str, int, dict[str, object]]] = field(
+        default_factory=list
+    )
+    """
+    The events that happened during the span, each with its name, its time and its attributes.
+    """
+    error: str | None = None
+    """
+    The exception that ended the span, if any.
+    """
+    recording: bool = True
+    """
+    Whether the span is exported, spans started while tracing is disabled are not.
+    """
+
+    def set(self, **attributes: object) -> None:
+        """
+        This method sets attributes of the span, attributes that are None are left out.
+        """
+        if self.recording:
+            self.attributes.update(
+                (key, value)
+                for key, value in attributes.items()
+                if value is not None
+            )
+
+    def add_event(self, name: str, **attributes: object) -> None:
+        """
+        This method records an event that happened during the span, for example a retry.
+        """
+        if self.recording:
+            self.events.append(
+                (
+                    name,
+                    time.time_ns(),
+                    {
+                        key: value
+                        for key, value in attributes.items()
+                        if value is not None
+                    },
+                )
+            )
+
+
+_NOT_RECORDING = Span("", trace_id="", span_id="", recording=False)
+
+
+class Tracer:
+    """
+    This class starts the spans of catto's commands and hands the finished spans to an exporter. Without an
+    exporter, tracing is disabled and starting a span costs next to nothing.
+    """
+
+    def __init__(self, exporter: OtlpJsonExporter | None = None):
+        """
+        Parameters:
+            exporter (OtlpJsonExporter | None): This parameter takes the exporter of the finished spans. Defaults to
+                                                disabled tracing.
+        """
+        self.__exporter = exporter
+
+    @property
+    def exporter(self) -> OtlpJsonExporter | None:
+        """
+        This property returns the exporter of the finished spans, if tracing is enabled.
+        """
+        return self.__exporter
+
+    @exporter.setter
+    def exporter(self, exporter: OtlpJsonExporter | None) -> None:
+        self.__exporter = exporter
+
+    @contextmanager
+    def span(self, name: str, /, **attributes: object) -> Iterator[Span]:
+        """
+        This method times the block it wraps as a span, which is part of the span the block runs in. An exception
+        that leaves the block marks the span as failed.
+
+        Parameters:
+            name (str): This parameter takes the name of the span, for example "fetch_image".
+            attributes (object): This parameter takes the attributes of the span, attributes that are None are
+                                 left out.
+
+        Returns:
+            (Iterator[Span]): The span, for setting attributes that are only known at the end of the block.
+        """
+        exporter = self.__exporter
+        if exporter is None:
+            yield _NOT_RECORDING
+            return
+        parent = _current_span.get()
+        if parent is None:
+            span = Span(
+                name,
+                trace_id=secrets.token_hex(16),
+                span_id=secrets.token_hex(8),
+            )
+        else:
+            span = Span(
+                name,
+                trace_id=parent.trace_id,
+                span_id=secrets.token_hex(8),
+                parent_id=parent.span_id,
+            )
+        span.set(**attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            span.add_event(
+                "exception",
+                **{
+                    "exception.type": type(e).__name__,
+                    "exception.message": str(e),
+                },
+            )
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end = time.time_ns()
+            exporter.export(span)
+
+    def traced(self, function: Callable[P, T]) -> Callable[P, T]:
+        """
+        This method is a decorator that times every call of a function as a span named after the function. The
+        function can set the attributes of the span through :meth:`current`.
+        """
+
+        @functools.wraps(function)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+            if self.__exporter is None:
+                return function(*args, **kwargs)
+            with self.span(function.__name__.lstrip("_")):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    @staticmethod
+    def current() -> Span:
+        """
+        This method returns the span the caller runs in, a span that is not recorded if there is none.
+        """
+        return _current_span.get() or _NOT_RECORDING
+
+
+tracer = Tracer()
+"""
+The tracer of catto, the command line sets its exporter when it is run with `--trace`.
+"""
+
+
+def _attribute(key: str, value: object) -> dict[str, object]:
+    """
+    This function returns an attribute in the OTLP JSON encoding.
+    """
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+class OtlpJsonExporter:
+    """
+    A class that exports spans in the JSON encoding of the OpenTelemetry protocol (OTLP). The spans are written to a
+    file as JSON lines, each line an `ExportTraceServiceRequest`, which is the format of the file exporter of the
+    OpenTelemetry collector, or they are posted to the OTLP/HTTP endpoint of a collector, such as
+    `http://localhost:4318/v1/traces`. Trace viewers like Jaeger show the spans of a command as a timeline.
+    """
+
+    BATCH_SIZE: int = 512
+    """
+    The amount of finished spans that are kept before they are exported.
+    """
+
+    def __init__(
+        self, target: Path | str, *, resource: dict[str, object] | None = None
+    ):
+        """
+        Parameters:
+            target (pathlib.Path | str): This parameter takes the file to append the spans to, or the url of an
+                                         OTLP/HTTP collector.
+            resource (dict[str, object] | None): This parameter takes attributes describing the process, such as
+                                                 {"service.version": "1.0.5"}.
+        """
+        self.__target = str(target)
+        self.__resource = {"service.name": "catto", **(resource or {})}
+        self.__spans: list[Span] = []
+        self.__lock = threading.Lock()
+
+    @property
+    def target(self) -> str:
+        """
+        This property returns the file or the url the spans are exported to.
+        """
+        return self.__target
+
+    def export(self, span: Span) -> None:
+        """
+        This method receives a finished span, the spans are exported in batches.
+        """
+        with self.__lock:
+            self.__spans.append(span)
+            if len(self.__spans) < self.BATCH_SIZE:
+                return
+            spans, self.__spans = self.__spans, []
+        self.__send(spans)
+
+    def close(self) -> None:
+        """
+        This method exports the spans that are left.
+        """
+        with self.__lock:
+            spans, self.__spans = self.__spans, []
+        if spans:
+            self.__send(spans)
+
+    def encode(self, spans: list[Span]) -> dict[str, object]:
+        """
+        This method returns spans as an `ExportTraceServiceRequest` in the OTLP JSON encoding.
+        """
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            _attribute(key, value)
+                            for key, value in self.__resource.items()
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "catto"},
+                            "spans": [
+                                self.__encode_span(span) for span in spans
+                            ],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    @staticmethod
+    def __encode_span(span: Span) -> dict[str, object]:
+        encoded: dict[str, object] = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            # SPAN_KIND_INTERNAL
+            "kind": 1,
+            "startTimeUnixNano": str(span.start),
+            "endTimeUnixNano": str(span.end),
+            "attributes": [
+                _attribute(key, value) for key, value in span.attributes.items()
+            ],
+            "events": [
+                {
+                    "timeUnixNano": str(timestamp),
+                    "name": name,
+                    "attributes": [
+                        _attribute(key, value)
+                        for key, value in attributes.items()
+                    ],
+                }
+                for name, timestamp, attributes in span.events
+            ],
+        }
+        if span.parent_id is not None:
+            encoded["parentSpanId"] = span.parent_id
+        if span.error is not None:
+            # STATUS_CODE_ERROR
+            encoded["status"] = {"code": 2, "message": span.error}
+        return encoded
+
+    def __send(self, spans: list[Span]) -> None:
+        """
+        This method exports a batch of spans, a trace that can't be exported doesn't fail the command.
+        """
+        request = self.encode(spans)
+        try:
+            if self.__target.startswith(("http://", "https://")):
+                httpx.post(
+                    self.__target, json=request, timeout=10.0
+                ).raise_for_status()
+            else:
+                with open(self.__target, "a", encoding="utf-8") as file:
+                    file.write(json.dumps(request) + "\n")
+        except (OSError, httpx.HTTPError) as e:
+            logger.warning(
+                f"Failed to export {len(spans)} spans to {self.__target}: {e}"
+            )
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import itertools
+from io import BytesIO
+
+import httpx
+from PIL import Image
+
+from src.catto.core.api import AsyncClient
+from src.catto.utils.enums import CategoryEnum
+from src.catto.utils.helpers import RateLimiter
+
+
+def _transport() -> httpx.MockTransport:
+    body = BytesIO()
+    Image.new("RGB", (4, 4)).save(body, "PNG")
+    counter = itertools.count()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "images.example.com":
+            return httpx.Response(200, content=body.getvalue())
+        index = next(counter)
+        return httpx.Response(
+            200,
+            json={
+                "image": f"https://images.example.com/{index}.png",
+                "fact": f"fact {index}",
+            },
+        )
+
+    return httpx.MockTransport(handler)
+
+
+def test_iter_images_yields_records(tmp_path):
+    async def collect(path=None):
+        async with AsyncClient(
+            transport=_transport(), rate_limiter=RateLimiter(rate=1000)
+        ) as client:
+            return [
+                record
+                async for record in client.iter_images(
+                    CategoryEnum.cats, 5, path=path
+                )
+            ]
+
+    records = asyncio.run(collect())
+    assert len(records) == 5
+    assert all(record.format == "png" and record.data for record in records)
+    assert len({record.url for record in records}) == 5
+
+    saved = asyncio.run(collect(tmp_path))
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+        record.path.name for record in saved
+    )
+    assert all(record.data is None for record in saved)
+
+
+def test_iter_images_can_stop_early():
+    async def first():
+        async with AsyncClient(transport=_transport()) as client:
+            async for record in client.iter_images(CategoryEnum.dogs, 100):
+                return record
+
+    assert asyncio.run(first()).category is CategoryEnum.dogs
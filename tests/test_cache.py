@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+import os
+import shutil
+import time
+from io import BytesIO
+from pathlib import Path
+
+import httpx
+from PIL import Image
+
+from src.catto.core.api import Client
+from src.catto.core.cache import ImageCache, parse_cache_control
+from src.catto.core.catalogue import Catalogue
+from src.catto.core.hosts import KnownHosts
+from src.catto.core.output import DirectorySink, ThreadedSink
+from src.catto.core.partial import PartialStore
+from src.catto.utils.enums import CategoryEnum
+from src.catto.utils.events import Reporter
+from src.catto.utils.helpers import RateLimiter
+
+
+def test_cache_control_parsing():
+    directives = parse_cache_control(
+        'public, max-age=3600, no-cache="set-cookie"'
+    )
+    assert directives == {
+        "public": None,
+        "max-age": "3600",
+        "no-cache": "set-cookie",
+    }
+
+
+def test_image_cache_store_and_export(tmp_path):
+    cache = ImageCache(tmp_path / "cache", max_size=1000)
+    url = "https://example.com/cat.png"
+    entry = cache.store(
+        url, b"cat", "png", {"etag": '"abc"', "cache-control": "max-age=60"}
+    )
+    assert entry is not None and entry.is_fresh()
+    assert entry.validators() == {"If-None-Match": '"abc"'}
+
+    looked_up = cache.lookup(url)
+    assert looked_up is not None and looked_up.etag == '"abc"'
+
+    destination = cache.export(looked_up, tmp_path / "cats-image-1.png")
+    assert destination.read_bytes() == b"cat"
+
+    assert (
+        cache.store(url, b"cat", "png", {"cache-control": "no-store"}) is None
+    )
+
+
+def test_image_cache_evicts_least_recently_used(tmp_path):
+    cache = ImageCache(tmp_path / "cache", max_size=10)
+    cache.store("https://example.com/1.png", b"12345", "png", {})
+    time.sleep(0.01)
+    cache.store("https://example.com/2.png", b"12345", "png", {})
+    time.sleep(0.01)
+    assert cache.lookup("https://example.com/1.png") is not None
+    time.sleep(0.01)
+    cache.store("https://example.com/3.png", b"12345", "png", {})
+
+    assert cache.lookup("https://example.com/1.png") is not None
+    assert cache.lookup("https://example.com/2.png") is None
+    assert cache.lookup("https://example.com/3.png") is not None
+
+
+def test_image_cache_lookup_leaves_the_bodies_alone(tmp_path):
+    cache = ImageCache(tmp_path / "cache", max_size=1000)
+    url = "https://example.com/cat.png"
+    entry = cache.store(url, b"cat", "png", {})
+    body = cache.path_of(entry)
+    os.utime(body, (1.0, 1.0))
+
+    exported = cache.export(cache.lookup(url), tmp_path / "cats-image-1.png")
+    assert body.stat().st_mtime == 1.0
+    assert exported.stat().st_nlink == 1
+    assert not os.path.samefile(body, exported)
+
+
+def test_image_cache_lists_its_directory_only_when_over_its_size(
+    tmp_path, monkeypatch
+):
+    cache = ImageCache(tmp_path / "cache", max_size=20)
+    listings = []
+    glob = Path.glob
+
+    def counting_glob(self, pattern):
+        listings.append(pattern)
+        return glob(self, pattern)
+
+    monkeypatch.setattr(Path, "glob", counting_glob)
+    for index in range(5):
+        cache.store(f"https://example.com/{index}.png", b"12345", "png", {})
+
+    # The first store learns the size of the cache, the fifth one goes over it.
+    assert len(listings) == 2
+    assert cache.lookup("https://example.com/0.png") is None
+    assert cache.lookup("https://example.com/4.png") is not None
+
+
+class _EvictingSink(DirectorySink):
+    """
+    A sink whose writes find the image cache cleared, like a write that runs after another download evicted it.
+    """
+
+    def __init__(self, directory, cache_directory):
+        super().__init__(directory)
+        self.cache_directory = cache_directory
+
+    def write(self, name, data):
+        shutil.rmtree(self.cache_directory, ignore_errors=True)
+        return super().write(name, data)
+
+    def add_file(self, name, source):
+        shutil.rmtree(self.cache_directory, ignore_errors=True)
+        return super().add_file(name, source)
+
+
+def test_client_writes_cached_images_that_were_evicted_meanwhile(tmp_path):
+    body = BytesIO()
+    Image.new("RGB", (8, 8)).save(body, "PNG")
+    image = body.getvalue()
+    counter = itertools.count()
+    transfers = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "images.example.com":
+            transfers.append(request.url.path)
+            return httpx.Response(
+                200,
+                headers={
+                    "content-type": "image/png",
+                    "cache-control": "max-age=3600",
+                },
+                content=image,
+            )
+        return httpx.Response(
+            200,
+            json={
+                "image": f"https://images.example.com/{next(counter) % 2}.png"
+            },
+        )
+
+    catalogue = Catalogue(tmp_path / "catalogue.db")
+    client = Client(
+        rate_limiter=RateLimiter(rate=1000),
+        reporter=Reporter(),
+        known_hosts=KnownHosts(tmp_path / "hosts.json"),
+        partial_store=PartialStore(tmp_path / "partial"),
+        cache=ImageCache(tmp_path / "cache", max_size=10_000),
+        catalogue=catalogue,
+        transport=httpx.MockTransport(handler),
+    )
+    first, second = tmp_path / "first", tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+    try:
+        client.download(CategoryEnum.cats, 2, first, workers=1)
+        with ThreadedSink(_EvictingSink(second, tmp_path / "cache")) as sink:
+            data = client.download(
+                CategoryEnum.cats, 1, second, sink, workers=1
+            )
+    finally:
+        client.close()
+
+    assert sorted(transfers) == ["/0.png", "/1.png"]
+    (name,) = data["names"]
+    assert (second / name).read_bytes() == image
+    assert (second / name).stat().st_nlink == 1
+    assert catalogue.usage(str(second.absolute()))[0] == 1
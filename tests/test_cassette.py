@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+from io import BytesIO
+
+import httpx
+import pytest
+from PIL import Image
+from typer.testing import CliRunner
+
+import src.catto as catto
+from src.catto import app
+from src.catto.core.api import Client
+from src.catto.core.cassette import (
+    Cassette,
+    RecordingTransport,
+    ReplayTransport,
+)
+from src.catto.core.hosts import KnownHosts
+from src.catto.utils.enums import CategoryEnum
+from src.catto.utils.events import Reporter
+from src.catto.utils.helpers import RateLimiter
+
+
+def _transport() -> httpx.MockTransport:
+    body = BytesIO()
+    Image.new("RGB", (4, 4)).save(body, "PNG")
+    counter = itertools.count()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "images.example.com":
+            if request.url.path == "/down.png":
+                raise httpx.ConnectTimeout("timed out", request=request)
+            return httpx.Response(
+                200,
+                content=body.getvalue(),
+                headers={"content-type": "image/png"},
+            )
+        return httpx.Response(
+            200,
+            json={"image": f"https://images.example.com/{next(counter)}.png"},
+        )
+
+    return httpx.MockTransport(handler)
+
+
+def _client(transport: httpx.BaseTransport, tmp_path) -> Client:
+    return Client(
+        rate_limiter=RateLimiter(rate=1000),
+        reporter=Reporter(),
+        known_hosts=KnownHosts(tmp_path / "hosts.json"),
+        transport=transport,
+    )
+
+
+def test_replay_answers_like_the_recording(tmp_path):
+    with Cassette(tmp_path / "cassette.db") as cassette:
+        client = _client(RecordingTransport(cassette, _transport()), tmp_path)
+        recorded = [
+            client.fetch_image_url_of_endpoint(CategoryEnum.cats)
+            for _ in range(3)
+        ]
+        image = client.fetch_image_from_url(recorded[0])
+        with pytest.raises(httpx.ConnectTimeout):
+            client.session.get("https://images.example.com/down.png")
+        client.close()
+        assert len(cassette.interactions()) == 5
+
+    with Cassette(tmp_path / "cassette.db") as cassette:
+        client = _client(ReplayTransport(cassette), tmp_path)
+        replayed = [
+            client.fetch_image_url_of_endpoint(CategoryEnum.cats)
+            for _ in range(4)
+        ]
+        assert replayed == recorded + recorded[:1]
+        assert client.fetch_image_from_url(recorded[0]) == image
+        with pytest.raises(httpx.ConnectTimeout):
+            client.session.get("https://images.example.com/down.png")
+        with pytest.raises(httpx.ConnectError, match="not in the cassette"):
+            client.session.get("https://images.example.com/other.png")
+        client.close()
+
+
+def test_cassette_transport_is_restored_after_the_command(tmp_path):
+    path = tmp_path / "run.db"
+    Cassette(path).close()
+    transport = catto.client.transport
+
+    result = CliRunner().invoke(app, ["--replay", str(path), "version"])
+
+    assert result.exit_code == 0
+    assert catto.client.transport is transport
+
+
+def test_interactive_mode_is_replayed_with_its_timeouts(tmp_path, monkeypatch):
+    path = tmp_path / "run.db"
+    Cassette(path).close()
+    seen = []
+
+    def interface():
+        client = catto.controller.client
+        seen.append(
+            (
+                type(client.transport),
+                client.timeout_policy.timeout("metadata").connect,
+            )
+        )
+
+    monkeypatch.setattr(catto.controller, "interface", interface)
+    result = CliRunner().invoke(
+        app, ["--replay", str(path), "--timeout", "connect=7", "interactive"]
+    )
+
+    assert result.exit_code == 0, result.stdout
+    assert seen == [(ReplayTransport, 7.0)]
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+import json
+from io import BytesIO
+
+from PIL import Image
+from typer.testing import CliRunner
+
+import src.catto as catto
+from src.catto import app
+from src.catto.core.catalogue import Catalogue
+from src.catto.utils.enums import CategoryEnum
+
+runner = CliRunner()
+
+
+def encode(size: tuple[int, int], image_format: str) -> bytes:
+    body = BytesIO()
+    Image.new("RGB", size).save(body, image_format)
+    return body.getvalue()
+
+
+def fill(catalogue: Catalogue) -> None:
+    catalogue.add(
+        CategoryEnum.cats,
+        "cats-image-1.png",
+        "/gallery",
+        encode((10, 20), "PNG"),
+        "https://images.example.com/1.png",
+        saved_at=1000.0,
+    )
+    catalogue.add(
+        CategoryEnum.dogs,
+        "dogs-image-2.jpeg",
+        "/gallery",
+        encode((300, 200), "JPEG"),
+        saved_at=2000.0,
+    )
+    catalogue.add(
+        CategoryEnum.cats,
+        "cats-image-3.gif",
+        "/gallery.zip",
+        encode((5, 5), "GIF"),
+        saved_at=3000.0,
+    )
+
+
+def test_catalogue_queries(tmp_path):
+    catalogue = Catalogue(tmp_path / "catalogue.db")
+    fill(catalogue)
+
+    assert [image.name for image in catalogue.query()] == [
+        "cats-image-3.gif",
+        "dogs-image-2.jpeg",
+        "cats-image-1.png",
+    ]
+    cats = catalogue.query(categories=[CategoryEnum.cats], since=2000.0)
+    assert [image.name for image in cats] == ["cats-image-3.gif"]
+    first = catalogue.query(image_format="PNG")[0]
+    assert (first.width, first.height, first.url) == (
+        10,
+        20,
+        "https://images.example.com/1.png",
+    )
+    assert len(first.sha256) == 64
+    assert catalogue.query(minimum_size=first.size + 1, until=2500.0)[
+        0
+    ].name == ("dogs-image-2.jpeg")
+    assert len(catalogue.query(limit=2)) == 2
+
+
+def test_list_command_json(tmp_path, monkeypatch):
+    catalogue = Catalogue(tmp_path / "catalogue.db")
+    fill(catalogue)
+    monkeypatch.setattr(catto, "catalogue", catalogue)
+
+    result = runner.invoke(
+        app,
+        ["list", "--category", "cats", "--format", "png", "--json"],
+        standalone_mode=False,
+    )
+    lines = [json.loads(line) for line in result.stdout.splitlines()]
+
+    assert result.exit_code == 0
+    assert [line["name"] for line in lines] == ["cats-image-1.png"]
+    assert lines[0]["event"] == "image" and lines[0]["location"] == "/gallery"
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import typer.main
+
+from src.catto import app
+from src.catto.completion import CATEGORIES, COMMANDS, GLOBAL_OPTIONS, suggest
+from src.catto.utils.enums import CategoryEnum
+
+
+def _options(command) -> tuple[set[str], set[str]]:
+    with_value, flags = set(), set()
+    for param in command.params:
+        if param.param_type_name != "option":
+            continue
+        names = {*param.opts, *param.secondary_opts}
+        if param.is_flag or names & {
+            "--install-completion",
+            "--show-completion",
+        }:
+            flags |= names
+        else:
+            with_value |= names
+    return with_value, flags
+
+
+def test_static_table_matches_the_commands():
+    group = typer.main.get_command(app)
+
+    assert CATEGORIES == tuple(animal.name for animal in CategoryEnum)
+    assert _options(group) == tuple(map(set, GLOBAL_OPTIONS))
+    assert set(COMMANDS) == set(group.commands)
+    for name, command in group.commands.items():
+        help_text, with_value, flags = COMMANDS[name]
+        assert help_text == command.help
+        assert _options(command) == (set(with_value), set(flags))
+
+
+def test_suggestions():
+    assert [value for value, _ in suggest([], "dow")] == ["download"]
+    assert suggest(["--replay", "run.db", "fact", "--category"], "c") == [
+        ("cats", "")
+    ]
+    assert suggest(["list", "--category"], "cats,do") == [("cats,dogs", "")]
+    assert suggest(["logo"], "--type") == [("--typewriter", "")]
+    assert suggest(["download", "--path"], "") == []
+
+
+def test_completion_does_not_import_the_runtime():
+    root = Path(__file__).parents[1]
+    script = (
+        "import atexit, sys\n"
+        "atexit.register(lambda: print('httpx' in sys.modules))\n"
+        "import src.catto\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=root,
+        env={
+            **os.environ,
+            "_CATTO_COMPLETE": "complete_bash",
+            "COMP_WORDS": "catto download --cat",
+            "COMP_CWORD": "2",
+        },
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0
+    assert result.stdout.splitlines() == ["--category", "False"]
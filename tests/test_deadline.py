@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+import time
+from io import BytesIO
+
+import httpx
+import pytest
+from PIL import Image
+
+from src.catto.core.api import Client
+from src.catto.core.hosts import KnownHosts
+from src.catto.core.partial import PartialStore
+from src.catto.core.timeouts import TimeoutPolicy
+from src.catto.utils.enums import CategoryEnum
+from src.catto.utils.events import Reporter
+from src.catto.utils.exceptions import DeadlineExceeded
+from src.catto.utils.helpers import Deadline, RateLimiter
+
+
+class _Events(Reporter):
+    def __init__(self):
+        self.events: list[str] = []
+
+    def emit(self, event: str, **fields: object) -> None:
+        self.events.append(event)
+
+
+class _SlowStream(httpx.SyncByteStream):
+    def __init__(self, data: bytes):
+        self.__data = data
+
+    def __iter__(self):
+        for start in range(0, len(self.__data), Client.CHUNK_SIZE):
+            time.sleep(0.2)
+            yield self.__data[start : start + Client.CHUNK_SIZE]
+
+
+def test_timeout_policy_parse():
+    policy = TimeoutPolicy.parse("connect=5,image.read=60,probe=3")
+
+    assert policy.timeout("metadata") == httpx.Timeout(30.0, connect=5.0)
+    assert policy.timeout("image") == httpx.Timeout(
+        30.0, connect=5.0, read=60.0
+    )
+    assert policy.timeout("probe") == httpx.Timeout(3.0)
+    assert policy.timeout("image", Deadline(2.0)).read <= 2.0
+    with pytest.raises(DeadlineExceeded):
+        policy.timeout("image", Deadline(0.0))
+    with pytest.raises(ValueError, match="not a phase"):
+        TimeoutPolicy.parse("image.idle=5")
+
+
+def test_download_stops_at_the_deadline(tmp_path):
+    body = BytesIO()
+    Image.effect_noise((256, 256), 64).save(body, "PNG")
+    image = body.getvalue()
+    counter = itertools.count()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "images.example.com":
+            # The first image is fast, the others take seconds.
+            fast = request.url.path == "/0.png"
+            return httpx.Response(
+                200,
+                headers={"content-type": "image/png"},
+                **(
+                    {"content": image}
+                    if fast
+                    else {"stream": _SlowStream(image)}
+                ),
+            )
+        return httpx.Response(
+            200,
+            json={"image": f"https://images.example.com/{next(counter)}.png"},
+        )
+
+    reporter = _Events()
+    client = Client(
+        rate_limiter=RateLimiter(rate=1000),
+        reporter=reporter,
+        known_hosts=KnownHosts(tmp_path / "hosts.json"),
+        partial_store=PartialStore(tmp_path / "partial"),
+        transport=httpx.MockTransport(handler),
+        deadline=Deadline(0.5),
+    )
+    started = time.monotonic()
+    data = client.download(CategoryEnum.cats, 6, tmp_path, workers=1)
+    client.close()
+
+    assert time.monotonic() - started < 1.5
+    assert len(data["names"]) == 1
+    assert reporter.events.count("deadline_exceeded") == 1
+    assert reporter.events[-1] == "download_finished"
@@ -1,12 +1,23 @@
 # -*- coding: utf-8 -*-
 
+import itertools
 import re
+from io import BytesIO
 from pathlib import Path
 
+import httpx
+from PIL import Image
 from typer.testing import CliRunner
 
+import src.catto as catto
 from src.catto import app
+from src.catto.core.api import Client
+from src.catto.core.catalogue import Catalogue
+from src.catto.core.hosts import KnownHosts
+from src.catto.core.partial import PartialStore
 from src.catto.utils import check_internet_connection, ColorEnum
+from src.catto.utils.events import Reporter
+from src.catto.utils.helpers import RateLimiter
 
 runner = CliRunner()
 
@@ -55,3 +66,73 @@ def test_download_command():
         if file.is_file()
     ]
     created_path.rmdir()
+
+
+def _offline_client(tmp_path) -> Client:
+    body = BytesIO()
+    Image.new("RGB", (8, 8)).save(body, "PNG")
+    image = body.getvalue()
+    counter = itertools.count()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "images.example.com":
+            return httpx.Response(
+                200, headers={"content-type": "image/png"}, content=image
+            )
+        return httpx.Response(
+            200,
+            json={"image": f"https://images.example.com/{next(counter)}.png"},
+        )
+
+    return Client(
+        rate_limiter=RateLimiter(rate=1000),
+        reporter=Reporter(),
+        known_hosts=KnownHosts(tmp_path / "hosts.json"),
+        partial_store=PartialStore(tmp_path / "partial"),
+        catalogue=Catalogue(tmp_path / "catalogue.db"),
+        transport=httpx.MockTransport(handler),
+    )
+
+
+def test_download_options_only_apply_to_their_download(tmp_path, monkeypatch):
+    client = _offline_client(tmp_path)
+    monkeypatch.setattr(catto, "client", client)
+    monkeypatch.setattr(catto, "catalogue", client.catalogue)
+    monkeypatch.setattr(catto, "check_internet_connection", lambda: True)
+    retry_policy = client.retry_policy
+    gallery = tmp_path / "gallery"
+    gallery.mkdir()
+
+    result = runner.invoke(
+        app,
+        [
+            "download",
+            "--amount",
+            "2",
+            "--path",
+            str(gallery),
+            "--cache",
+            "--cache-dir",
+            str(tmp_path / "cache"),
+            "--max-rate",
+            "10MB/s",
+            "--max-bytes",
+            "1MB",
+            "--retry",
+            "connect=1",
+            "--hedge",
+            "--verify",
+            "--json",
+        ],
+        standalone_mode=False,
+    )
+    client.close()
+
+    assert result.exit_code == 0, result.stdout
+    assert len(result.return_value["names"]) == 2
+    assert client.cache is None
+    assert client.bandwidth_limiter is None
+    assert client.byte_budget is None
+    assert client.hedge_policy is None
+    assert client.verifier is None
+    assert client.retry_policy is retry_policy
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+
+import httpx
+
+from src.catto.core.api import Client
+from src.catto.core.facts import FactStore
+from src.catto.core.hosts import KnownHosts
+from src.catto.utils.enums import CategoryEnum
+from src.catto.utils.events import Reporter
+from src.catto.utils.helpers import RateLimiter
+
+
+def test_fact_store_keeps_unique_facts(tmp_path):
+    store = FactStore(tmp_path, ttl=60, capacity=3)
+    assert store.is_stale(CategoryEnum.cats)
+    assert store.sample(CategoryEnum.cats, 2) == []
+
+    assert store.add(CategoryEnum.cats, ["a", "b", "a"]) == 2
+    assert store.add(CategoryEnum.cats, ["b", "c", "d"]) == 2
+    assert store.facts(CategoryEnum.cats) == ["b", "c", "d"]
+    assert not store.is_stale(CategoryEnum.cats)
+
+    sample = store.sample(CategoryEnum.cats, 5)
+    assert sorted(sample) == ["b", "c", "d"]
+    assert store.facts(CategoryEnum.dogs) == []
+
+
+def test_fact_store_background_refresh(tmp_path):
+    store = FactStore(tmp_path, ttl=0)
+    store.refresh_in_background(CategoryEnum.dogs, lambda: ["dogs are good"])
+    store.wait(timeout=5)
+    assert store.facts(CategoryEnum.dogs) == ["dogs are good"]
+
+
+def test_fetch_facts_refreshes_the_store_only_with_a_batch(tmp_path):
+    counter = itertools.count()
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        number = next(counter)
+        return httpx.Response(
+            200,
+            json={
+                "image": f"https://images.example.com/{number}.png",
+                "fact": f"Fact number {number}.",
+            },
+        )
+
+    store = FactStore(tmp_path / "facts", ttl=60)
+    client = Client(
+        rate_limiter=RateLimiter(rate=1000),
+        reporter=Reporter(),
+        known_hosts=KnownHosts(tmp_path / "hosts.json"),
+        fact_store=store,
+        transport=httpx.MockTransport(handler),
+    )
+    try:
+        # The fact that comes along with an image is kept, but is no refresh.
+        client.fetch_image_url_of_endpoint(CategoryEnum.cats)
+        assert store.facts(CategoryEnum.cats) == ["Fact number 0."]
+        assert store.is_stale(CategoryEnum.cats)
+
+        # Stale facts are served right away and refreshed in the background.
+        assert client.fetch_facts_about_the_category(CategoryEnum.cats, 1) == [
+            "Fact number 0."
+        ]
+        store.wait(timeout=5)
+        assert not store.is_stale(CategoryEnum.cats)
+        assert len(requests) == 2
+
+        # Fresh facts are served without asking the API endpoint.
+        facts = client.fetch_facts_about_the_category(CategoryEnum.cats, 2)
+        assert sorted(facts) == ["Fact number 0.", "Fact number 1."]
+        assert len(requests) == 2
+    finally:
+        client.close()
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+
+import pytest
+
+from src.catto.core.hedging import HedgePolicy, LatencyTracker
+from src.catto.core.retry import RetryBudget
+
+
+def test_latency_tracker_quantile():
+    tracker = LatencyTracker(minimum_samples=10, initial=3.0, floor=0.0)
+    for seconds in range(9):
+        tracker.record(seconds / 100)
+    assert tracker.threshold() == 3.0
+    for seconds in range(9, 100):
+        tracker.record(seconds / 100)
+    assert tracker.threshold() == pytest.approx(0.94)
+
+
+def test_slow_request_is_hedged_and_cancelled():
+    calls = []
+    cancelled = threading.Event()
+
+    def request(event):
+        calls.append(event)
+        if len(calls) == 1:
+            event.wait(5)
+            cancelled.set()
+            return "slow"
+        return "fast"
+
+    policy = HedgePolicy(initial=0.05)
+    started = time.perf_counter()
+    assert policy.call("image", request) == "fast"
+    assert time.perf_counter() - started < 1
+    assert cancelled.wait(1)
+    assert policy.budget.retries == 1
+
+
+def test_hedges_are_capped_by_the_budget():
+    def request(event):
+        time.sleep(0.02)
+        return "done"
+
+    policy = HedgePolicy(initial=0.0, budget=RetryBudget(ratio=0.0, minimum=2))
+    for _ in range(5):
+        assert policy.call("metadata", request) == "done"
+    assert policy.budget.retries == 2
+
+
+def test_first_error_is_raised_when_every_copy_fails():
+    errors = iter([ValueError("first"), KeyError("second")])
+
+    def request(event):
+        error = next(errors)
+        # The first copy fails last.
+        time.sleep(0.05 if isinstance(error, ValueError) else 0.0)
+        raise error
+
+    with pytest.raises(ValueError, match="first"):
+        HedgePolicy(initial=0.01).call("image", request)
+
+
+def test_stuck_request_does_not_hold_the_caller():
+    calls = []
+
+    def request(event):
+        calls.append(event)
+        if len(calls) == 1:
+            # The copy's answer has to be used without waiting for this one.
+            time.sleep(3)
+            return "slow"
+        return "fast"
+
+    policy = HedgePolicy(initial=0.05)
+    started = time.perf_counter()
+    assert policy.call("metadata", request) == "fast"
+    assert time.perf_counter() - started < 1
+    assert calls[0].is_set()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+import socket
+
+from typer.testing import CliRunner
+
+import src.catto as catto
+from src.catto import app
+from src.catto.core.hosts import KnownHosts
+from src.catto.utils.enums import CategoryEnum
+from src.catto.utils.exceptions import PathNotFound
+from src.catto.utils.helpers import DnsCache
+
+
+def test_known_hosts_are_persisted(tmp_path):
+    path = tmp_path / "hosts.json"
+    hosts = KnownHosts(path, capacity=2)
+    for host in ("a.example", "b.example", "a.example", "c.example"):
+        hosts.add(CategoryEnum.cats, host)
+
+    assert KnownHosts(path).hosts(CategoryEnum.cats) == [
+        "b.example",
+        "c.example",
+    ]
+    assert KnownHosts(path).hosts(CategoryEnum.dogs) == []
+
+
+def test_dns_cache_answers_from_memory(monkeypatch):
+    lookups = []
+
+    def getaddrinfo(host, port, *args):
+        lookups.append(host)
+        return [
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", port))
+        ]
+
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+    cache = DnsCache(ttl=60)
+    cache.install()
+    try:
+        assert socket.getaddrinfo("example.com", 443) == getaddrinfo(
+            "example.com", 443
+        )
+        socket.getaddrinfo("example.com", 443)
+        socket.getaddrinfo("example.org", 443)
+    finally:
+        cache.uninstall()
+
+    assert socket.getaddrinfo is getaddrinfo
+    assert (
+        lookups.count("example.com") == 2
+    )  # one through the cache, one direct
+    assert lookups.count("example.org") == 1
+
+
+def test_dns_cache_is_only_installed_for_network_commands(monkeypatch):
+    getaddrinfo = socket.getaddrinfo
+    installed = []
+
+    def open_sink(*args, **kwargs):
+        installed.append(socket.getaddrinfo == catto.dns_cache.resolve)
+        raise PathNotFound("gone")
+
+    monkeypatch.setattr(catto, "check_internet_connection", lambda: True)
+    monkeypatch.setattr(catto, "open_sink", open_sink)
+    runner = CliRunner()
+    runner.invoke(app, ["version"])
+    assert socket.getaddrinfo is getaddrinfo
+    runner.invoke(app, ["download", "--json"])
+
+    assert installed == [True]
+    assert socket.getaddrinfo is getaddrinfo
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+import json
+from io import BytesIO
+
+import httpx
+import pytest
+from PIL import Image
+from typer.testing import CliRunner
+
+import src.catto as catto
+from src.catto import app
+from src.catto.core.api import Client
+from src.catto.core.catalogue import Catalogue
+from src.catto.core.facts import FactStore
+from src.catto.core.hosts import KnownHosts
+from src.catto.core.partial import PartialStore
+from src.catto.utils.enums import CategoryEnum
+from src.catto.utils.events import Reporter
+from src.catto.utils.helpers import RateLimiter
+
+runner = CliRunner()
+
+
+class _NoBackoff:
+    def __init__(self, **_):
+        pass
+
+    def calculate(self) -> float:
+        return 0.0
+
+
+@pytest.fixture
+def offline_client(tmp_path, monkeypatch):
+    body = BytesIO()
+    Image.new("RGB", (8, 8)).save(body, "PNG")
+    image = body.getvalue()
+    counter = itertools.count()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "images.example.com":
+            return httpx.Response(
+                200, headers={"content-type": "image/png"}, content=image
+            )
+        number = next(counter)
+        return httpx.Response(
+            200,
+            json={
+                "image": f"https://images.example.com/{number}.png",
+                "fact": f"Fact number {number}.",
+            },
+        )
+
+    client = Client(
+        rate_limiter=RateLimiter(rate=1000),
+        reporter=Reporter(),
+        known_hosts=KnownHosts(tmp_path / "hosts.json"),
+        partial_store=PartialStore(tmp_path / "partial"),
+        fact_store=FactStore(tmp_path / "facts"),
+        catalogue=Catalogue(tmp_path / "catalogue.db"),
+        transport=httpx.MockTransport(handler),
+    )
+    monkeypatch.setattr(catto, "client", client)
+    monkeypatch.setattr(catto, "catalogue", client.catalogue)
+    monkeypatch.setattr(catto, "check_internet_connection", lambda: True)
+    monkeypatch.setattr(catto, "ExponentialBackoff", _NoBackoff)
+    yield client
+    client.close()
+
+
+def _events(result) -> list[dict[str, object]]:
+    assert result.exit_code == 0, result.stdout
+    return [json.loads(line) for line in result.stdout.splitlines()]
+
+
+def test_download_prints_its_events_as_json_lines(offline_client, tmp_path):
+    result = runner.invoke(
+        app,
+        ["download", "--amount", "2", "--path", str(tmp_path), "--json"],
+        standalone_mode=False,
+    )
+
+    events = _events(result)
+    names = [event["event"] for event in events]
+    assert names[0] == "download_started"
+    assert names[-1] == "download_finished"
+    assert names.count("image_saved") == 2
+    assert events[-1]["downloaded"] == 2
+    assert {
+        event["name"] for event in events if event["event"] == "image_saved"
+    } == set(result.return_value["names"])
+
+
+def test_status_prints_a_json_line_for_each_endpoint(offline_client):
+    result = runner.invoke(app, ["status", "--ndjson"], standalone_mode=False)
+
+    events = _events(result)
+    assert [event["event"] for event in events] == ["endpoint_probed"] * len(
+        CategoryEnum
+    )
+    assert [event["category"] for event in events] == [
+        animal.name for animal in CategoryEnum
+    ]
+    assert {event["status_code"] for event in events} == {200}
+
+
+def test_fact_prints_a_json_line_for_each_fact(offline_client):
+    result = runner.invoke(
+        app,
+        ["fact", "--category", "cats,dogs", "--amount", "2", "--json"],
+        standalone_mode=False,
+    )
+
+    events = _events(result)
+    assert [(event["event"], event["category"]) for event in events] == [
+        ("fact", "cats"),
+        ("fact", "cats"),
+        ("fact", "dogs"),
+        ("fact", "dogs"),
+    ]
+    assert result.return_value == {
+        category: [
+            event["fact"] for event in events if event["category"] == category
+        ]
+        for category in ("cats", "dogs")
+    }
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+import os
+from io import BytesIO
+
+import httpx
+import pytest
+from PIL import Image
+
+from src.catto.core.api import Client
+from src.catto.core.hosts import KnownHosts
+from src.catto.core.partial import PartialStore
+from src.catto.utils.events import Reporter
+from src.catto.utils.exceptions import ByteBudgetExceeded
+from src.catto.utils.helpers import (
+    ByteBudget,
+    RateLimiter,
+    parse_rate,
+    parse_size,
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+        self.slept += seconds
+
+
+def _image(size: int) -> bytes:
+    # Noise doesn't compress, so the image is about `size` bytes.
+    side = int((size / 3) ** 0.5)
+    body = BytesIO()
+    Image.frombytes("RGB", (side, side), os.urandom(side * side * 3)).save(
+        body, "PNG"
+    )
+    return body.getvalue()
+
+
+def _client(tmp_path, image: bytes, **options) -> Client:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200, headers={"content-type": "image/png"}, content=image
+        )
+
+    return Client(
+        rate_limiter=RateLimiter(rate=1000),
+        reporter=Reporter(),
+        known_hosts=KnownHosts(tmp_path / "hosts.json"),
+        partial_store=PartialStore(tmp_path / "partial"),
+        transport=httpx.MockTransport(handler),
+        **options,
+    )
+
+
+def test_parse_size_and_rate():
+    assert parse_size("512MB") == 512_000_000
+    assert parse_size("1.5 KiB") == 1536
+    assert parse_size("2048") == 2048
+    assert parse_rate("5MB/s") == 5_000_000
+    assert parse_rate("512KiB") == 512 * 1024
+    for size in ("", "MB", "5 parsecs", "-1MB", "1,5GB"):
+        with pytest.raises(ValueError):
+            parse_size(size)
+    for rate in ("fast", "5MB/h", "5MB/s/s", "0", "0MB/s", "0.5/s"):
+        with pytest.raises(ValueError):
+            parse_rate(rate)
+
+
+def test_byte_budget_refuses_what_does_not_fit():
+    budget = ByteBudget(100)
+    budget.check(100)
+    budget.consume(60)
+    with pytest.raises(ByteBudgetExceeded):
+        budget.check(41)
+    budget.consume(40)
+    assert budget.remaining == 0
+    with pytest.raises(ByteBudgetExceeded):
+        budget.consume(1)
+
+
+def test_byte_budget_stops_an_image_over_the_cap(tmp_path):
+    image = _image(20_000)
+    budget = ByteBudget(len(image) - 1)
+    client = _client(tmp_path, image, byte_budget=budget)
+    try:
+        with pytest.raises(ByteBudgetExceeded):
+            client.fetch_image_from_url("https://images.example.com/0.png")
+    finally:
+        client.close()
+
+
+def test_bandwidth_limiter_throttles_the_transfers(tmp_path):
+    image = _image(20_000)
+    clock = _Clock()
+    limiter = RateLimiter(rate=5000, burst=5000, clock=clock, sleep=clock.sleep)
+    client = _client(tmp_path, image, bandwidth_limiter=limiter)
+    try:
+        for index in range(2):
+            data, _ = client.fetch_image_from_url(
+                f"https://images.example.com/{index}.png"
+            )
+            assert data == image
+    finally:
+        client.close()
+
+    # The burst covers the first 5000 bytes, the rest arrives at 5000 bytes a second.
+    assert clock.slept == pytest.approx((2 * len(image) - 5000) / 5000)
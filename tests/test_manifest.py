@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from typer.testing import CliRunner
+
+import src.catto as catto
+from src.catto import app
+from src.catto.core.catalogue import Catalogue, CatalogueEntry
+from src.catto.core.manifest import Manifest, ShardIndex, merge_shards
+from src.catto.core.output import DirectorySink
+from src.catto.utils.enums import CategoryEnum
+
+runner = CliRunner()
+
+
+def _fill_shard(directory, manifest, shard, bodies):
+    shard_directory = directory / manifest.shard_directory(shard)
+    shard_directory.mkdir()
+    entries = []
+    for index, body in enumerate(bodies):
+        name = f"cats-image-{shard}{index:07x}.png"
+        (shard_directory / name).write_bytes(body)
+        entries.append(
+            CatalogueEntry.describe(
+                CategoryEnum.cats, name, str(shard_directory), body
+            )
+        )
+    ShardIndex(shard_directory, manifest.namespace).append(entries)
+
+
+def test_shards_split_the_targets_evenly():
+    manifest = Manifest.plan(
+        {CategoryEnum.cats: 10, CategoryEnum.dogs: 2}, shards=3
+    )
+    shards = [manifest.shard_targets(shard) for shard in (1, 2, 3)]
+
+    assert [shard[CategoryEnum.cats] for shard in shards] == [4, 3, 3]
+    assert [shard[CategoryEnum.dogs] for shard in shards] == [1, 1, 0]
+    assert manifest.shard_directory(2).endswith("-shard-2-of-3")
+
+
+def test_merge_skips_duplicates_and_can_be_repeated(tmp_path):
+    manifest = Manifest.plan({CategoryEnum.cats: 6}, shards=3, namespace="job")
+    _fill_shard(tmp_path, manifest, 1, [b"a", b"b", b"c"])
+    _fill_shard(tmp_path, manifest, 2, [b"c", b"d"])
+    output = tmp_path / "merged"
+    output.mkdir()
+    catalogue = Catalogue(tmp_path / "catalogue.db")
+
+    result = merge_shards(manifest, tmp_path, DirectorySink(output), catalogue)
+    assert result.counts == {"cats": 4}
+    assert result.duplicates == 1
+    assert result.missing_shards == [3]
+    assert len(ShardIndex(output, "job").entries()) == 4
+    assert catalogue.count(str(output)) == {"cats": 4}
+
+    _fill_shard(tmp_path, manifest, 3, [b"a", b"e"])
+    result = merge_shards(manifest, tmp_path, DirectorySink(output))
+    assert result.counts == {"cats": 1}
+    assert result.duplicates == 6
+    assert len(list(output.glob("*.png"))) == 5
+
+
+def test_run_of_a_complete_shard_downloads_nothing(tmp_path, monkeypatch):
+    manifest_path = tmp_path / "job.json"
+    result = runner.invoke(
+        app,
+        [
+            "plan",
+            "--target",
+            "cats=4",
+            "--shards",
+            "2",
+            "--namespace",
+            "job",
+            "--output",
+            str(manifest_path),
+            "--json",
+        ],
+        standalone_mode=False,
+    )
+    assert result.exit_code == 0
+    assert json.loads(result.stdout)["shards"] == 2
+
+    _fill_shard(tmp_path, Manifest.load(manifest_path), 2, [b"a", b"b"])
+
+    def offline():
+        raise AssertionError("run should not need the network")
+
+    monkeypatch.setattr(catto, "check_internet_connection", offline)
+    result = runner.invoke(
+        app,
+        [
+            "run",
+            str(manifest_path),
+            "--shard",
+            "2/2",
+            "--path",
+            str(tmp_path),
+            "--json",
+        ],
+        standalone_mode=False,
+    )
+    assert result.exit_code == 0
+    assert result.return_value == {"cats": 2}
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+import tarfile
+import zipfile
+
+import pytest
+
+from src.catto.core.output import DirectorySink, image_name, open_sink
+from src.catto.utils.enums import CategoryEnum
+
+
+def test_directory_sink_never_overwrites(tmp_path):
+    sink = DirectorySink(tmp_path)
+    name = image_name(CategoryEnum.cats, "png")
+    assert sink.write(name, b"first") == name
+    second = sink.write(name, b"second")
+    assert second != name and second.startswith("cats-image-")
+    assert (tmp_path / name).read_bytes() == b"first"
+    assert (tmp_path / second).read_bytes() == b"second"
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+        [name, second]
+    )
+
+
+def test_archive_sinks(tmp_path):
+    for archive in ("images.tar", "images.tar.gz", "images.zip"):
+        with open_sink(tmp_path, str(tmp_path / archive)) as sink:
+            sink.write("cats-image-00000001.png", b"cat")
+            source = tmp_path / "dog.gif"
+            source.write_bytes(b"dog")
+            sink.move_file("dogs-image-00000002.gif", source)
+            assert not source.exists()
+
+        if archive.endswith(".zip"):
+            with zipfile.ZipFile(tmp_path / archive) as file:
+                assert file.read("cats-image-00000001.png") == b"cat"
+                assert file.read("dogs-image-00000002.gif") == b"dog"
+        else:
+            with tarfile.open(tmp_path / archive) as file:
+                assert file.getnames() == [
+                    "cats-image-00000001.png",
+                    "dogs-image-00000002.gif",
+                ]
+
+    with pytest.raises(ValueError, match="shard"):
+        open_sink(tmp_path, str(tmp_path / "sharded.tar"), shard_depth=2)
+    assert not (tmp_path / "sharded.tar").exists()
+
+
+def test_directory_sink_sharding(tmp_path):
+    sink = DirectorySink(tmp_path, shard_depth=2)
+    name = image_name(CategoryEnum.cats, "png")
+    written = sink.write(name, b"cat")
+    shard = sink.shard_of(name)
+    assert len(shard.parts) == 2 and all(len(part) == 2 for part in shard.parts)
+    assert written == f"{shard.as_posix()}/{name}"
+    assert (tmp_path / written).read_bytes() == b"cat"
+
+
+def test_threaded_sink_writes_everything(tmp_path):
+    names = [image_name(CategoryEnum.dogs, "gif") for _ in range(20)]
+    with open_sink(tmp_path, writers=3) as sink:
+        futures = [sink.submit(name, name.encode()) for name in names]
+    written = [future.result() for future in futures]
+    assert sorted(written) == sorted(path.name for path in tmp_path.iterdir())
+    for name in written:
+        assert (tmp_path / name).read_bytes().startswith(b"dogs-image-")
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+import threading
+
+import src.catto as catto
+from src.catto.core.catalogue import Catalogue
+from src.catto.core.output import DirectorySink, image_name
+from src.catto.core.prefetch import Prefetcher
+from src.catto.utils.enums import CategoryEnum
+from src.catto.utils.helpers import RateLimiter
+
+
+class FakeClient:
+    def __init__(self, catalogue=None):
+        self.rate_limiter = RateLimiter(rate=1000, burst=1000)
+        self.catalogue = catalogue
+        self.saved = threading.Semaphore(0)
+
+    def fetch_image_url_of_endpoint(self, animal):
+        return f"https://example.com/{animal.name}.png"
+
+    def save_image_from_url(self, url_of_image, path, animal, sink):
+        name = sink.write(image_name(animal, "png"), url_of_image.encode())
+        if self.catalogue is not None:
+            self.catalogue.add(
+                animal, name, sink.location, url_of_image.encode(), url_of_image
+            )
+        self.saved.release()
+        return {"path": path, "name": name, "location": sink.location}
+
+
+def test_prefetcher_commits_up_to_amount(tmp_path):
+    client = FakeClient()
+    prefetcher = Prefetcher(client, CategoryEnum.dogs, limit=3).start()
+    for _ in range(3):
+        assert client.saved.acquire(timeout=5)
+
+    assert prefetcher.ready == 3
+    names = prefetcher.commit(DirectorySink(tmp_path), 2)
+
+    assert not prefetcher.directory.exists()
+    assert sorted(names) == sorted(path.name for path in tmp_path.iterdir())
+    assert len(names) == 2
+
+
+def test_prefetcher_discard_removes_images():
+    client = FakeClient()
+    prefetcher = Prefetcher(client, CategoryEnum.cats).start()
+    assert client.saved.acquire(timeout=5)
+    assert prefetcher.directory.is_dir()
+    prefetcher.discard()
+    assert not client.saved.acquire(timeout=0.2)
+    assert not prefetcher.directory.exists()
+
+
+def test_prefetcher_moves_catalogue_entries_with_the_images(tmp_path):
+    catalogue = Catalogue(tmp_path / "catalogue.db")
+    client = FakeClient(catalogue)
+    prefetcher = Prefetcher(client, CategoryEnum.dogs, limit=2).start()
+    for _ in range(2):
+        assert client.saved.acquire(timeout=5)
+
+    images = tmp_path / "images"
+    images.mkdir()
+    (name,) = prefetcher.commit(DirectorySink(images), 1)
+
+    assert catalogue.usage(str(prefetcher.directory)) == (0, 0)
+    (entry,) = catalogue.query()
+    assert (entry.location, entry.name) == (str(images), name)
+    assert entry.url == "https://example.com/dogs.png"
+
+
+def test_interactive_mode_downloads_with_the_command_line_client():
+    assert catto.controller.client is catto.client
+    assert catto.controller.client.catalogue is catto.catalogue
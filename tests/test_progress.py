@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+import threading
+from io import BytesIO, StringIO
+
+import httpx
+from PIL import Image
+from rich.console import Console
+
+from src.catto.core.api import Client
+from src.catto.core.hosts import KnownHosts
+from src.catto.core.output import DirectorySink, ThreadedSink
+from src.catto.core.partial import PartialStore
+from src.catto.utils.enums import CategoryEnum
+from src.catto.utils.events import DownloadProgress, Reporter
+from src.catto.utils.helpers import RateLimiter
+
+
+def test_download_progress_counts_images_and_failures():
+    output = StringIO()
+    progress = DownloadProgress(
+        Console(file=output, force_terminal=False, width=120)
+    )
+    with progress:
+        progress.emit("download_started", category="cats", amount=3)
+        for _ in range(2):
+            progress.emit("image_started", category="cats", worker=1)
+            progress.transfer_started("https://example.com/cat.png", 10)
+            progress.transferred(10)
+            progress.emit("image_saved", category="cats", name="cat.png")
+        progress.emit("image_started", category="cats", worker=1)
+        progress.emit("image_failed", category="cats", stage="metadata")
+
+    rendered = output.getvalue()
+    assert "2/3" in rendered
+    assert "1 failed" in rendered
+    assert "1.) cats" in rendered
+
+
+class _Recorder(Reporter):
+    def __init__(self):
+        self.events: list[str] = []
+
+    def emit(self, event: str, **fields: object) -> None:
+        self.events.append(event)
+
+    def __enter__(self) -> Reporter:
+        self.events.append("opened")
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.events.append("closed")
+
+
+class _SlowSink(DirectorySink):
+    def __init__(self, directory):
+        super().__init__(directory)
+        self.release = threading.Event()
+
+    def write(self, name, data):
+        self.release.wait(5)
+        return super().write(name, data)
+
+
+def test_progress_stays_open_until_the_images_are_written(tmp_path):
+    body = BytesIO()
+    Image.new("RGB", (8, 8)).save(body, "PNG")
+    image = body.getvalue()
+    counter = itertools.count()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "images.example.com":
+            return httpx.Response(
+                200, headers={"content-type": "image/png"}, content=image
+            )
+        return httpx.Response(
+            200,
+            json={"image": f"https://images.example.com/{next(counter)}.png"},
+        )
+
+    reporter = _Recorder()
+    client = Client(
+        rate_limiter=RateLimiter(rate=1000),
+        reporter=reporter,
+        known_hosts=KnownHosts(tmp_path / "hosts.json"),
+        partial_store=PartialStore(tmp_path / "partial"),
+        transport=httpx.MockTransport(handler),
+    )
+    slow = _SlowSink(tmp_path)
+    # The writes are held back, so they finish after the images were downloaded.
+    timer = threading.Timer(0.2, slow.release.set)
+    timer.start()
+    try:
+        with ThreadedSink(slow) as sink:
+            client.download(CategoryEnum.cats, 2, tmp_path, sink, workers=2)
+    finally:
+        timer.cancel()
+        client.close()
+
+    opened, closed = (
+        reporter.events.index("opened"),
+        reporter.events.index("closed"),
+    )
+    saved = [
+        index
+        for index, event in enumerate(reporter.events)
+        if event == "image_saved"
+    ]
+    assert len(saved) == 2
+    assert all(opened < index < closed for index in saved)
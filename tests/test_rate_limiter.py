@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+import multiprocessing
+import time
+
+import pytest
+
+import src.catto as catto
+from src.catto.utils.helpers import SharedRateLimiter
+
+
+def test_shared_bucket_is_drawn_by_every_limiter(tmp_path):
+    path = tmp_path / "limits.db"
+    first = SharedRateLimiter("api.example", rate=1.0, burst=2, path=path)
+    second = SharedRateLimiter("api.example", rate=1.0, burst=2, path=path)
+    other = SharedRateLimiter("cdn.example", rate=1.0, burst=2, path=path)
+
+    assert first.reserve() == 0.0
+    assert second.reserve() == 0.0
+    assert first.reserve() == pytest.approx(1.0, abs=0.1)
+    assert second.reserve() == pytest.approx(2.0, abs=0.1)
+    assert other.reserve() == 0.0
+
+
+def test_falls_back_to_its_own_bucket(tmp_path):
+    (tmp_path / "limits.db").mkdir()
+    limiter = SharedRateLimiter(
+        "api.example", rate=1.0, burst=1, path=tmp_path / "limits.db"
+    )
+    assert limiter.reserve() == 0.0
+    assert limiter.reserve() == pytest.approx(1.0, abs=0.1)
+
+
+def _acquire(path, amount):
+    limiter = SharedRateLimiter("api.example", rate=20.0, burst=1, path=path)
+    for _ in range(amount):
+        limiter.acquire()
+
+
+def test_processes_stay_under_the_rate_together(tmp_path):
+    path = tmp_path / "limits.db"
+    processes = [
+        multiprocessing.Process(target=_acquire, args=(path, 5))
+        for _ in range(2)
+    ]
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    # 10 tokens at 20 per second with a burst of 1 take at least 0.45 seconds.
+    assert time.perf_counter() - started >= 0.45
+    assert all(process.exitcode == 0 for process in processes)
+
+
+def test_interactive_mode_shares_the_api_limit():
+    limiter = catto.controller.client.rate_limiter
+    assert isinstance(limiter, SharedRateLimiter)
+    assert limiter.key == catto.API_HOST
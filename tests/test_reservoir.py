@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+import os
+from io import BytesIO
+
+import httpx
+import pytest
+from PIL import Image
+
+from src.catto.core.api import Client
+from src.catto.core.catalogue import Catalogue
+from src.catto.core.hosts import KnownHosts
+from src.catto.core.output import DirectorySink
+from src.catto.core.partial import PartialStore
+from src.catto.core.reservoir import Reservoir
+from src.catto.utils.enums import CategoryEnum
+from src.catto.utils.events import Reporter
+from src.catto.utils.helpers import RateLimiter
+
+
+def test_reservoir_take_moves_images(tmp_path):
+    reservoir = Reservoir(tmp_path / "reservoir", target=3)
+    folder = reservoir.path_of(CategoryEnum.cats)
+    folder.mkdir(parents=True)
+    for name in ("cats-image-00000001.png", "cats-image-00000002.gif"):
+        (folder / name).write_bytes(b"image")
+    (folder / ".fill.lock").touch()
+    assert reservoir.count(CategoryEnum.cats) == 2
+
+    destination = tmp_path / "gallery"
+    destination.mkdir()
+    (destination / "cats-image-00000001.png").write_bytes(b"taken")
+    names = reservoir.take(CategoryEnum.cats, 5, DirectorySink(destination))
+
+    assert len(names) == 2
+    assert sorted(path.name for path in destination.iterdir()) == sorted(
+        names + ["cats-image-00000001.png"]
+    )
+    assert reservoir.count(CategoryEnum.cats) == 0
+
+
+def test_reservoir_take_records_images_where_they_were_moved(tmp_path):
+    reservoir = Reservoir(tmp_path / "reservoir", target=3)
+    folder = reservoir.path_of(CategoryEnum.cats)
+    folder.mkdir(parents=True)
+    (folder / "cats-image-00000001.png").write_bytes(b"image")
+    destination = tmp_path / "gallery"
+    destination.mkdir()
+    (destination / "cats-image-00000001.png").write_bytes(b"taken")
+    catalogue = Catalogue(tmp_path / "catalogue.db")
+
+    (name,) = reservoir.take(
+        CategoryEnum.cats, 1, DirectorySink(destination), catalogue
+    )
+
+    (entry,) = catalogue.query()
+    assert (entry.location, entry.name) == (str(destination), name)
+    assert (destination / name).read_bytes() == b"image"
+
+
+def test_reservoir_images_skips_images_taken_meanwhile(tmp_path, monkeypatch):
+    reservoir = Reservoir(tmp_path / "reservoir", target=3)
+    folder = reservoir.path_of(CategoryEnum.cats)
+    folder.mkdir(parents=True)
+    for name in ("cats-image-00000001.png", "cats-image-00000002.png"):
+        (folder / name).write_bytes(b"image")
+    scandir = os.scandir
+
+    def listed_then_taken(path):
+        entries = list(scandir(path))
+        # Another download claims an image right after the directory was listed.
+        (folder / "cats-image-00000001.png").unlink()
+        return entries
+
+    monkeypatch.setattr(os, "scandir", listed_then_taken)
+
+    assert reservoir.images(CategoryEnum.cats) == [
+        folder / "cats-image-00000002.png"
+    ]
+
+
+def _client(tmp_path, handler) -> Client:
+    return Client(
+        rate_limiter=RateLimiter(rate=1000),
+        reporter=Reporter(),
+        known_hosts=KnownHosts(tmp_path / "hosts.json"),
+        partial_store=PartialStore(tmp_path / "partial"),
+        transport=httpx.MockTransport(handler),
+    )
+
+
+def test_reservoir_fill_reaches_its_target(tmp_path):
+    body = BytesIO()
+    Image.new("RGB", (8, 8)).save(body, "PNG")
+    counter = itertools.count()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "images.example.com":
+            return httpx.Response(
+                200,
+                headers={"content-type": "image/png"},
+                content=body.getvalue(),
+            )
+        return httpx.Response(
+            200,
+            json={"image": f"https://images.example.com/{next(counter)}.png"},
+        )
+
+    reservoir = Reservoir(tmp_path / "reservoir", target=3)
+    client = _client(tmp_path, handler)
+    assert reservoir.fill(client, CategoryEnum.cats) == 3
+    client.close()
+
+    assert reservoir.count(CategoryEnum.cats) == 3
+    assert not (reservoir.path_of(CategoryEnum.cats) / ".fill.lock").exists()
+
+
+def test_reservoir_fill_gives_up_while_the_api_is_down(tmp_path, monkeypatch):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(503)
+
+    monkeypatch.setattr(Reservoir, "FAILURE_BACKOFF", 0.01)
+    reservoir = Reservoir(tmp_path / "reservoir", target=3)
+    client = _client(tmp_path, handler)
+    assert reservoir.fill(client, CategoryEnum.cats) == 0
+    client.close()
+
+    assert len(requests) == Reservoir.MAX_FAILURES
+    assert not (reservoir.path_of(CategoryEnum.cats) / ".fill.lock").exists()
+
+
+def test_reservoir_fill_gives_up_while_the_network_is_down(
+    tmp_path, monkeypatch
+):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        raise httpx.ConnectError("connection refused", request=request)
+
+    monkeypatch.setattr(Reservoir, "FAILURE_BACKOFF", 0.01)
+    reservoir = Reservoir(tmp_path / "reservoir", target=3)
+    client = _client(tmp_path, handler)
+    assert reservoir.fill(client, CategoryEnum.cats) == 0
+    client.close()
+
+    assert len(requests) == Reservoir.MAX_FAILURES
+    assert not (reservoir.path_of(CategoryEnum.cats) / ".fill.lock").exists()
+
+
+def test_reservoir_fill_keeps_the_lock_of_another_fill(tmp_path, monkeypatch):
+    def handler(request: httpx.Request) -> httpx.Response:
+        # Another process takes the lock over while this fill is running.
+        lock.write_text("another fill")
+        return httpx.Response(503)
+
+    monkeypatch.setattr(Reservoir, "FAILURE_BACKOFF", 0.01)
+    reservoir = Reservoir(tmp_path / "reservoir", target=3)
+    lock = reservoir.path_of(CategoryEnum.cats) / ".fill.lock"
+    client = _client(tmp_path, handler)
+    assert reservoir.fill(client, CategoryEnum.cats) == 0
+    client.close()
+
+    assert lock.read_text() == "another fill"
+
+
+def test_reservoir_take_gives_back_images_that_fail_to_move(tmp_path):
+    class _FullSink(DirectorySink):
+        def move_file(self, name, source):
+            raise OSError("No space left on device")
+
+    reservoir = Reservoir(tmp_path / "reservoir", target=3)
+    folder = reservoir.path_of(CategoryEnum.cats)
+    folder.mkdir(parents=True)
+    (folder / "cats-image-00000001.png").write_bytes(b"image")
+
+    with pytest.raises(OSError):
+        reservoir.take(CategoryEnum.cats, 1, _FullSink(tmp_path))
+    assert [path.name for path in folder.iterdir()] == [
+        "cats-image-00000001.png"
+    ]
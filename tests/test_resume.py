@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+from io import BytesIO
+
+import httpx
+import pytest
+from PIL import Image
+
+from src.catto.core.api import Client
+from src.catto.core.hosts import KnownHosts
+from src.catto.core.partial import PartialStore
+from src.catto.utils.events import Reporter
+from src.catto.utils.exceptions import InvalidImageURL
+from src.catto.utils.helpers import RateLimiter
+
+URL = "https://images.example.com/big.png"
+
+
+class _BrokenStream(httpx.SyncByteStream):
+    def __init__(self, data: bytes):
+        self.__data = data
+
+    def __iter__(self):
+        yield self.__data
+        raise httpx.ReadError("connection reset")
+
+
+def _image() -> bytes:
+    body = BytesIO()
+    Image.effect_noise((256, 256), 64).save(body, "PNG")
+    return body.getvalue()
+
+
+def _client(handler, tmp_path) -> Client:
+    return Client(
+        rate_limiter=RateLimiter(rate=1000),
+        reporter=Reporter(),
+        known_hosts=KnownHosts(tmp_path / "hosts.json"),
+        partial_store=PartialStore(tmp_path / "partial"),
+        transport=httpx.MockTransport(handler),
+    )
+
+
+def test_failed_transfer_is_continued_with_a_range_request(tmp_path):
+    image = _image()
+    half = 2 * Client.CHUNK_SIZE
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        headers = {
+            "content-type": "image/png",
+            "accept-ranges": "bytes",
+            "etag": '"v1"',
+        }
+        if "range" not in request.headers:
+            headers["content-length"] = str(len(image))
+            return httpx.Response(
+                200, headers=headers, stream=_BrokenStream(image[:half])
+            )
+        start = int(request.headers["range"][len("bytes=") : -1])
+        headers[
+            "content-range"
+        ] = f"bytes {start}-{len(image) - 1}/{len(image)}"
+        return httpx.Response(206, headers=headers, content=image[start:])
+
+    client = _client(handler, tmp_path)
+    assert client.fetch_image_from_url(URL) == (image, "png")
+    assert len(requests) == 2
+    assert requests[1].headers["range"] == f"bytes={half}-"
+    assert requests[1].headers["if-range"] == '"v1"'
+    assert not list((tmp_path / "partial").iterdir())
+    client.close()
+
+
+def test_partial_download_is_kept_for_the_next_run(tmp_path):
+    image = _image()
+    half = 2 * Client.CHUNK_SIZE
+    store = PartialStore(tmp_path / "partial")
+    store.save(URL, image[:half], len(image), '"v1"')
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.headers["range"] == f"bytes={half}-"
+        # The image changed, so the whole new body is sent.
+        return httpx.Response(
+            200,
+            headers={"content-type": "image/png", "etag": '"v2"'},
+            content=image,
+        )
+
+    client = _client(handler, tmp_path)
+    assert client.fetch_image_from_url(URL) == (image, "png")
+    assert store.load(URL) is None
+    client.close()
+
+
+def test_body_is_checked_against_the_announced_length(tmp_path):
+    image = _image()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            206,
+            headers={
+                "content-type": "image/png",
+                "content-range": f"bytes 10-{len(image)}/{len(image) + 10}",
+            },
+            content=image[10:],
+        )
+
+    store = PartialStore(tmp_path / "partial")
+    store.save(URL, image[:10], len(image) + 10, '"v1"')
+    client = _client(handler, tmp_path)
+    with pytest.raises(InvalidImageURL, match="bytes were received"):
+        client.fetch_image_from_url(URL)
+    client.close()
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+from io import BytesIO
+
+import httpx
+import pytest
+from PIL import Image
+
+from src.catto.core.api import Client
+from src.catto.core.hosts import KnownHosts
+from src.catto.core.partial import PartialStore
+from src.catto.core.retry import RetryBudget, RetryPolicy, RetryRule
+from src.catto.utils.enums import CategoryEnum, FailureEnum
+from src.catto.utils.events import Reporter
+from src.catto.utils.exceptions import DataFetchFailed, InvalidImageURL
+from src.catto.utils.helpers import DecorrelatedJitterBackoff, RateLimiter
+
+NO_WAIT = {
+    failure: RetryRule(attempts=2, base=0.0, maximum_time=0.0)
+    for failure in FailureEnum
+}
+
+
+def failing(*errors):
+    errors = list(errors)
+
+    def call():
+        if errors:
+            raise errors.pop(0)
+        return "image"
+
+    return call
+
+
+def test_classify():
+    request = httpx.Request("GET", "https://example.com")
+    assert (
+        RetryPolicy.classify(httpx.ConnectError("", request=request))
+        is FailureEnum.connect
+    )
+    assert (
+        RetryPolicy.classify(httpx.ReadTimeout("", request=request))
+        is FailureEnum.timeout
+    )
+    assert (
+        RetryPolicy.classify(DataFetchFailed("", 503, "", ""))
+        is FailureEnum.server_error
+    )
+    assert (
+        RetryPolicy.classify(DataFetchFailed("", 429, "", ""))
+        is FailureEnum.rate_limited
+    )
+    assert RetryPolicy.classify(DataFetchFailed("", 404, "", "")) is None
+    assert RetryPolicy.classify(InvalidImageURL()) is FailureEnum.invalid_image
+
+
+def test_retries_each_kind_of_failure_separately():
+    policy = RetryPolicy(NO_WAIT)
+    retries = []
+    call = failing(
+        InvalidImageURL(),
+        DataFetchFailed("", 500, "", ""),
+        InvalidImageURL(),
+        DataFetchFailed("", 502, "", ""),
+    )
+    assert (
+        policy.call(call, on_retry=lambda *args: retries.append(args[:2]))
+        == "image"
+    )
+    assert retries == [
+        (FailureEnum.invalid_image, 1),
+        (FailureEnum.server_error, 1),
+        (FailureEnum.invalid_image, 2),
+        (FailureEnum.server_error, 2),
+    ]
+
+    with pytest.raises(InvalidImageURL):
+        policy.call(failing(*[InvalidImageURL()] * 3))
+    with pytest.raises(DataFetchFailed):
+        policy.call(failing(DataFetchFailed("", 404, "", "")))
+
+
+def test_retry_budget_limits_retries():
+    policy = RetryPolicy(NO_WAIT, budget=RetryBudget(ratio=0.0, minimum=1))
+    assert policy.call(failing(InvalidImageURL())) == "image"
+    with pytest.raises(InvalidImageURL):
+        policy.call(failing(InvalidImageURL()))
+    assert policy.budget.retries == 1
+
+
+def test_parse():
+    policy = RetryPolicy.parse("connect=7, 429=0,invalid_image=1")
+    assert policy.rule_of(FailureEnum.connect).attempts == 7
+    assert policy.rule_of(FailureEnum.rate_limited).attempts == 0
+    assert policy.rule_of(FailureEnum.invalid_image).attempts == 1
+    assert (
+        policy.rule_of(FailureEnum.timeout)
+        == RetryPolicy.DEFAULT_RULES[FailureEnum.timeout]
+    )
+    for specification in ("bogus=1", "connect=many"):
+        with pytest.raises(ValueError):
+            RetryPolicy.parse(specification)
+
+
+def test_decorrelated_jitter_backoff_stays_within_its_bounds():
+    backoff = DecorrelatedJitterBackoff(base=0.5, maximum_time=4.0)
+    waits = [backoff.calculate() for _ in range(50)]
+    assert all(0.5 <= wait <= 4.0 for wait in waits)
+    backoff.reset()
+    assert backoff.calculate() <= 0.5 * 3
+    assert all(
+        rule.base > 0 and rule.maximum_time >= rule.base
+        for rule in RetryPolicy.DEFAULT_RULES.values()
+    )
+
+
+class _Events(Reporter):
+    def __init__(self):
+        self.events: list[tuple[str, dict[str, object]]] = []
+
+    def emit(self, event: str, **fields: object) -> None:
+        self.events.append((event, fields))
+
+    def named(self, event: str) -> list[dict[str, object]]:
+        return [fields for name, fields in self.events if name == event]
+
+
+def _client(tmp_path, reporter, failures, budget) -> Client:
+    body = BytesIO()
+    Image.new("RGB", (8, 8)).save(body, "PNG")
+    counter = itertools.count()
+    requests = itertools.count()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "images.example.com":
+            return httpx.Response(
+                200,
+                headers={"content-type": "image/png"},
+                content=body.getvalue(),
+            )
+        if next(requests) < failures:
+            # Not a temporary failure, so it isn't retried in place.
+            return httpx.Response(404)
+        return httpx.Response(
+            200,
+            json={"image": f"https://images.example.com/{next(counter)}.png"},
+        )
+
+    return Client(
+        rate_limiter=RateLimiter(rate=1000),
+        reporter=reporter,
+        known_hosts=KnownHosts(tmp_path / "hosts.json"),
+        partial_store=PartialStore(tmp_path / "partial"),
+        retry_policy=RetryPolicy(budget=budget),
+        transport=httpx.MockTransport(handler),
+    )
+
+
+def test_download_replaces_failed_images(tmp_path):
+    reporter = _Events()
+    client = _client(tmp_path, reporter, 2, RetryBudget(ratio=0.0, minimum=2))
+    result = client.download(CategoryEnum.cats, 3, tmp_path, workers=1)
+    client.close()
+
+    assert len(result["names"]) == 3
+    assert len(reporter.named("image_failed")) == 2
+    assert reporter.named("download_incomplete") == []
+
+
+def test_download_reports_the_images_it_could_not_replace(tmp_path):
+    reporter = _Events()
+    client = _client(tmp_path, reporter, 10, RetryBudget(ratio=0.0, minimum=2))
+    result = client.download(CategoryEnum.cats, 3, tmp_path, workers=1)
+    client.close()
+
+    assert result["names"] == []
+    assert len(reporter.named("image_failed")) == 5
+    assert reporter.named("download_incomplete") == [
+        {"category": "cats", "requested": 3, "downloaded": 0, "missing": 3}
+    ]
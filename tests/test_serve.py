@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+
+import json
+import threading
+
+import httpx
+
+from src.catto.core.server import ImagePool, PooledImage, create_server
+from src.catto.utils.enums import CategoryEnum
+
+
+def test_serve_images_from_pool():
+    def fetch(category):
+        return PooledImage(
+            category, b"GIF89a", "gif", "https://example.com/a.gif"
+        )
+
+    pool = ImagePool(fetch, [CategoryEnum.cats], size=2)
+    server = create_server(pool, port=0, timeout=5.0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    pool.start()
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with httpx.Client(timeout=10.0) as client:
+            response = client.get(f"{base_url}/cats")
+            assert response.status_code == 200
+            assert response.content == b"GIF89a"
+            assert response.headers["content-type"] == "image/gif"
+
+            assert client.get(f"{base_url}/dogs").status_code == 404
+            assert client.get(f"{base_url}/unicorns").status_code == 404
+            health = json.loads(client.get(f"{base_url}/health").content)
+            assert set(health["pools"]) == {"cats"}
+    finally:
+        server.shutdown()
+        server.server_close()
+        pool.stop()
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import json
 import re
 
 from typer.testing import CliRunner
@@ -21,3 +22,17 @@ def test_show_all_categories_command():
     assert "all available animal categories." in output
     for x in result.return_value:
         assert x.name in output
+
+
+def test_show_all_categories_command_json():
+    result = runner.invoke(
+        app, ["show-all-categories", "--json"], standalone_mode=False
+    )
+    lines = [json.loads(line) for line in result.stdout.splitlines()]
+
+    assert result.exit_code == 0
+    assert len(lines) == len(result.return_value)
+    for line, category in zip(lines, result.return_value):
+        assert line["event"] == "category"
+        assert line["name"] == category.name
+        assert line["endpoint"] == str(category.value)
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from typer.testing import CliRunner
+
+import src.catto as catto
+from src.catto import app
+from src.catto.core.catalogue import Catalogue
+from src.catto.utils.enums import CategoryEnum
+
+runner = CliRunner()
+
+
+def test_sync_of_an_up_to_date_directory_downloads_nothing(
+    tmp_path, monkeypatch
+):
+    gallery = tmp_path / "gallery"
+    gallery.mkdir()
+    catalogue = Catalogue(tmp_path / "catalogue.db")
+    for index in range(3):
+        name = f"cats-image-{index}.png"
+        (gallery / name).write_bytes(b"image")
+        catalogue.add(CategoryEnum.cats, name, str(gallery), b"image")
+    (gallery / "cats-image-0.png").unlink()
+    monkeypatch.setattr(catto, "catalogue", catalogue)
+
+    def offline():
+        raise AssertionError("sync should not need the network")
+
+    monkeypatch.setattr(catto, "check_internet_connection", offline)
+    result = runner.invoke(
+        app,
+        ["sync", "--target", "cats=2,dogs=0", "--path", str(gallery), "--json"],
+        standalone_mode=False,
+    )
+    lines = [json.loads(line) for line in result.stdout.splitlines()]
+
+    assert result.exit_code == 0
+    assert result.return_value == {"cats": 2, "dogs": 0}
+    assert [line["missing"] for line in lines[:2]] == [0, 0]
+    assert catalogue.count(str(gallery)) == {"cats": 2}
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+import json
+from io import BytesIO
+
+import httpx
+import pytest
+from PIL import Image
+
+from src.catto.core.api import Client
+from src.catto.core.hosts import KnownHosts
+from src.catto.core.output import DirectorySink, ThreadedSink
+from src.catto.core.partial import PartialStore
+from src.catto.utils.enums import CategoryEnum
+from src.catto.utils.events import Reporter
+from src.catto.utils.helpers import RateLimiter
+from src.catto.utils.tracing import OtlpJsonExporter, Tracer, tracer
+
+
+def _spans(path):
+    spans = []
+    for line in path.read_text("utf-8").splitlines():
+        for resource in json.loads(line)["resourceSpans"]:
+            for scope in resource["scopeSpans"]:
+                spans.extend(scope["spans"])
+    return spans
+
+
+def _attributes(span):
+    return {
+        attribute["key"]: next(iter(attribute["value"].values()))
+        for attribute in span["attributes"]
+    }
+
+
+def test_spans_are_nested_and_exported_as_otlp_json(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    exporter = OtlpJsonExporter(path, resource={"service.version": "1.0.5"})
+    spans = Tracer(exporter)
+
+    with spans.span("command", command="download"):
+        with spans.span("image") as span:
+            span.set(bytes=75, cached=False, url=None)
+        with pytest.raises(ValueError):
+            with spans.span("write"):
+                raise ValueError("disk full")
+    exporter.close()
+
+    image, write, command = _spans(path)
+    assert command["name"] == "command" and "parentSpanId" not in command
+    assert image["parentSpanId"] == write["parentSpanId"] == command["spanId"]
+    assert {image["traceId"], write["traceId"]} == {command["traceId"]}
+    assert _attributes(image) == {"bytes": "75", "cached": False}
+    assert write["status"] == {"code": 2, "message": "ValueError: disk full"}
+    assert "status" not in image
+    assert int(command["startTimeUnixNano"]) <= int(image["startTimeUnixNano"])
+    assert int(image["endTimeUnixNano"]) <= int(command["endTimeUnixNano"])
+
+
+def test_download_spans_share_the_trace_across_threads(tmp_path):
+    body = BytesIO()
+    Image.new("RGB", (8, 8)).save(body, "PNG")
+    image = body.getvalue()
+    counter = itertools.count()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "images.example.com":
+            return httpx.Response(
+                200, headers={"content-type": "image/png"}, content=image
+            )
+        return httpx.Response(
+            200,
+            json={"image": f"https://images.example.com/{next(counter)}.png"},
+        )
+
+    client = Client(
+        rate_limiter=RateLimiter(rate=1000),
+        reporter=Reporter(),
+        known_hosts=KnownHosts(tmp_path / "hosts.json"),
+        partial_store=PartialStore(tmp_path / "partial"),
+        transport=httpx.MockTransport(handler),
+    )
+    path = tmp_path / "trace.jsonl"
+    exporter = OtlpJsonExporter(path)
+    tracer.exporter = exporter
+    try:
+        with ThreadedSink(DirectorySink(tmp_path)) as sink:
+            client.download(CategoryEnum.cats, 3, tmp_path, sink, workers=2)
+    finally:
+        tracer.exporter = None
+        client.close()
+    exporter.close()
+
+    spans = _spans(path)
+    by_id = {span["spanId"]: span for span in spans}
+    parents = {
+        span["name"]: by_id[span["parentSpanId"]]["name"]
+        for span in spans
+        if "parentSpanId" in span
+    }
+    assert parents == {
+        "rate_limiter.wait": "download",
+        "image": "download",
+        "fetch_image_url_of_endpoint": "image",
+        "fetch_image": "image",
+        "sink.write": "image",
+    }
+    assert len({span["traceId"] for span in spans}) == 1
+    assert sum(span["name"] == "sink.write" for span in spans) == 3
+    (download,) = [span for span in spans if span["name"] == "download"]
+    assert _attributes(download)["downloaded"] == "3"
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+from io import BytesIO
+
+import httpx
+import pytest
+from PIL import Image
+
+from src.catto.core.api import AsyncClient
+from src.catto.core.validation import (
+    ImageVerifier,
+    check_content_type,
+    check_structure,
+    sniff_image,
+)
+from src.catto.utils.exceptions import InvalidImageURL
+
+
+def encode(image_format: str) -> bytes:
+    body = BytesIO()
+    Image.new("RGB", (37, 21), (200, 100, 50)).save(body, image_format)
+    return body.getvalue()
+
+
+@pytest.mark.parametrize("image_format", ["PNG", "JPEG", "GIF", "WEBP", "BMP"])
+def test_sniff_image_reads_format_and_dimensions(image_format):
+    data = encode(image_format)
+    header = sniff_image(data[:4096])
+    assert (header.format, header.width, header.height) == (
+        image_format.lower(),
+        37,
+        21,
+    )
+    check_structure(header, data)
+    ImageVerifier.verify(data)
+    with pytest.raises(InvalidImageURL, match="truncated"):
+        check_structure(header, data[:-16])
+
+
+@pytest.mark.parametrize(
+    "body", [b"<!DOCTYPE html><title>502</title>", b"", b"\x89PNG\r\n\x1a\n"]
+)
+def test_sniff_image_rejects_non_images(body):
+    with pytest.raises(InvalidImageURL):
+        sniff_image(body)
+
+
+def test_check_content_type():
+    check_content_type(None)
+    check_content_type("image/png")
+    check_content_type("application/octet-stream")
+    with pytest.raises(InvalidImageURL):
+        check_content_type("text/html; charset=utf-8")
+
+
+def test_verifier_reports_broken_images():
+    data = encode("PNG")
+    broken = data[:40] + bytes(len(data) - 40)
+    verifier = ImageVerifier()
+    verifier.submit("https://images.example.com/good.png", data)
+    verifier.submit("https://images.example.com/broken.png", broken)
+    failures = verifier.failures()
+    verifier.close()
+    assert [url for url, _ in failures] == [
+        "https://images.example.com/broken.png"
+    ]
+    assert verifier.failures() == []
+
+
+def test_error_page_is_rejected_before_the_body():
+    page = b"<html>" + b" " * (1024 * 1024) + b"</html>"
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            content=page,
+            headers={"content-type": "application/octet-stream"},
+        )
+
+    async def fetch():
+        async with AsyncClient(
+            transport=httpx.MockTransport(handler)
+        ) as client:
+            await client.fetch_image("https://images.example.com/0.png")
+
+    with pytest.raises(InvalidImageURL, match="HTML"):
+        asyncio.run(fetch())
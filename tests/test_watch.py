@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+import json
+import sqlite3
+import time
+from io import BytesIO
+
+import httpx
+import pytest
+from PIL import Image
+from typer.testing import CliRunner
+
+import src.catto as catto
+from src.catto import app
+from src.catto.core.api import Client
+from src.catto.core.catalogue import Catalogue
+from src.catto.core.hosts import KnownHosts
+from src.catto.core.partial import PartialStore
+from src.catto.core.watch import Watcher
+from src.catto.utils.enums import CategoryEnum, EvictionEnum
+from src.catto.utils.events import Reporter
+from src.catto.utils.helpers import RateLimiter, parse_frequency
+
+
+class _Events(Reporter):
+    def __init__(self):
+        self.events: list[str] = []
+
+    def emit(self, event: str, **fields: object) -> None:
+        self.events.append(event)
+
+
+def _save(catalogue, directory, name, body, saved_at):
+    (directory / name).write_bytes(body)
+    catalogue.add(
+        CategoryEnum.cats, name, str(directory), body, saved_at=saved_at
+    )
+
+
+runner = CliRunner()
+
+
+def _client(tmp_path, reporter):
+    body = BytesIO()
+    Image.new("RGB", (8, 8)).save(body, "PNG")
+    image = body.getvalue()
+    counter = itertools.count()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "images.example.com":
+            return httpx.Response(
+                200, headers={"content-type": "image/png"}, content=image
+            )
+        return httpx.Response(
+            200,
+            json={"image": f"https://images.example.com/{next(counter)}.png"},
+        )
+
+    return Client(
+        rate_limiter=RateLimiter(rate=1000),
+        reporter=reporter,
+        known_hosts=KnownHosts(tmp_path / "hosts.json"),
+        partial_store=PartialStore(tmp_path / "partial"),
+        catalogue=Catalogue(tmp_path / "catalogue.db"),
+        transport=httpx.MockTransport(handler),
+    )
+
+
+def test_parse_frequency():
+    assert parse_frequency("10/min") == pytest.approx(10 / 60)
+    assert parse_frequency("2/s") == 2.0
+    assert parse_frequency("100/hours") == pytest.approx(100 / 3600)
+    assert parse_frequency("5/10m") == pytest.approx(5 / 600)
+    with pytest.raises(ValueError):
+        parse_frequency("10/fortnight")
+
+
+def test_evict_oldest_and_least_recently_used(tmp_path):
+    catalogue = Catalogue(tmp_path / "catalogue.db")
+    images = tmp_path / "images"
+    images.mkdir()
+    for index, name in enumerate("abcd"):
+        _save(catalogue, images, f"{name}.png", b"x" * 100, saved_at=index)
+    catalogue.touch(str(images), ["a.png", "b.png"], used_at=10.0)
+
+    evicted = catalogue.evict(images, max_files=3, order=EvictionEnum.lru)
+    assert [entry.name for entry in evicted] == ["c.png"]
+    evicted = catalogue.evict(images, max_bytes=150)
+    assert [entry.name for entry in evicted] == ["a.png", "b.png"]
+    assert sorted(path.name for path in images.iterdir()) == ["d.png"]
+    assert catalogue.usage(str(images)) == (1, 100)
+
+
+def test_catalogue_without_used_at_is_upgraded(tmp_path):
+    path = tmp_path / "catalogue.db"
+    with sqlite3.connect(path) as connection:
+        connection.execute(
+            "CREATE TABLE images (id INTEGER PRIMARY KEY AUTOINCREMENT, category TEXT NOT NULL, "
+            "name TEXT NOT NULL, location TEXT NOT NULL, url TEXT, sha256 TEXT NOT NULL, format TEXT, "
+            "width INTEGER, height INTEGER, size INTEGER NOT NULL, saved_at REAL NOT NULL)"
+        )
+    connection.close()
+
+    catalogue = Catalogue(path)
+    _save(catalogue, tmp_path, "a.png", b"x", saved_at=1.0)
+    assert catalogue.touch(str(tmp_path), ["a.png"]) == 1
+
+
+def test_watch_keeps_the_directory_within_its_quota(tmp_path):
+    reporter = _Events()
+    client = _client(tmp_path, reporter)
+    images = tmp_path / "images"
+    images.mkdir()
+    (images / "wallpaper.txt").write_text("not tracked")
+    watcher = Watcher(
+        client, images, [CategoryEnum.cats, CategoryEnum.dogs], max_files=3
+    )
+    rounds = []
+    watcher.run(rounds=5, on_round=rounds.append)
+    client.close()
+
+    assert [outcome.category for outcome in rounds] == [
+        CategoryEnum.cats,
+        CategoryEnum.dogs,
+    ] * 2 + [CategoryEnum.cats]
+    assert [outcome.files for outcome in rounds] == [1, 2, 3, 3, 3]
+    assert reporter.events.count("image_evicted") == 2
+    assert len(list(images.glob("*.png"))) == 3
+    assert (images / "wallpaper.txt").exists()
+
+
+def test_watch_is_paced_apart_from_the_api_requests(tmp_path):
+    client = _client(tmp_path, Reporter())
+    images = tmp_path / "images"
+    images.mkdir()
+    watcher = Watcher(
+        client,
+        images,
+        [CategoryEnum.cats],
+        max_files=3,
+        pace=RateLimiter(rate=0.01, burst=1),
+    )
+    rounds = []
+
+    def stop(outcome):
+        rounds.append(outcome)
+        watcher.stop()
+
+    started = time.monotonic()
+    watcher.run(rounds=5, on_round=stop)
+    client.close()
+
+    # The first image is taken from the burst, the stop doesn't wait 100 seconds for the second one.
+    assert len(rounds) == 1
+    assert time.monotonic() - started < 10
+
+
+def test_touch_marks_images_as_used(tmp_path, monkeypatch):
+    catalogue = Catalogue(tmp_path / "catalogue.db")
+    images = tmp_path / "images"
+    images.mkdir()
+    for index, name in enumerate("abc"):
+        _save(catalogue, images, f"{name}.png", b"x" * 100, saved_at=index)
+    monkeypatch.setattr(catto, "catalogue", catalogue)
+
+    result = runner.invoke(
+        app,
+        [
+            "touch",
+            str(images / "a.png"),
+            str(images / "wallpaper.txt"),
+            "--json",
+        ],
+        standalone_mode=False,
+    )
+
+    assert result.exit_code == 0
+    event = json.loads(result.stdout)
+    assert event["event"] == "images_touched"
+    assert (event["count"], event["untracked"]) == (1, 1)
+    evicted = catalogue.evict(images, max_files=2, order=EvictionEnum.lru)
+    assert [entry.name for entry in evicted] == ["b.png"]